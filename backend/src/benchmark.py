@@ -0,0 +1,149 @@
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from asgi_lifespan import LifespanManager
+from httpx import ASGITransport, AsyncClient
+
+from benchmarks import (
+    SCENARIOS,
+    build_report,
+    compare_reports,
+    delete_benchmark_data,
+    format_results,
+    read_report,
+    run_benchmark,
+    seed_benchmark_users,
+    write_report,
+)
+from config import config
+from database import database
+
+
+RESULTS_DIR = Path("benchmark-results")
+
+
+async def run(args: argparse.Namespace) -> None:
+    await delete_benchmark_data(database.url)
+    users = await seed_benchmark_users(database.url)
+    try:
+        if args.base_url:
+            target = args.base_url
+            async with AsyncClient(base_url=args.base_url, timeout=30) as client:
+                results = await run_benchmark(
+                    client,
+                    users,
+                    args.scenario,
+                    args.requests,
+                    args.concurrency,
+                    args.warmup,
+                )
+        else:
+            from main import app
+
+            target = "in-process"
+            # The per-phone limit would reject almost every login scenario
+            # request; a remote server has to be started with it disabled.
+            config.login_rate_limit.ENABLED = False
+            async with LifespanManager(app):
+                async with AsyncClient(
+                    transport=ASGITransport(app=app), base_url="http://benchmark"
+                ) as client:
+                    results = await run_benchmark(
+                        client,
+                        users,
+                        args.scenario,
+                        args.requests,
+                        args.concurrency,
+                        args.warmup,
+                    )
+    finally:
+        if not args.keep_data:
+            await delete_benchmark_data(database.url)
+
+    report = build_report(
+        results, target, args.requests, args.concurrency, args.warmup
+    )
+    output = args.output
+    if output is None:
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+        commit = (report["commit"] or "nocommit")[:8]
+        output = RESULTS_DIR / f"{stamp}-{commit}.json"
+    write_report(report, output)
+    print(format_results(results))
+    print(f"Results written to {output}")
+
+
+def compare(args: argparse.Namespace) -> int:
+    table, regressions = compare_reports(
+        read_report(args.baseline), read_report(args.current), args.threshold
+    )
+    print(table)
+    if regressions:
+        print(
+            f"p95 regressed by more than {args.threshold}%: {', '.join(regressions)}"
+        )
+        return 1
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="API latency and throughput benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run scenarios and save the results")
+    run_parser.add_argument(
+        "--base-url",
+        help="benchmark a running server instead of the app in-process",
+    )
+    run_parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="scenario to run; repeat for several (default: all)",
+    )
+    run_parser.add_argument(
+        "--requests", type=int, default=500, help="measured requests per scenario"
+    )
+    run_parser.add_argument(
+        "--concurrency", type=int, default=10, help="clients sending in parallel"
+    )
+    run_parser.add_argument(
+        "--warmup", type=int, default=20, help="unmeasured requests per scenario"
+    )
+    run_parser.add_argument("--output", type=Path, help="result file to write")
+    run_parser.add_argument(
+        "--keep-data",
+        action="store_true",
+        help="keep the benchmark accounts and the tasks they created",
+    )
+
+    compare_parser = commands.add_parser(
+        "compare", help="compare two result files"
+    )
+    compare_parser.add_argument("baseline", type=Path)
+    compare_parser.add_argument("current", type=Path)
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="exit with 1 when a p95 grew by more than this many percent",
+    )
+
+    commands.add_parser("list", help="list the available scenarios")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        args.scenario = args.scenario or list(SCENARIOS)
+        asyncio.run(run(args))
+    elif args.command == "compare":
+        sys.exit(compare(args))
+    else:
+        for scenario in SCENARIOS.values():
+            print(f"{scenario.name:<30} {scenario.role:<11} {scenario.description}")
+
+
+if __name__ == "__main__":
+    main()
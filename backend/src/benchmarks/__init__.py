@@ -0,0 +1,30 @@
+__all__ = [
+    "SCENARIOS",
+    "BenchmarkUsers",
+    "Scenario",
+    "ScenarioResult",
+    "Session",
+    "build_report",
+    "compare_reports",
+    "delete_benchmark_data",
+    "format_results",
+    "read_report",
+    "run_benchmark",
+    "run_scenario",
+    "seed_benchmark_users",
+    "write_report",
+]
+
+from benchmarks.runner import (
+    ScenarioResult,
+    build_report,
+    compare_reports,
+    delete_benchmark_data,
+    format_results,
+    read_report,
+    run_benchmark,
+    run_scenario,
+    seed_benchmark_users,
+    write_report,
+)
+from benchmarks.scenarios import SCENARIOS, BenchmarkUsers, Scenario, Session
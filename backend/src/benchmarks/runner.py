@@ -0,0 +1,353 @@
+import asyncio
+import json
+import math
+import platform
+import subprocess
+import time
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+import asyncpg
+from httpx import AsyncClient
+
+from benchmarks.scenarios import SCENARIOS, BenchmarkUsers, Scenario, Session
+from services.passwords import hash_password
+from services.reference_cache import FOREMEN, REFERENCE_DATA_CHANNEL, TECHNICIANS
+
+
+RESULT_FORMAT = 1
+BENCHMARK_FOREMAN_PHONE = "+79990000001"
+BENCHMARK_TECHNICIAN_PHONE = "+79990000002"
+BENCHMARK_PASSWORD = "benchmark123"
+
+
+@dataclass
+class LatencySummary:
+    min: float
+    mean: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    requests: int
+    errors: int
+    duration_seconds: float
+    rps: float
+    latency_ms: LatencySummary
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending, non-empty sequence."""
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize_latencies(latencies: Sequence[float]) -> LatencySummary:
+    if not latencies:
+        return LatencySummary(0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+    values = sorted(latency * 1000 for latency in latencies)
+    return LatencySummary(
+        min=round(values[0], 3),
+        mean=round(sum(values) / len(values), 3),
+        p50=round(percentile(values, 0.50), 3),
+        p95=round(percentile(values, 0.95), 3),
+        p99=round(percentile(values, 0.99), 3),
+        max=round(values[-1], 3),
+    )
+
+
+async def seed_benchmark_users(dsn: str) -> BenchmarkUsers:
+    """Creates or resets the two accounts every scenario runs as.
+
+    Goes straight to the database so it works for a remote server too; the
+    reference lists are invalidated the same way the write functions do.
+    """
+    password_hash = hash_password(BENCHMARK_PASSWORD)
+    connection = await asyncpg.connect(dsn)
+    try:
+        async with connection.transaction():
+            foreman_id = await connection.fetchval(
+                """
+                INSERT INTO foremen (full_name, gender, workshop, phone_number, password_hash)
+                VALUES ('Нагрузочный Мастер', 'М', 'Цех нагрузочного теста', $1, $2)
+                ON CONFLICT (phone_number) DO UPDATE
+                SET password_hash = EXCLUDED.password_hash
+                RETURNING foreman_id;
+                """,
+                BENCHMARK_FOREMAN_PHONE,
+                password_hash,
+            )
+            technician_id = await connection.fetchval(
+                """
+                INSERT INTO technicians (specialization, full_name, gender, phone_number, password_hash)
+                VALUES ('Слесарь', 'Нагрузочный Техник', 'М', $1, $2)
+                ON CONFLICT (phone_number) DO UPDATE
+                SET password_hash = EXCLUDED.password_hash
+                RETURNING technician_id;
+                """,
+                BENCHMARK_TECHNICIAN_PHONE,
+                password_hash,
+            )
+            for name in (FOREMEN, TECHNICIANS):
+                await connection.execute(
+                    "SELECT pg_notify($1, $2);", REFERENCE_DATA_CHANNEL, name
+                )
+    finally:
+        await connection.close()
+    return BenchmarkUsers(
+        foreman_id=foreman_id,
+        technician_id=technician_id,
+        foreman_phone=BENCHMARK_FOREMAN_PHONE,
+        technician_phone=BENCHMARK_TECHNICIAN_PHONE,
+        password=BENCHMARK_PASSWORD,
+    )
+
+
+async def delete_benchmark_data(dsn: str) -> None:
+    """Removes the benchmark accounts and everything the scenarios created."""
+    connection = await asyncpg.connect(dsn)
+    try:
+        async with connection.transaction():
+            foreman_id = await connection.fetchval(
+                "SELECT foreman_id FROM foremen WHERE phone_number = $1;",
+                BENCHMARK_FOREMAN_PHONE,
+            )
+            technician_id = await connection.fetchval(
+                "SELECT technician_id FROM technicians WHERE phone_number = $1;",
+                BENCHMARK_TECHNICIAN_PHONE,
+            )
+            if foreman_id is None or technician_id is None:
+                return
+            for table in ("notifications", "notifications_archive", "notification_counters"):
+                await connection.execute(
+                    f"""
+                    DELETE FROM {table}
+                    WHERE (recipient_role = 'foreman' AND recipient_id = $1)
+                       OR (recipient_role = 'technician' AND recipient_id = $2);
+                    """,
+                    foreman_id,
+                    technician_id,
+                )
+            await connection.execute(
+                """
+                DELETE FROM refresh_tokens
+                WHERE (user_role = 'foreman' AND user_id = $1)
+                   OR (user_role = 'technician' AND user_id = $2);
+                """,
+                foreman_id,
+                technician_id,
+            )
+            for table in ("technician_tasks", "technician_task_tombstones"):
+                await connection.execute(
+                    f"DELETE FROM {table} WHERE foreman_id = $1 OR technician_id = $2;",
+                    foreman_id,
+                    technician_id,
+                )
+            await connection.execute(
+                "DELETE FROM technicians WHERE technician_id = $1;", technician_id
+            )
+            await connection.execute(
+                "DELETE FROM foremen WHERE foreman_id = $1;", foreman_id
+            )
+    finally:
+        await connection.close()
+
+
+async def open_session(client: AsyncClient, users: BenchmarkUsers) -> Session:
+    tokens = {}
+    for role, phone in (
+        ("foreman", users.foreman_phone),
+        ("technician", users.technician_phone),
+    ):
+        response = await client.post(
+            "/auth/login",
+            json={"role": role, "phone_number": phone, "password": users.password},
+        )
+        response.raise_for_status()
+        tokens[role] = response.json()["access_token"]
+    return Session(
+        users=users,
+        foreman_token=tokens["foreman"],
+        technician_token=tokens["technician"],
+    )
+
+
+async def run_scenario(
+    client: AsyncClient,
+    scenario: Scenario,
+    session: Session,
+    requests: int,
+    concurrency: int,
+    warmup: int = 0,
+) -> ScenarioResult:
+    """Sends requests with a closed loop of concurrency clients.
+
+    Every client waits for its response before sending the next request, so
+    RPS is what the server sustains at that concurrency. The first warmup
+    requests are sent but not measured.
+    """
+    for _ in range(warmup):
+        await scenario.call(client, session)
+
+    remaining = requests
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal remaining, errors
+        worker_session = Session(
+            users=session.users,
+            foreman_token=session.foreman_token,
+            technician_token=session.technician_token,
+            state=dict(session.state),
+        )
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                response = await scenario.call(client, worker_session)
+                ok = response.status_code in scenario.ok_statuses
+            except Exception:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - started
+    return ScenarioResult(
+        name=scenario.name,
+        requests=len(latencies),
+        errors=errors,
+        duration_seconds=round(duration, 3),
+        rps=round(len(latencies) / duration, 2) if duration else 0.0,
+        latency_ms=summarize_latencies(latencies),
+    )
+
+
+async def run_benchmark(
+    client: AsyncClient,
+    users: BenchmarkUsers,
+    scenario_names: Sequence[str],
+    requests: int,
+    concurrency: int,
+    warmup: int = 0,
+) -> list[ScenarioResult]:
+    session = await open_session(client, users)
+    return [
+        await run_scenario(
+            client, SCENARIOS[name], session, requests, concurrency, warmup
+        )
+        for name in scenario_names
+    ]
+
+
+def git_commit() -> str | None:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip()
+
+
+def build_report(
+    results: Sequence[ScenarioResult],
+    target: str,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+) -> dict:
+    return {
+        "format": RESULT_FORMAT,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "target": target,
+        "python": platform.python_version(),
+        "settings": {
+            "requests": requests,
+            "concurrency": concurrency,
+            "warmup": warmup,
+        },
+        "scenarios": {result.name: asdict(result) for result in results},
+    }
+
+
+def write_report(report: dict, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, ensure_ascii=False, indent=2) + "\n")
+
+
+def read_report(path: Path) -> dict:
+    report = json.loads(path.read_text())
+    if report.get("format") != RESULT_FORMAT:
+        raise ValueError(f"{path}: unsupported result format {report.get('format')}")
+    return report
+
+
+def format_results(results: Sequence[ScenarioResult]) -> str:
+    lines = [
+        f"{'scenario':<30} {'requests':>8} {'errors':>6} {'rps':>9} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    ]
+    for result in results:
+        latency = result.latency_ms
+        lines.append(
+            f"{result.name:<30} {result.requests:>8} {result.errors:>6} "
+            f"{result.rps:>9.1f} {latency.p50:>8.2f} {latency.p95:>8.2f} "
+            f"{latency.p99:>8.2f}"
+        )
+    return "\n".join(lines)
+
+
+def relative_change(baseline: float, current: float) -> float | None:
+    if not baseline:
+        return None
+    return (current - baseline) / baseline * 100
+
+
+def compare_reports(
+    baseline: dict, current: dict, threshold_percent: float
+) -> tuple[str, list[str]]:
+    """Returns a comparison table and the scenarios whose p95 regressed.
+
+    A scenario regresses when its p95 latency grew by more than
+    threshold_percent; scenarios present in only one report are skipped.
+    """
+    lines = [
+        f"baseline {baseline.get('commit') or '?'} -> current {current.get('commit') or '?'}",
+        f"{'scenario':<30} {'metric':<6} {'baseline':>10} {'current':>10} {'change':>8}",
+    ]
+    regressions = []
+    for name, base in baseline["scenarios"].items():
+        if name not in current["scenarios"]:
+            continue
+        new = current["scenarios"][name]
+        metrics = [
+            (key, base["latency_ms"][key], new["latency_ms"][key])
+            for key in ("p50", "p95", "p99")
+        ]
+        metrics.append(("rps", base["rps"], new["rps"]))
+        for key, before, after in metrics:
+            change = relative_change(before, after)
+            shown = "n/a" if change is None else f"{change:+.1f}%"
+            lines.append(
+                f"{name:<30} {key:<6} {before:>10.2f} {after:>10.2f} {shown:>8}"
+            )
+        change = relative_change(base["latency_ms"]["p95"], new["latency_ms"]["p95"])
+        if change is not None and change > threshold_percent:
+            regressions.append(name)
+    return "\n".join(lines), regressions
@@ -0,0 +1,178 @@
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+from httpx import AsyncClient, Response
+
+
+@dataclass
+class BenchmarkUsers:
+    foreman_id: int
+    technician_id: int
+    foreman_phone: str
+    technician_phone: str
+    password: str
+
+
+@dataclass
+class Session:
+    """State of one simulated client.
+
+    Tokens are shared by every client; ETags and sync watermarks are kept
+    per client, the way a real app would remember them between polls.
+    """
+
+    users: BenchmarkUsers
+    foreman_token: str
+    technician_token: str
+    state: dict[str, str] = field(default_factory=dict)
+
+    def auth(self, role: str) -> dict[str, str]:
+        token = self.foreman_token if role == "foreman" else self.technician_token
+        return {"Authorization": f"Bearer {token}"}
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    role: str
+    description: str
+    call: Callable[[AsyncClient, Session], Awaitable[Response]]
+    ok_statuses: tuple[int, ...] = (200,)
+
+
+async def foreman_login(client: AsyncClient, session: Session) -> Response:
+    return await client.post(
+        "/auth/login",
+        json={
+            "role": "foreman",
+            "phone_number": session.users.foreman_phone,
+            "password": session.users.password,
+        },
+    )
+
+
+async def foreman_task_page(client: AsyncClient, session: Session) -> Response:
+    return await client.get(
+        "/technician-tasks",
+        headers=session.auth("foreman"),
+        params={"limit": 50, "include_total": False},
+    )
+
+
+async def foreman_task_summary(client: AsyncClient, session: Session) -> Response:
+    return await client.get("/technician-tasks/summary", headers=session.auth("foreman"))
+
+
+async def foreman_create_task(client: AsyncClient, session: Session) -> Response:
+    return await client.post(
+        "/technician-tasks",
+        headers=session.auth("foreman"),
+        json={
+            "start_time": "01.01.2026 10:00",
+            "end_time": "01.01.2026 11:00",
+            "foreman_id": session.users.foreman_id,
+            "technician_id": session.users.technician_id,
+            "task_description": "Нагрузочный тест",
+            "important": False,
+        },
+    )
+
+
+async def technician_task_page(client: AsyncClient, session: Session) -> Response:
+    return await client.get(
+        f"/technicians/{session.users.technician_id}/tasks",
+        headers=session.auth("technician"),
+        params={"limit": 50, "include_total": False},
+    )
+
+
+async def technician_task_changes(client: AsyncClient, session: Session) -> Response:
+    params = {}
+    if "watermark" in session.state:
+        params["since"] = session.state["watermark"]
+    response = await client.get(
+        f"/technicians/{session.users.technician_id}/tasks/changes",
+        headers=session.auth("technician"),
+        params=params,
+    )
+    if response.status_code == 200:
+        session.state["watermark"] = response.json()["watermark"]
+    return response
+
+
+async def technician_notification_poll(
+    client: AsyncClient, session: Session
+) -> Response:
+    headers = session.auth("technician")
+    if "notifications_etag" in session.state:
+        headers["If-None-Match"] = session.state["notifications_etag"]
+    response = await client.get(
+        "/notifications", headers=headers, params={"limit": 20}
+    )
+    if "etag" in response.headers:
+        session.state["notifications_etag"] = response.headers["etag"]
+    return response
+
+
+async def technician_unread_count(client: AsyncClient, session: Session) -> Response:
+    return await client.get(
+        "/notifications/unread-count", headers=session.auth("technician")
+    )
+
+
+SCENARIOS: dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario(
+            "foreman_login",
+            "foreman",
+            "POST /auth/login, including Argon2 verification",
+            foreman_login,
+        ),
+        Scenario(
+            "foreman_task_page",
+            "foreman",
+            "GET /technician-tasks, first page of 50 without a total",
+            foreman_task_page,
+            (200, 304),
+        ),
+        Scenario(
+            "foreman_task_summary",
+            "foreman",
+            "GET /technician-tasks/summary",
+            foreman_task_summary,
+        ),
+        Scenario(
+            "foreman_create_task",
+            "foreman",
+            "POST /technician-tasks with its notification",
+            foreman_create_task,
+        ),
+        Scenario(
+            "technician_task_page",
+            "technician",
+            "GET /technicians/{id}/tasks, first page of 50 without a total",
+            technician_task_page,
+            (200, 304),
+        ),
+        Scenario(
+            "technician_task_changes",
+            "technician",
+            "GET /technicians/{id}/tasks/changes since the last watermark",
+            technician_task_changes,
+        ),
+        Scenario(
+            "technician_notification_poll",
+            "technician",
+            "GET /notifications with If-None-Match from the previous poll",
+            technician_notification_poll,
+            (200, 304),
+        ),
+        Scenario(
+            "technician_unread_count",
+            "technician",
+            "GET /notifications/unread-count",
+            technician_unread_count,
+        ),
+    )
+}
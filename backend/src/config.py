@@ -1,3 +1,6 @@
+import os
+from typing import Literal
+
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -6,6 +9,24 @@ class StartupConfig(BaseModel):
     HOST: str = "0.0.0.0"
     PORT: int = 8000
     RELOAD: bool = True
+    # "production" runs WORKERS processes sharing the port, without reload.
+    MODE: Literal["development", "production"] = "development"
+    WORKERS: int | None = None
+    LOOP: Literal["auto", "asyncio", "uvloop"] = "auto"
+    HTTP: Literal["auto", "h11", "httptools"] = "auto"
+    BACKLOG: int = 2048
+    TIMEOUT_KEEP_ALIVE: int = 5
+    TIMEOUT_GRACEFUL_SHUTDOWN: int | None = 30
+    # Only these peers (addresses or networks) may set the client address
+    # through X-Forwarded-For. List the reverse proxy here when it does not
+    # run on the same host; docker-compose trusts the container networks.
+    FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+    ACCESS_LOG: bool = True
+
+    def worker_count(self) -> int:
+        if self.MODE != "production":
+            return 1
+        return self.WORKERS or os.cpu_count() or 1
 
 
 class PostgreSQLConfig(BaseModel):
@@ -14,12 +35,86 @@ class PostgreSQLConfig(BaseModel):
     PORT: str = "5432"
     USERNAME: str = "postgres"
     PASSWORD: str = "postgres"
+    POOL_MIN_SIZE: int = 10
+    POOL_MAX_SIZE: int = 10
+    # Connection budget for the whole server, split between the workers.
+    # The default fits a stock max_connections=100 with room for migrations,
+    # admin sessions and superuser slots; None gives every worker POOL_MAX_SIZE.
+    MAX_CONNECTIONS_TOTAL: int | None = 80
+    POOL_MAX_QUERIES: int = 50000
+    POOL_MAX_INACTIVE_CONNECTION_LIFETIME: float = 300.0
+    COMMAND_TIMEOUT: float | None = None
+    # Holds the registered statements prepared on every connection, so keep
+    # it well above their number; 0 turns preparing and caching off.
+    STATEMENT_CACHE_SIZE: int = 200
+    # 0 keeps statements for the life of the connection, which POOL_MAX_QUERIES
+    # and the inactivity timeout already bound.
+    MAX_CACHED_STATEMENT_LIFETIME: int = 0
+    APPLICATION_NAME: str = "mechanical-backend"
+    INIT_STATEMENTS: list[str] = []
+    # Queries run through database.fetch() and friends that take at least
+    # this long are logged; None turns the log off.
+    SLOW_QUERY_THRESHOLD_MS: float | None = 200
+    SLOW_QUERY_EXPLAIN: bool = False
 
 
 class JWTConfig(BaseModel):
     SECRET_KEY: str = "change-me-in-production"
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    REFRESH_TOKEN_CLEANUP_INTERVAL_SECONDS: int = 3600
+    VERIFIED_TOKEN_CACHE_SIZE: int = 4096
+
+
+class PasswordsConfig(BaseModel):
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536
+    ARGON2_PARALLELISM: int = 4
+    HASHER_WORKERS: int = 2
+    HASHER_MAX_QUEUE: int = 64
+
+
+class LoginRateLimitConfig(BaseModel):
+    ENABLED: bool = True
+    BACKEND: Literal["memory", "postgres"] = "memory"
+    PHONE_CAPACITY: int = 5
+    PHONE_REFILL_PER_MINUTE: float = 5
+    IP_CAPACITY: int = 100
+    IP_REFILL_PER_MINUTE: float = 60
+    # Buckets idle long enough to be full again are deleted this often.
+    CLEANUP_INTERVAL_SECONDS: int = 600
+
+
+class SyncConfig(BaseModel):
+    # Watermarks older than this must resync, since their tombstones may be gone.
+    TOMBSTONE_RETENTION_DAYS: int = 30
+    TOMBSTONE_CLEANUP_INTERVAL_SECONDS: int = 3600
+
+
+class CacheConfig(BaseModel):
+    REFERENCE_DATA_TTL_SECONDS: float = 300
+
+
+class MetricsConfig(BaseModel):
+    ENABLED: bool = True
+    LATENCY_BUCKETS: list[float] = [
+        0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+    ]
+    QUERY_LATENCY_BUCKETS: list[float] = [
+        0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1,
+    ]
+
+
+class NotificationsConfig(BaseModel):
+    RETENTION_ENABLED: bool = True
+    RETENTION_DAYS: int = 90
+    RETENTION_INTERVAL_SECONDS: int = 3600
+    ARCHIVE_BATCH_SIZE: int = 1000
+    STREAM_KEEPALIVE_SECONDS: int = 15
+    STREAM_QUEUE_SIZE: int = 100
+    UNREAD_COUNT_CACHE_SECONDS: float = 2
+    UNREAD_COUNTER_RECONCILE_SECONDS: int = 3600
 
 
 class Config(BaseSettings):
@@ -31,6 +126,12 @@ class Config(BaseSettings):
     startup: StartupConfig = StartupConfig()
     postgresql: PostgreSQLConfig = PostgreSQLConfig()
     jwt: JWTConfig = JWTConfig()
+    passwords: PasswordsConfig = PasswordsConfig()
+    login_rate_limit: LoginRateLimitConfig = LoginRateLimitConfig()
+    notifications: NotificationsConfig = NotificationsConfig()
+    cache: CacheConfig = CacheConfig()
+    sync: SyncConfig = SyncConfig()
+    metrics: MetricsConfig = MetricsConfig()
 
 
 config = Config()
@@ -1,171 +1,274 @@
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
 import asyncpg
 from config import config
-from services.passwords import hash_password, verify_password
-from services.phone import normalize_phone_number, phone_number_variants
+from migrations import MIGRATIONS, check_schema_version
+from queries import Statement, statements
+
+
+current_connection: ContextVar[asyncpg.Connection | None] = ContextVar(
+    "current_connection", default=None
+)
+
+
+ConnectionHook = Callable[[asyncpg.Connection], Awaitable[None]]
+# Called with the query name, its duration in seconds and the row count.
+QueryObserver = Callable[[str, float, int], None]
+
+EXPLAINABLE_STATEMENTS = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "VALUES")
+
+logger = logging.getLogger(__name__)
+
+
+def pool_size_limits() -> tuple[int, int]:
+    """Returns (min_size, max_size) of the pool in this worker process.
 
+    With MAX_CONNECTIONS_TOTAL set, the budget is split evenly between the
+    workers, keeping one connection per worker for the notification listener.
+    """
+    settings = config.postgresql
+    max_size = settings.POOL_MAX_SIZE
+    if settings.MAX_CONNECTIONS_TOTAL is not None:
+        per_worker = settings.MAX_CONNECTIONS_TOTAL // config.startup.worker_count()
+        max_size = max(1, min(max_size, per_worker - 1))
+    return min(settings.POOL_MIN_SIZE, max_size), max_size
 
-DEFAULT_FOREMAN = {
-    "full_name": "Данюк Кирилл Константинович",
-    "gender": "М",
-    "workshop": "Администрация",
-    "phone_number": normalize_phone_number("89000000000"),
-    "password": "user123",
-}
+
+def params_shape(args: Sequence[object]) -> list[str]:
+    """Describes query parameters by type and size, never by value."""
+    shape = []
+    for arg in args:
+        name = type(arg).__name__
+        if isinstance(arg, (str, bytes, list, tuple)):
+            name = f"{name}[{len(arg)}]"
+        shape.append(name)
+    return shape
+
+
+def row_count(method: str, result: object) -> int:
+    if method == "fetch":
+        return len(result)
+    if method == "execute":
+        # Command tags end with the row count: "UPDATE 3", "INSERT 0 1".
+        last = result.rsplit(" ", 1)[-1]
+        return int(last) if last.isdigit() else 0
+    return 0 if result is None else 1
+
+
+@dataclass
+class PoolMetrics:
+    min_size: int
+    max_size: int
+    size: int
+    idle: int
+    acquired: int
+    waiters: int
+    acquisitions: int
+    acquire_wait_seconds: float
 
 
 class Postgresql:
     def __init__(self, url) -> None:
         self.url = url
+        self.init_hooks: list[ConnectionHook] = []
+        self.query_observers: list[QueryObserver] = []
+        self.acquired = 0
+        self.waiters = 0
+        self.acquisitions = 0
+        self.acquire_wait_seconds = 0.0
 
-    async def connect(self):
-        self.pool = await asyncpg.create_pool(self.url)
-        await self.create_tables()
-        await self.seed_default_foreman()
+    def add_init_hook(self, hook: ConnectionHook) -> None:
+        """Registers a coroutine run on every new pool connection."""
+        self.init_hooks.append(hook)
 
-    async def disconnect(self):
-        await self.pool.close()
+    def add_query_observer(self, observer: QueryObserver) -> None:
+        """Registers a callback run after every named query."""
+        self.query_observers.append(observer)
+
+    async def init_connection(self, connection: asyncpg.Connection) -> None:
+        for statement in config.postgresql.INIT_STATEMENTS:
+            await connection.execute(statement)
+        for hook in self.init_hooks:
+            await hook(connection)
+        # Without a statement cache, e.g. behind PgBouncer in transaction
+        # mode, there is nowhere to keep the prepared statements.
+        if config.postgresql.STATEMENT_CACHE_SIZE > 0:
+            await statements.prepare(connection)
 
-    async def create_tables(self):
-        create_tables_queries = [
-            """
-            CREATE TABLE IF NOT EXISTS foremen (
-                foreman_id SERIAL PRIMARY KEY,
-                full_name VARCHAR(100) NOT NULL,
-                gender CHAR(1) CHECK (gender IN ('М', 'Ж')) NOT NULL,
-                workshop VARCHAR(50),
-                phone_number VARCHAR(16) UNIQUE NOT NULL,
-                password_hash TEXT
-            );
-            """,
-            """
-            CREATE TABLE IF NOT EXISTS technicians (
-                technician_id SERIAL PRIMARY KEY,
-                specialization VARCHAR(50) NOT NULL,
-                full_name VARCHAR(100) NOT NULL,
-                gender CHAR(1) CHECK (gender IN ('М', 'Ж')) NOT NULL,
-                phone_number VARCHAR(16) UNIQUE NOT NULL,
-                password_hash TEXT
-            );
-            """,
-            """
-            CREATE TABLE IF NOT EXISTS technician_tasks (
-                task_id SERIAL PRIMARY KEY,
-                start_time VARCHAR(16) NOT NULL,
-                end_time VARCHAR(16) NOT NULL,
-                workshop VARCHAR(50) NOT NULL,
-                foreman_id INTEGER NOT NULL REFERENCES foremen(foreman_id),
-                technician_id INTEGER NOT NULL REFERENCES technicians(technician_id),
-                task_description VARCHAR(500) NOT NULL,
-                status VARCHAR(20) NOT NULL CHECK (status IN ('Не выполнено', 'В процессе', 'Выполнено', 'Отменено')),
-                important BOOLEAN NOT NULL DEFAULT FALSE
-            );
-            """,
-            """
-            ALTER TABLE foremen
-            ADD COLUMN IF NOT EXISTS password_hash TEXT;
-            """,
-            """
-            ALTER TABLE foremen
-            ALTER COLUMN phone_number TYPE VARCHAR(16);
-            """,
-            """
-            ALTER TABLE technicians
-            ADD COLUMN IF NOT EXISTS password_hash TEXT;
-            """,
-            """
-            ALTER TABLE technicians
-            ALTER COLUMN phone_number TYPE VARCHAR(16);
-            """,
-            """
-            CREATE TABLE IF NOT EXISTS notifications (
-                notification_id SERIAL PRIMARY KEY,
-                recipient_role VARCHAR(20) NOT NULL CHECK (recipient_role IN ('foreman','technician')),
-                recipient_id INTEGER NOT NULL,
-                task_id INTEGER REFERENCES technician_tasks(task_id),
-                message VARCHAR(255) NOT NULL,
-                is_read BOOLEAN NOT NULL DEFAULT FALSE,
-                created_at TIMESTAMP NOT NULL DEFAULT NOW()
-            );
-            """,
-            """
-            UPDATE foremen f
-            SET phone_number = '+7' || SUBSTRING(f.phone_number FROM 2)
-            WHERE f.phone_number ~ '^8[0-9]{10}$'
-              AND NOT EXISTS (
-                  SELECT 1
-                  FROM foremen existing
-                  WHERE existing.phone_number = '+7' || SUBSTRING(f.phone_number FROM 2)
-              );
-            """,
-            """
-            UPDATE technicians t
-            SET phone_number = '+7' || SUBSTRING(t.phone_number FROM 2)
-            WHERE t.phone_number ~ '^8[0-9]{10}$'
-              AND NOT EXISTS (
-                  SELECT 1
-                  FROM technicians existing
-                  WHERE existing.phone_number = '+7' || SUBSTRING(t.phone_number FROM 2)
-              );
-            """,
-        ]
-
-        async with self.pool.acquire() as connection:
-            for query in create_tables_queries:
-                await connection.execute(query)
-
-    async def seed_default_foreman(self):
-        query = """
-        SELECT foreman_id, password_hash
-        FROM foremen
-        WHERE phone_number = ANY($1::TEXT[])
-        LIMIT 1;
+    def pool_metrics(self) -> PoolMetrics:
+        return PoolMetrics(
+            min_size=self.pool.get_min_size(),
+            max_size=self.pool.get_max_size(),
+            size=self.pool.get_size(),
+            idle=self.pool.get_idle_size(),
+            acquired=self.acquired,
+            waiters=self.waiters,
+            acquisitions=self.acquisitions,
+            acquire_wait_seconds=self.acquire_wait_seconds,
+        )
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[asyncpg.Connection]:
+        """Yields the connection of the enclosing unit of work.
+
+        Outside of one a connection is taken from the pool and becomes the
+        current connection, so model and service functions called inside the
+        block share it instead of acquiring their own.
         """
-        update_query = """
-        UPDATE foremen
-        SET full_name = $1, gender = $2, workshop = $3, phone_number = $4, password_hash = $5
-        WHERE foreman_id = $6;
+        connection = current_connection.get()
+        if connection is not None:
+            yield connection
+            return
+        self.waiters += 1
+        started_at = time.perf_counter()
+        try:
+            connection = await self.pool.acquire()
+        finally:
+            self.waiters -= 1
+        self.acquisitions += 1
+        self.acquire_wait_seconds += time.perf_counter() - started_at
+        self.acquired += 1
+        token = current_connection.set(connection)
+        try:
+            yield connection
+        finally:
+            current_connection.reset(token)
+            self.acquired -= 1
+            await self.pool.release(connection)
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[asyncpg.Connection]:
+        """Unit of work: one connection and one transaction for the block.
+
+        Nested calls reuse the connection and become savepoints.
         """
-        insert_query = """
-        INSERT INTO foremen (full_name, gender, workshop, phone_number, password_hash)
-        VALUES ($1, $2, $3, $4, $5);
+        async with self.connection() as connection:
+            async with connection.transaction():
+                yield connection
+
+    async def fetch(self, statement: Statement, *args) -> list[asyncpg.Record]:
+        return await self.run_query(statement, "fetch", args)
+
+    async def fetchrow(self, statement: Statement, *args) -> asyncpg.Record | None:
+        return await self.run_query(statement, "fetchrow", args)
+
+    async def fetchval(self, statement: Statement, *args):
+        return await self.run_query(statement, "fetchval", args)
+
+    async def execute(self, statement: Statement, *args) -> str:
+        return await self.run_query(statement, "execute", args)
+
+    async def run_query(self, statement: Statement, method: str, args: Sequence):
+        """Runs a statement on the current connection and records its timing.
+
+        The statement name identifies it in metrics and in the slow-query
+        log, so it should be stable, e.g. "technician_tasks.by_id".
+        Registered statements are already prepared on pool connections.
         """
+        name = statement.name
+        async with self.connection() as connection:
+            started = time.perf_counter()
+            try:
+                result = await getattr(connection, method)(statement.sql, *args)
+            except BaseException:
+                self.observe_query(name, time.perf_counter() - started, 0)
+                raise
+            elapsed = time.perf_counter() - started
+            rows = row_count(method, result)
+            self.observe_query(name, elapsed, rows)
+            threshold = config.postgresql.SLOW_QUERY_THRESHOLD_MS
+            if threshold is not None and elapsed * 1000 >= threshold:
+                await self.log_slow_query(connection, statement, args, elapsed, rows)
+            return result
 
-        async with self.pool.acquire() as connection:
-            existing = await connection.fetchrow(
-                query,
-                phone_number_variants(DEFAULT_FOREMAN["phone_number"]),
-            )
-            password_hash_value = existing["password_hash"] if existing else None
-            has_expected_password = existing and verify_password(
-                DEFAULT_FOREMAN["password"],
-                password_hash_value,
-            )
-
-            hashed_password = (
-                password_hash_value
-                if has_expected_password
-                else hash_password(DEFAULT_FOREMAN["password"])
-            )
-            if existing:
-                await connection.execute(
-                    update_query,
-                    DEFAULT_FOREMAN["full_name"],
-                    DEFAULT_FOREMAN["gender"],
-                    DEFAULT_FOREMAN["workshop"],
-                    DEFAULT_FOREMAN["phone_number"],
-                    hashed_password,
-                    existing["foreman_id"],
-                )
-                return
-
-            await connection.execute(
-                insert_query,
-                DEFAULT_FOREMAN["full_name"],
-                DEFAULT_FOREMAN["gender"],
-                DEFAULT_FOREMAN["workshop"],
-                DEFAULT_FOREMAN["phone_number"],
-                hashed_password,
-            )
+    def observe_query(self, name: str, seconds: float, rows: int) -> None:
+        for observer in self.query_observers:
+            observer(name, seconds, rows)
+
+    async def log_slow_query(
+        self,
+        connection: asyncpg.Connection,
+        statement: Statement,
+        args: Sequence,
+        seconds: float,
+        rows: int,
+    ) -> None:
+        query = " ".join(statement.sql.split())
+        plan = ""
+        if config.postgresql.SLOW_QUERY_EXPLAIN and query.upper().startswith(
+            EXPLAINABLE_STATEMENTS
+        ):
+            try:
+                # A savepoint keeps a failing EXPLAIN from aborting the
+                # caller's transaction.
+                async with connection.transaction():
+                    lines = await connection.fetch(f"EXPLAIN {statement.sql}", *args)
+                plan = "\n" + "\n".join(line[0] for line in lines)
+            except asyncpg.PostgresError as exc:
+                plan = f"\nEXPLAIN failed: {exc}"
+        logger.warning(
+            "Slow query %s took %.1f ms and returned %d rows: %s params=%s%s",
+            statement.name,
+            seconds * 1000,
+            rows,
+            query,
+            params_shape(args),
+            plan,
+        )
+
+    async def check_schema(self) -> None:
+        """Checks the database on a separate connection before the pool opens.
+
+        Migrations are applied by `python src/migrate.py upgrade`; workers
+        only verify that it has been run and that every registered statement
+        still parses, since pool connections prepare them all when opened.
+        """
+        settings = config.postgresql
+        connection = await asyncpg.connect(
+            self.url,
+            command_timeout=settings.COMMAND_TIMEOUT,
+            server_settings={"application_name": settings.APPLICATION_NAME},
+        )
+        try:
+            for statement in settings.INIT_STATEMENTS:
+                await connection.execute(statement)
+            await check_schema_version(connection, MIGRATIONS)
+            await statements.check(connection)
+        finally:
+            await connection.close()
+
+    async def connect(self):
+        await self.check_schema()
+        settings = config.postgresql
+        min_size, max_size = pool_size_limits()
+        logger.info(
+            "Connection pool of %d-%d connections in each of %d workers",
+            min_size,
+            max_size,
+            config.startup.worker_count(),
+        )
+        self.pool = await asyncpg.create_pool(
+            self.url,
+            min_size=min_size,
+            max_size=max_size,
+            max_queries=settings.POOL_MAX_QUERIES,
+            max_inactive_connection_lifetime=(
+                settings.POOL_MAX_INACTIVE_CONNECTION_LIFETIME
+            ),
+            command_timeout=settings.COMMAND_TIMEOUT,
+            statement_cache_size=settings.STATEMENT_CACHE_SIZE,
+            max_cached_statement_lifetime=settings.MAX_CACHED_STATEMENT_LIFETIME,
+            server_settings={"application_name": settings.APPLICATION_NAME},
+            init=self.init_connection,
+        )
+
+    async def disconnect(self):
+        await self.pool.close()
 
 
 database = Postgresql(
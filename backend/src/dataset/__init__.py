@@ -0,0 +1,9 @@
+__all__ = [
+    "DatasetGenerator",
+    "DatasetSpec",
+    "DatasetStats",
+    "load_dataset",
+]
+
+from dataset.generator import DatasetGenerator, DatasetSpec
+from dataset.loader import DatasetStats, load_dataset
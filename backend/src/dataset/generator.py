@@ -0,0 +1,264 @@
+import random
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from services.phone import is_valid_phone_number
+
+
+DEFAULT_END_DATE = date(2026, 1, 1)
+
+MALE_FIRST_NAMES = [
+    "Александр", "Алексей", "Андрей", "Антон", "Артём", "Борис", "Вадим",
+    "Василий", "Виктор", "Владимир", "Дмитрий", "Евгений", "Иван", "Игорь",
+    "Илья", "Кирилл", "Константин", "Максим", "Михаил", "Николай", "Олег",
+    "Павел", "Пётр", "Роман", "Сергей", "Степан", "Юрий",
+]
+FEMALE_FIRST_NAMES = [
+    "Александра", "Алина", "Анастасия", "Анна", "Валентина", "Вера",
+    "Галина", "Дарья", "Екатерина", "Елена", "Ирина", "Ксения", "Людмила",
+    "Марина", "Мария", "Надежда", "Наталья", "Ольга", "Светлана", "Татьяна",
+    "Юлия",
+]
+# Masculine patronymics without the final -ч; feminine ones end in -вна.
+PATRONYMIC_STEMS = [
+    "Александрови", "Алексееви", "Андрееви", "Борисови", "Васильеви",
+    "Викторови", "Владимирови", "Дмитриеви", "Евгеньеви", "Иванови",
+    "Игореви", "Кириллови", "Максимови", "Михайлови", "Николаеви",
+    "Олегови", "Павлови", "Петрови", "Романови", "Сергееви", "Юрьеви",
+]
+# All end in -ов/-ев/-ин, whose feminine form adds -а.
+SURNAMES = [
+    "Андреев", "Алексеев", "Беляев", "Богданов", "Борисов", "Васильев",
+    "Виноградов", "Волков", "Воробьёв", "Гусев", "Егоров", "Зайцев",
+    "Иванов", "Ильин", "Казаков", "Киселёв", "Козлов", "Комаров",
+    "Кузнецов", "Лебедев", "Макаров", "Медведев", "Морозов", "Никитин",
+    "Никифоров", "Новиков", "Орлов", "Павлов", "Петров", "Попов",
+    "Романов", "Семёнов", "Сидоров", "Смирнов", "Соколов", "Соловьёв",
+    "Степанов", "Тарасов", "Титов", "Фёдоров", "Фомин", "Фролов",
+    "Чернов", "Шарапов", "Яковлев",
+]
+SPECIALIZATIONS = [
+    "Слесарь", "Электрик", "Сварщик", "Наладчик", "Токарь", "Фрезеровщик",
+    "Механик", "Слесарь КИПиА", "Электромонтёр", "Оператор станков с ЧПУ",
+]
+TASK_ACTIONS = [
+    "Проверить", "Заменить", "Отремонтировать", "Смазать", "Откалибровать",
+    "Очистить", "Настроить", "Осмотреть",
+]
+TASK_EQUIPMENT = [
+    "насос", "компрессор", "конвейер", "токарный станок", "фрезерный станок",
+    "гидравлический пресс", "электродвигатель", "вентиляцию", "кран-балку",
+    "щит управления", "подшипниковый узел", "систему охлаждения",
+    "датчики давления", "сварочный аппарат",
+]
+TASK_DURATIONS_MINUTES = [30, 60, 90, 120, 180, 240, 480]
+
+NOT_STARTED, IN_PROGRESS, DONE, CANCELLED = (
+    "Не выполнено",
+    "В процессе",
+    "Выполнено",
+    "Отменено",
+)
+RECENT_STATUS_WEIGHTS = {NOT_STARTED: 45, IN_PROGRESS: 35, DONE: 17, CANCELLED: 3}
+OLD_STATUS_WEIGHTS = {NOT_STARTED: 8, IN_PROGRESS: 4, DONE: 80, CANCELLED: 8}
+RECENT_TASK_DAYS = 14
+RECENT_NOTIFICATION_DAYS = 3
+
+FOREMAN_COLUMNS = [
+    "foreman_id", "full_name", "gender", "workshop", "phone_number", "password_hash",
+]
+TECHNICIAN_COLUMNS = [
+    "technician_id", "specialization", "full_name", "gender", "phone_number",
+    "password_hash",
+]
+TASK_COLUMNS = [
+    "task_id", "start_time", "end_time", "workshop", "foreman_id", "technician_id",
+    "task_description", "status", "important",
+]
+NOTIFICATION_COLUMNS = [
+    "recipient_role", "recipient_id", "task_id", "message", "is_read", "created_at",
+]
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    foremen: int = 200
+    technicians: int = 5000
+    tasks: int = 1_000_000
+    workshops: int = 20
+    days: int = 365
+    end_date: date = DEFAULT_END_DATE
+    seed: int = 1
+    password: str = "user123"
+    batch_size: int = 50_000
+
+    def validate(self) -> None:
+        if min(self.foremen, self.technicians, self.workshops, self.days) < 1:
+            raise ValueError("foremen, technicians, workshops and days must be positive")
+        if self.workshops > min(self.foremen, self.technicians):
+            raise ValueError(
+                "every workshop needs a foreman and a technician: "
+                "workshops must not exceed foremen or technicians"
+            )
+        if self.tasks < 0 or self.batch_size < 1:
+            raise ValueError("tasks must not be negative and batch_size must be positive")
+
+
+def workshop_name(index: int) -> str:
+    return f"Цех {index + 1}"
+
+
+def phone_number(kind: int, user_id: int) -> str:
+    """Returns +79<kind><8-digit id>, unique per table as long as ids are."""
+    phone = f"+79{kind}{user_id:08d}"
+    if not is_valid_phone_number(phone):
+        raise ValueError(f"Cannot build a phone number for id {user_id}")
+    return phone
+
+
+class DatasetGenerator:
+    """Deterministic rows for a scale-test dataset.
+
+    The same spec and the same first ids always produce the same rows, so
+    datasets loaded into empty databases are identical. Rows come out in
+    the column order of the *_COLUMNS lists, ready for COPY.
+    """
+
+    def __init__(self, spec: DatasetSpec) -> None:
+        spec.validate()
+        self.spec = spec
+        self.rng = random.Random(spec.seed)
+        self.period_start = datetime.combine(spec.end_date, datetime.min.time()) - timedelta(
+            days=spec.days
+        )
+        self.foremen_by_workshop: list[list[int]] = [[] for _ in range(spec.workshops)]
+        self.technicians_by_workshop: list[list[int]] = [
+            [] for _ in range(spec.workshops)
+        ]
+
+    def full_name(self) -> tuple[str, str]:
+        rng = self.rng
+        stem = rng.choice(PATRONYMIC_STEMS)
+        if rng.random() < 0.7:
+            first_name = rng.choice(MALE_FIRST_NAMES)
+            surname = rng.choice(SURNAMES)
+            patronymic = stem + "ч"
+            gender = "М"
+        else:
+            first_name = rng.choice(FEMALE_FIRST_NAMES)
+            surname = rng.choice(SURNAMES) + "а"
+            patronymic = stem[:-1] + "на"
+            gender = "Ж"
+        return f"{surname} {first_name} {patronymic}", gender
+
+    def foremen(self, first_id: int, password_hash: str) -> list[tuple]:
+        rows = []
+        for index in range(self.spec.foremen):
+            foreman_id = first_id + index
+            workshop = index % self.spec.workshops
+            self.foremen_by_workshop[workshop].append(foreman_id)
+            full_name, gender = self.full_name()
+            rows.append(
+                (
+                    foreman_id,
+                    full_name,
+                    gender,
+                    workshop_name(workshop),
+                    phone_number(8, foreman_id),
+                    password_hash,
+                )
+            )
+        return rows
+
+    def technicians(self, first_id: int, password_hash: str) -> list[tuple]:
+        rows = []
+        for index in range(self.spec.technicians):
+            technician_id = first_id + index
+            self.technicians_by_workshop[index % self.spec.workshops].append(
+                technician_id
+            )
+            full_name, gender = self.full_name()
+            rows.append(
+                (
+                    technician_id,
+                    self.rng.choice(SPECIALIZATIONS),
+                    full_name,
+                    gender,
+                    phone_number(7, technician_id),
+                    password_hash,
+                )
+            )
+        return rows
+
+    def task_batches(
+        self, first_id: int
+    ) -> Iterator[tuple[list[tuple], list[tuple]]]:
+        """Yields (tasks, notifications) in batches of spec.batch_size tasks.
+
+        Call after foremen() and technicians(). Every task gets the
+        assignment notification of its technician; tasks that have left
+        "Не выполнено" also get the status notification of their foreman.
+        """
+        rng = self.rng
+        spec = self.spec
+        for batch_start in range(0, spec.tasks, spec.batch_size):
+            tasks = []
+            notifications = []
+            for task_id in range(
+                first_id + batch_start,
+                first_id + min(batch_start + spec.batch_size, spec.tasks),
+            ):
+                workshop = rng.randrange(spec.workshops)
+                foreman_id = rng.choice(self.foremen_by_workshop[workshop])
+                technician_id = rng.choice(self.technicians_by_workshop[workshop])
+                day = rng.randrange(spec.days)
+                start_time = self.period_start + timedelta(
+                    days=day, hours=rng.randint(7, 17), minutes=rng.choice((0, 15, 30, 45))
+                )
+                end_time = start_time + timedelta(
+                    minutes=rng.choice(TASK_DURATIONS_MINUTES)
+                )
+                age_days = spec.days - day
+                weights = (
+                    RECENT_STATUS_WEIGHTS
+                    if age_days <= RECENT_TASK_DAYS
+                    else OLD_STATUS_WEIGHTS
+                )
+                [status] = rng.choices(list(weights), list(weights.values()))
+                tasks.append(
+                    (
+                        task_id,
+                        start_time,
+                        end_time,
+                        workshop_name(workshop),
+                        foreman_id,
+                        technician_id,
+                        f"{rng.choice(TASK_ACTIONS)} {rng.choice(TASK_EQUIPMENT)}",
+                        status,
+                        rng.random() < 0.1,
+                    )
+                )
+                recent = age_days <= RECENT_NOTIFICATION_DAYS
+                notifications.append(
+                    (
+                        "technician",
+                        technician_id,
+                        task_id,
+                        f"Вам назначена задача №{task_id}",
+                        not recent or rng.random() < 0.5,
+                        start_time - timedelta(hours=rng.randint(1, 72)),
+                    )
+                )
+                if status != NOT_STARTED:
+                    notifications.append(
+                        (
+                            "foreman",
+                            foreman_id,
+                            task_id,
+                            f"Статус задачи №{task_id} изменён на '{status}'",
+                            not recent or rng.random() < 0.3,
+                            end_time,
+                        )
+                    )
+            yield tasks, notifications
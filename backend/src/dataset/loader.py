@@ -0,0 +1,124 @@
+import logging
+import time
+from dataclasses import dataclass
+
+import asyncpg
+
+from database import database
+from dataset.generator import (
+    FOREMAN_COLUMNS,
+    NOTIFICATION_COLUMNS,
+    TASK_COLUMNS,
+    TECHNICIAN_COLUMNS,
+    DatasetGenerator,
+    DatasetSpec,
+)
+from services.passwords import hash_password_async
+from services.reference_cache import FOREMEN, TECHNICIANS, reference_cache
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DatasetStats:
+    foremen: int
+    technicians: int
+    tasks: int
+    notifications: int
+    seconds: float
+
+
+async def reserve_ids(
+    connection: asyncpg.Connection, table: str, column: str, count: int
+) -> int:
+    """Takes count consecutive values of the column's serial sequence.
+
+    Returns the first one. The caller must hold a lock that blocks other
+    inserts into the table, or their ids could land inside the block.
+    """
+    sequence = await connection.fetchval(
+        "SELECT pg_get_serial_sequence($1, $2);", table, column
+    )
+    first_id = await connection.fetchval("SELECT nextval($1::regclass);", sequence)
+    if count > 1:
+        await connection.execute(
+            "SELECT setval($1::regclass, $2);", sequence, first_id + count - 1
+        )
+    return first_id
+
+
+async def load_dataset(spec: DatasetSpec) -> DatasetStats:
+    """Generates the dataset and loads it with COPY in one transaction.
+
+    Ids are reserved up front, so notifications can reference tasks without
+    reading them back. Every account gets the same password, hashed once.
+    """
+    started = time.perf_counter()
+    generator = DatasetGenerator(spec)
+    password_hash = await hash_password_async(spec.password)
+    notification_count = 0
+
+    async with database.transaction() as connection:
+        await connection.execute(
+            """
+            LOCK TABLE foremen, technicians, technician_tasks
+            IN SHARE ROW EXCLUSIVE MODE;
+            """
+        )
+        first_foreman_id = await reserve_ids(
+            connection, "foremen", "foreman_id", spec.foremen
+        )
+        first_technician_id = await reserve_ids(
+            connection, "technicians", "technician_id", spec.technicians
+        )
+        first_task_id = await reserve_ids(
+            connection, "technician_tasks", "task_id", spec.tasks
+        )
+
+        await connection.copy_records_to_table(
+            "foremen",
+            records=generator.foremen(first_foreman_id, password_hash),
+            columns=FOREMAN_COLUMNS,
+        )
+        await connection.copy_records_to_table(
+            "technicians",
+            records=generator.technicians(first_technician_id, password_hash),
+            columns=TECHNICIAN_COLUMNS,
+        )
+        logger.info(
+            "Loaded %d foremen and %d technicians", spec.foremen, spec.technicians
+        )
+
+        task_count = 0
+        for tasks, notifications in generator.task_batches(first_task_id):
+            await connection.copy_records_to_table(
+                "technician_tasks", records=tasks, columns=TASK_COLUMNS
+            )
+            await connection.copy_records_to_table(
+                "notifications", records=notifications, columns=NOTIFICATION_COLUMNS
+            )
+            task_count += len(tasks)
+            notification_count += len(notifications)
+            logger.info(
+                "Loaded %d/%d tasks, %d notifications",
+                task_count,
+                spec.tasks,
+                notification_count,
+            )
+
+        await reference_cache.invalidate(FOREMEN)
+        await reference_cache.invalidate(TECHNICIANS)
+
+    async with database.connection() as connection:
+        await connection.execute(
+            "ANALYZE foremen, technicians, technician_tasks, notifications, notification_counters;"
+        )
+
+    return DatasetStats(
+        foremen=spec.foremen,
+        technicians=spec.technicians,
+        tasks=spec.tasks,
+        notifications=notification_count,
+        seconds=round(time.perf_counter() - started, 1),
+    )
@@ -46,6 +46,14 @@ class ErrorCode(StrEnum):
     INVALID_WORKSHOP_OR_SPECIALIZATION = "INVALID_WORKSHOP_OR_SPECIALIZATION"
     INVALID_FILTER_PARAMS = "INVALID_FILTER_PARAMS"
     FILTER_FORBIDDEN = "FILTER_FORBIDDEN"
+    INVALID_PAGINATION_PARAMS = "INVALID_PAGINATION_PARAMS"
+    INVALID_NOTIFICATION_SELECTION = "INVALID_NOTIFICATION_SELECTION"
+    INVALID_TASK_BATCH = "INVALID_TASK_BATCH"
+    AUTH_SERVICE_BUSY = "AUTH_SERVICE_BUSY"
+    TOO_MANY_LOGIN_ATTEMPTS = "TOO_MANY_LOGIN_ATTEMPTS"
+    INVALID_REFRESH_TOKEN = "INVALID_REFRESH_TOKEN"
+    INVALID_SYNC_WATERMARK = "INVALID_SYNC_WATERMARK"
+    SYNC_RESET_REQUIRED = "SYNC_RESET_REQUIRED"
     LOCAL_MESSAGE_MISSING = "LOCAL_MESSAGE_MISSING"
     LOCAL_MESSAGE_INCORRECT = "LOCAL_MESSAGE_INCORRECT"
 
@@ -90,6 +98,14 @@ ERROR_MESSAGES: dict[ErrorCode, str] = {
     ErrorCode.INVALID_WORKSHOP_OR_SPECIALIZATION: "Некорректно указаны цех или специализация",
     ErrorCode.INVALID_FILTER_PARAMS: "Указаны некорректные параметры фильтрации",
     ErrorCode.FILTER_FORBIDDEN: "У вас нет прав на использование данного фильтра",
+    ErrorCode.INVALID_PAGINATION_PARAMS: "Указаны некорректные параметры постраничного вывода",
+    ErrorCode.INVALID_NOTIFICATION_SELECTION: "Укажите, какие уведомления отметить прочитанными",
+    ErrorCode.INVALID_TASK_BATCH: "Недопустимое количество задач в пакете",
+    ErrorCode.AUTH_SERVICE_BUSY: "Сервис авторизации перегружен, повторите попытку позже",
+    ErrorCode.TOO_MANY_LOGIN_ATTEMPTS: "Слишком много попыток входа, повторите попытку позже",
+    ErrorCode.INVALID_REFRESH_TOKEN: "Сессия истекла, войдите в систему заново",
+    ErrorCode.INVALID_SYNC_WATERMARK: "Указана некорректная отметка синхронизации",
+    ErrorCode.SYNC_RESET_REQUIRED: "Данные синхронизации устарели, загрузите список задач заново",
     ErrorCode.LOCAL_MESSAGE_MISSING: "Сообщение о результате операции не отображено",
     ErrorCode.LOCAL_MESSAGE_INCORRECT: "Отображено некорректное сообщение о результате операции",
 }
@@ -104,6 +120,7 @@ ERROR_STATUS: dict[ErrorCode, int] = {
     ErrorCode.PROFILE_NOT_FOUND: status.HTTP_404_NOT_FOUND,
     ErrorCode.UNAUTHORIZED: status.HTTP_401_UNAUTHORIZED,
     ErrorCode.INVALID_CURRENT_USER: status.HTTP_401_UNAUTHORIZED,
+    ErrorCode.INVALID_REFRESH_TOKEN: status.HTTP_401_UNAUTHORIZED,
     ErrorCode.UNKNOWN_USER_ROLE: status.HTTP_401_UNAUTHORIZED,
     ErrorCode.TASK_STATUS_UNAUTHORIZED: status.HTTP_401_UNAUTHORIZED,
     ErrorCode.TASK_CREATE_FORBIDDEN: status.HTTP_403_FORBIDDEN,
@@ -115,6 +132,9 @@ ERROR_STATUS: dict[ErrorCode, int] = {
     ErrorCode.TASK_NOT_ASSIGNED_TO_USER: status.HTTP_403_FORBIDDEN,
     ErrorCode.PROFILE_EDIT_FOREIGN: status.HTTP_403_FORBIDDEN,
     ErrorCode.FILTER_FORBIDDEN: status.HTTP_403_FORBIDDEN,
+    ErrorCode.AUTH_SERVICE_BUSY: status.HTTP_503_SERVICE_UNAVAILABLE,
+    ErrorCode.SYNC_RESET_REQUIRED: status.HTTP_410_GONE,
+    ErrorCode.TOO_MANY_LOGIN_ATTEMPTS: status.HTTP_429_TOO_MANY_REQUESTS,
 }
 
 
@@ -180,6 +200,12 @@ def validation_error_code(exc: RequestValidationError) -> ErrorCode:
         return ErrorCode.INVALID_TASK_PRIORITY
     if "status" in all_fields:
         return ErrorCode.INVALID_TASK_STATUS
+    if "limit" in all_fields or "cursor" in all_fields:
+        return ErrorCode.INVALID_PAGINATION_PARAMS
+    if "since" in all_fields:
+        return ErrorCode.INVALID_SYNC_WATERMARK
+    if {"notification_ids", "up_to_id", "up_to"} & all_fields:
+        return ErrorCode.INVALID_NOTIFICATION_SELECTION
     return ErrorCode.REQUIRED_FIELDS_MISSING
 
 
@@ -0,0 +1,78 @@
+import argparse
+import asyncio
+import logging
+from datetime import date
+
+from database import database
+from dataset import DatasetSpec, load_dataset
+
+
+async def generate(spec: DatasetSpec) -> None:
+    await database.connect()
+    try:
+        stats = await load_dataset(spec)
+    finally:
+        await database.disconnect()
+    print(
+        f"Loaded {stats.foremen} foremen, {stats.technicians} technicians, "
+        f"{stats.tasks} tasks and {stats.notifications} notifications "
+        f"in {stats.seconds}s"
+    )
+
+
+def main() -> None:
+    defaults = DatasetSpec()
+    parser = argparse.ArgumentParser(
+        description="Load a deterministic synthetic dataset for scale testing"
+    )
+    parser.add_argument("--foremen", type=int, default=defaults.foremen)
+    parser.add_argument("--technicians", type=int, default=defaults.technicians)
+    parser.add_argument("--tasks", type=int, default=defaults.tasks)
+    parser.add_argument("--workshops", type=int, default=defaults.workshops)
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=defaults.days,
+        help="length of the period task start times fall into",
+    )
+    parser.add_argument(
+        "--end-date",
+        type=date.fromisoformat,
+        default=defaults.end_date,
+        help="last day of the period, YYYY-MM-DD",
+    )
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument(
+        "--password",
+        default=defaults.password,
+        help="password of every generated account",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=defaults.batch_size,
+        help="tasks per COPY batch",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    spec = DatasetSpec(
+        foremen=args.foremen,
+        technicians=args.technicians,
+        tasks=args.tasks,
+        workshops=args.workshops,
+        days=args.days,
+        end_date=args.end_date,
+        seed=args.seed,
+        password=args.password,
+        batch_size=args.batch_size,
+    )
+    try:
+        spec.validate()
+    except ValueError as exc:
+        parser.error(str(exc))
+    asyncio.run(generate(spec))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
+import logging
+import os
+
 from config import config
 import uvicorn
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi import HTTPException
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
@@ -15,21 +18,66 @@ from errors import (
 from routes import (
     auth_router,
     foremen_router,
+    metrics_router,
     notifications_router,
     technician_tasks_router,
     technicians_router,
 )
 from database import database
+from models import technician_tasks
+from services import notifications
+from services.auth import delete_expired_refresh_tokens
+from services.background import background_jobs
+from services.metrics import MetricsMiddleware, track_in_flight
+from services.notification_events import notification_broker
+from services.rate_limit import login_rate_limiter
+
+
+# uvicorn configures only its own loggers; every worker imports this module.
+logging.basicConfig(level=logging.INFO, format="%(levelname)s:     %(message)s")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await database.connect()
+    await notification_broker.start(database.url)
+    if config.notifications.RETENTION_ENABLED:
+        background_jobs.schedule(
+            "notification-retention",
+            config.notifications.RETENTION_INTERVAL_SECONDS,
+            notifications.run_notification_retention,
+        )
+    background_jobs.schedule(
+        "unread-counter-reconciliation",
+        config.notifications.UNREAD_COUNTER_RECONCILE_SECONDS,
+        notifications.reconcile_unread_counters,
+    )
+    background_jobs.schedule(
+        "refresh-token-cleanup",
+        config.jwt.REFRESH_TOKEN_CLEANUP_INTERVAL_SECONDS,
+        delete_expired_refresh_tokens,
+    )
+    if config.login_rate_limit.ENABLED:
+        background_jobs.schedule(
+            "login-rate-limit-cleanup",
+            config.login_rate_limit.CLEANUP_INTERVAL_SECONDS,
+            login_rate_limiter.delete_refilled_buckets,
+        )
+    background_jobs.schedule(
+        "task-tombstone-cleanup",
+        config.sync.TOMBSTONE_CLEANUP_INTERVAL_SECONDS,
+        technician_tasks.delete_expired_task_tombstones,
+    )
     yield
+    await background_jobs.stop()
+    await notification_broker.stop()
     await database.disconnect()
 
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(
+    lifespan=lifespan,
+    dependencies=[Depends(track_in_flight)] if config.metrics.ENABLED else None,
+)
 app.add_exception_handler(AppError, app_error_handler)
 app.add_exception_handler(HTTPException, http_exception_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
@@ -50,10 +98,44 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-if __name__ == "__main__":
+if config.metrics.ENABLED:
+    app.include_router(metrics_router)
+    # Outermost, so the latency includes every other middleware.
+    app.add_middleware(MetricsMiddleware)
+
+
+def run() -> None:
+    settings = config.startup
+    if settings.MODE != "production":
+        uvicorn.run(
+            "main:app",
+            host=settings.HOST,
+            port=settings.PORT,
+            reload=settings.RELOAD,
+            proxy_headers=True,
+            forwarded_allow_ips=settings.FORWARDED_ALLOW_IPS,
+        )
+        return
+
+    workers = settings.worker_count()
+    # Worker processes re-read the config, so they size their pools for the
+    # same number of workers.
+    os.environ["APP_CONFIG__STARTUP__WORKERS"] = str(workers)
     uvicorn.run(
         "main:app",
-        host=config.startup.HOST,
-        port=config.startup.PORT,
-        reload=config.startup.RELOAD,
+        host=settings.HOST,
+        port=settings.PORT,
+        workers=workers,
+        loop=settings.LOOP,
+        http=settings.HTTP,
+        backlog=settings.BACKLOG,
+        timeout_keep_alive=settings.TIMEOUT_KEEP_ALIVE,
+        timeout_graceful_shutdown=settings.TIMEOUT_GRACEFUL_SHUTDOWN,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.FORWARDED_ALLOW_IPS,
+        access_log=settings.ACCESS_LOG,
     )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,60 @@
+import argparse
+import asyncio
+import logging
+
+import asyncpg
+
+from database import database
+from migrations import (
+    MIGRATIONS,
+    apply_migrations,
+    current_version,
+    latest_version,
+)
+
+
+async def upgrade(target: int | None) -> None:
+    connection = await asyncpg.connect(database.url)
+    try:
+        applied = await apply_migrations(connection, MIGRATIONS, target)
+        version = await current_version(connection)
+    finally:
+        await connection.close()
+    if applied:
+        print(f"Applied {len(applied)} migration(s); schema is at version {version}")
+    else:
+        print(f"Schema is up to date at version {version}")
+
+
+async def status() -> None:
+    connection = await asyncpg.connect(database.url)
+    try:
+        version = await current_version(connection)
+    finally:
+        await connection.close()
+    print(f"Current version: {version}")
+    print(f"Latest version: {latest_version(MIGRATIONS)}")
+    for migration in MIGRATIONS:
+        state = "applied" if migration.version <= version else "pending"
+        print(f"  {migration.version:04d} {migration.name} [{state}]")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Database schema migrations")
+    commands = parser.add_subparsers(dest="command", required=True)
+    upgrade_parser = commands.add_parser("upgrade", help="apply pending migrations")
+    upgrade_parser.add_argument(
+        "--target", type=int, help="stop after this version"
+    )
+    commands.add_parser("status", help="show applied and pending migrations")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.command == "upgrade":
+        asyncio.run(upgrade(args.target))
+    else:
+        asyncio.run(status())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+__all__ = [
+    "MIGRATIONS",
+    "Migration",
+    "SchemaVersionError",
+    "apply_migrations",
+    "check_schema_version",
+    "current_version",
+    "latest_version",
+]
+
+from migrations.runner import (
+    Migration,
+    SchemaVersionError,
+    apply_migrations,
+    check_schema_version,
+    current_version,
+    latest_version,
+)
+from migrations.versions import MIGRATIONS
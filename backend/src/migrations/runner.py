@@ -0,0 +1,107 @@
+import logging
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
+
+import asyncpg
+
+
+# Arbitrary key shared by every process that may run migrations.
+MIGRATIONS_LOCK_KEY = 727_001
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    upgrade: Callable[[asyncpg.Connection], Awaitable[None]]
+    # CREATE INDEX CONCURRENTLY and similar cannot run inside a transaction.
+    transactional: bool = True
+
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+
+CREATE_SCHEMA_VERSION_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+"""
+
+
+def latest_version(migrations: Sequence[Migration]) -> int:
+    return max((migration.version for migration in migrations), default=0)
+
+
+async def current_version(connection: asyncpg.Connection) -> int:
+    try:
+        return await connection.fetchval(
+            "SELECT COALESCE(MAX(version), 0) FROM schema_version;"
+        )
+    except asyncpg.UndefinedTableError:
+        return 0
+
+
+async def check_schema_version(
+    connection: asyncpg.Connection, migrations: Sequence[Migration]
+) -> None:
+    """Refuses to serve a database that is behind this code."""
+    version = await current_version(connection)
+    expected = latest_version(migrations)
+    if version < expected:
+        raise SchemaVersionError(
+            f"Database schema is at version {version}, expected {expected}; "
+            "run `python src/migrate.py upgrade`"
+        )
+    if version > expected:
+        logger.warning(
+            "Database schema version %s is newer than this code (%s)",
+            version,
+            expected,
+        )
+
+
+async def apply_migrations(
+    connection: asyncpg.Connection,
+    migrations: Sequence[Migration],
+    target: int | None = None,
+) -> list[Migration]:
+    """Applies pending migrations up to target and returns the ones applied.
+
+    A session advisory lock serialises concurrent runners, so a deploy that
+    starts several copies applies each migration exactly once.
+    """
+    await connection.execute("SELECT pg_advisory_lock($1);", MIGRATIONS_LOCK_KEY)
+    try:
+        await connection.execute(CREATE_SCHEMA_VERSION_TABLE)
+        version = await current_version(connection)
+        pending = [
+            migration
+            for migration in sorted(migrations, key=lambda item: item.version)
+            if version < migration.version
+            and (target is None or migration.version <= target)
+        ]
+        for migration in pending:
+            logger.info("Applying migration %s %s", migration.version, migration.name)
+            if migration.transactional:
+                async with connection.transaction():
+                    await migration.upgrade(connection)
+                    await record_version(connection, migration)
+            else:
+                await migration.upgrade(connection)
+                await record_version(connection, migration)
+        return pending
+    finally:
+        await connection.execute("SELECT pg_advisory_unlock($1);", MIGRATIONS_LOCK_KEY)
+
+
+async def record_version(connection: asyncpg.Connection, migration: Migration) -> None:
+    await connection.execute(
+        "INSERT INTO schema_version (version, name) VALUES ($1, $2);",
+        migration.version,
+        migration.name,
+    )
@@ -0,0 +1,32 @@
+from migrations.runner import Migration
+from migrations.versions import (
+    v0001_initial_schema,
+    v0002_default_foreman,
+    v0003_task_access_indexes,
+    v0004_task_workshop_index,
+    v0005_row_versions,
+    v0006_task_change_tracking,
+    v0007_drop_task_updated_at,
+)
+
+
+# Append new migrations at the end; applied versions must never change.
+MIGRATIONS = [
+    Migration(1, "initial_schema", v0001_initial_schema.upgrade),
+    Migration(2, "default_foreman", v0002_default_foreman.upgrade),
+    Migration(
+        3,
+        "task_access_indexes",
+        v0003_task_access_indexes.upgrade,
+        transactional=False,
+    ),
+    Migration(
+        4,
+        "task_workshop_index",
+        v0004_task_workshop_index.upgrade,
+        transactional=False,
+    ),
+    Migration(5, "row_versions", v0005_row_versions.upgrade),
+    Migration(6, "task_change_tracking", v0006_task_change_tracking.upgrade),
+    Migration(7, "drop_task_updated_at", v0007_drop_task_updated_at.upgrade),
+]
@@ -0,0 +1,262 @@
+from asyncpg import Connection
+
+from services.search import CREATE_SEARCH_NORMALIZE_FUNCTION
+
+
+# The schema as it stood before versioned migrations. Every statement is
+# idempotent, so databases created by the old startup code upgrade cleanly.
+STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS foremen (
+        foreman_id SERIAL PRIMARY KEY,
+        full_name VARCHAR(100) NOT NULL,
+        gender CHAR(1) CHECK (gender IN ('М', 'Ж')) NOT NULL,
+        workshop VARCHAR(50),
+        phone_number VARCHAR(16) UNIQUE NOT NULL,
+        password_hash TEXT
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS technicians (
+        technician_id SERIAL PRIMARY KEY,
+        specialization VARCHAR(50) NOT NULL,
+        full_name VARCHAR(100) NOT NULL,
+        gender CHAR(1) CHECK (gender IN ('М', 'Ж')) NOT NULL,
+        phone_number VARCHAR(16) UNIQUE NOT NULL,
+        password_hash TEXT
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS technician_tasks (
+        task_id SERIAL PRIMARY KEY,
+        start_time TIMESTAMP NOT NULL,
+        end_time TIMESTAMP NOT NULL,
+        workshop VARCHAR(50) NOT NULL,
+        foreman_id INTEGER NOT NULL REFERENCES foremen(foreman_id),
+        technician_id INTEGER NOT NULL REFERENCES technicians(technician_id),
+        task_description VARCHAR(500) NOT NULL,
+        status VARCHAR(20) NOT NULL CHECK (status IN ('Не выполнено', 'В процессе', 'Выполнено', 'Отменено')),
+        important BOOLEAN NOT NULL DEFAULT FALSE
+    );
+    """,
+    """
+    DO $$
+    BEGIN
+        IF EXISTS (
+            SELECT 1
+            FROM information_schema.columns
+            WHERE table_name = 'technician_tasks'
+              AND column_name = 'start_time'
+              AND data_type <> 'timestamp without time zone'
+        ) THEN
+            ALTER TABLE technician_tasks
+            ALTER COLUMN start_time TYPE TIMESTAMP
+                USING TO_TIMESTAMP(start_time, 'DD.MM.YYYY HH24:MI')::TIMESTAMP,
+            ALTER COLUMN end_time TYPE TIMESTAMP
+                USING TO_TIMESTAMP(end_time, 'DD.MM.YYYY HH24:MI')::TIMESTAMP;
+        END IF;
+    END $$;
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS technician_tasks_start_time_idx
+    ON technician_tasks (start_time);
+    """,
+    """
+    CREATE EXTENSION IF NOT EXISTS pg_trgm;
+    """,
+    CREATE_SEARCH_NORMALIZE_FUNCTION,
+    """
+    CREATE INDEX IF NOT EXISTS technician_tasks_workshop_trgm_idx
+    ON technician_tasks USING GIN (search_normalize(workshop) gin_trgm_ops);
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS foremen_full_name_trgm_idx
+    ON foremen USING GIN (search_normalize(full_name) gin_trgm_ops);
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS technicians_full_name_trgm_idx
+    ON technicians USING GIN (search_normalize(full_name) gin_trgm_ops);
+    """,
+    """
+    ALTER TABLE foremen
+    ADD COLUMN IF NOT EXISTS password_hash TEXT;
+    """,
+    """
+    ALTER TABLE foremen
+    ALTER COLUMN phone_number TYPE VARCHAR(16);
+    """,
+    """
+    ALTER TABLE technicians
+    ADD COLUMN IF NOT EXISTS password_hash TEXT;
+    """,
+    """
+    ALTER TABLE technicians
+    ALTER COLUMN phone_number TYPE VARCHAR(16);
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS notifications (
+        notification_id SERIAL PRIMARY KEY,
+        recipient_role VARCHAR(20) NOT NULL CHECK (recipient_role IN ('foreman','technician')),
+        recipient_id INTEGER NOT NULL,
+        task_id INTEGER REFERENCES technician_tasks(task_id),
+        message VARCHAR(255) NOT NULL,
+        is_read BOOLEAN NOT NULL DEFAULT FALSE,
+        created_at TIMESTAMP NOT NULL DEFAULT NOW()
+    );
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS notifications_recipient_created_idx
+    ON notifications (recipient_role, recipient_id, created_at DESC, notification_id DESC);
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS notifications_read_created_idx
+    ON notifications (created_at)
+    WHERE is_read;
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS notifications_archive (
+        notification_id INTEGER PRIMARY KEY,
+        recipient_role VARCHAR(20) NOT NULL,
+        recipient_id INTEGER NOT NULL,
+        task_id INTEGER,
+        message VARCHAR(255) NOT NULL,
+        is_read BOOLEAN NOT NULL,
+        created_at TIMESTAMP NOT NULL,
+        archived_at TIMESTAMP NOT NULL DEFAULT NOW()
+    );
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS notifications_unread_recipient_idx
+    ON notifications (recipient_role, recipient_id)
+    WHERE NOT is_read;
+    """,
+    """
+    DO $$
+    BEGIN
+        IF to_regclass('notification_counters') IS NULL THEN
+            CREATE TABLE notification_counters (
+                recipient_role VARCHAR(20) NOT NULL,
+                recipient_id INTEGER NOT NULL,
+                unread_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (recipient_role, recipient_id)
+            );
+            INSERT INTO notification_counters (recipient_role, recipient_id, unread_count)
+            SELECT recipient_role, recipient_id, COUNT(*)
+            FROM notifications
+            WHERE NOT is_read
+            GROUP BY recipient_role, recipient_id;
+        END IF;
+    END $$;
+    """,
+    """
+    CREATE OR REPLACE FUNCTION update_notification_counters()
+    RETURNS TRIGGER
+    LANGUAGE plpgsql
+    AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO notification_counters AS c (recipient_role, recipient_id, unread_count)
+            SELECT recipient_role, recipient_id, COUNT(*)
+            FROM new_rows
+            WHERE NOT is_read
+            GROUP BY recipient_role, recipient_id
+            ON CONFLICT (recipient_role, recipient_id)
+            DO UPDATE SET unread_count = c.unread_count + EXCLUDED.unread_count;
+        ELSIF TG_OP = 'UPDATE' THEN
+            INSERT INTO notification_counters AS c (recipient_role, recipient_id, unread_count)
+            SELECT recipient_role, recipient_id, SUM(delta)
+            FROM (
+                SELECT recipient_role, recipient_id, 1 AS delta
+                FROM new_rows
+                WHERE NOT is_read
+                UNION ALL
+                SELECT recipient_role, recipient_id, -1 AS delta
+                FROM old_rows
+                WHERE NOT is_read
+            ) deltas
+            GROUP BY recipient_role, recipient_id
+            HAVING SUM(delta) <> 0
+            ON CONFLICT (recipient_role, recipient_id)
+            DO UPDATE SET unread_count = c.unread_count + EXCLUDED.unread_count;
+        ELSE
+            UPDATE notification_counters c
+            SET unread_count = c.unread_count - deleted.unread_count
+            FROM (
+                SELECT recipient_role, recipient_id, COUNT(*) AS unread_count
+                FROM old_rows
+                WHERE NOT is_read
+                GROUP BY recipient_role, recipient_id
+            ) deleted
+            WHERE c.recipient_role = deleted.recipient_role
+              AND c.recipient_id = deleted.recipient_id;
+        END IF;
+        RETURN NULL;
+    END $$;
+    """,
+    """
+    CREATE OR REPLACE TRIGGER notifications_counters_insert
+    AFTER INSERT ON notifications
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_notification_counters();
+    """,
+    """
+    CREATE OR REPLACE TRIGGER notifications_counters_update
+    AFTER UPDATE ON notifications
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_notification_counters();
+    """,
+    """
+    CREATE OR REPLACE TRIGGER notifications_counters_delete
+    AFTER DELETE ON notifications
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_notification_counters();
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS refresh_tokens (
+        token_hash TEXT PRIMARY KEY,
+        family_id UUID NOT NULL,
+        user_role VARCHAR(20) NOT NULL,
+        user_id INTEGER NOT NULL,
+        created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        expires_at TIMESTAMP NOT NULL,
+        revoked_at TIMESTAMP
+    );
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS refresh_tokens_family_idx
+    ON refresh_tokens (family_id);
+    """,
+    """
+    CREATE UNLOGGED TABLE IF NOT EXISTS login_rate_limits (
+        bucket_key TEXT PRIMARY KEY,
+        tokens DOUBLE PRECISION NOT NULL,
+        allowed BOOLEAN NOT NULL,
+        updated_at TIMESTAMPTZ NOT NULL
+    );
+    """,
+    """
+    UPDATE foremen f
+    SET phone_number = '+7' || SUBSTRING(f.phone_number FROM 2)
+    WHERE f.phone_number ~ '^8[0-9]{10}$'
+      AND NOT EXISTS (
+          SELECT 1
+          FROM foremen existing
+          WHERE existing.phone_number = '+7' || SUBSTRING(f.phone_number FROM 2)
+      );
+    """,
+    """
+    UPDATE technicians t
+    SET phone_number = '+7' || SUBSTRING(t.phone_number FROM 2)
+    WHERE t.phone_number ~ '^8[0-9]{10}$'
+      AND NOT EXISTS (
+          SELECT 1
+          FROM technicians existing
+          WHERE existing.phone_number = '+7' || SUBSTRING(t.phone_number FROM 2)
+      );
+    """,
+]
+
+
+async def upgrade(connection: Connection) -> None:
+    for statement in STATEMENTS:
+        await connection.execute(statement)
@@ -0,0 +1,62 @@
+from asyncpg import Connection
+
+from services.passwords import hash_password, verify_password
+from services.phone import normalize_phone_number, phone_number_variants
+
+
+DEFAULT_FOREMAN = {
+    "full_name": "Данюк Кирилл Константинович",
+    "gender": "М",
+    "workshop": "Администрация",
+    "phone_number": normalize_phone_number("89000000000"),
+    "password": "user123",
+}
+
+
+async def upgrade(connection: Connection) -> None:
+    query = """
+    SELECT foreman_id, password_hash
+    FROM foremen
+    WHERE phone_number = ANY($1::TEXT[])
+    LIMIT 1;
+    """
+    update_query = """
+    UPDATE foremen
+    SET full_name = $1, gender = $2, workshop = $3, phone_number = $4, password_hash = $5
+    WHERE foreman_id = $6;
+    """
+    insert_query = """
+    INSERT INTO foremen (full_name, gender, workshop, phone_number, password_hash)
+    VALUES ($1, $2, $3, $4, $5);
+    """
+
+    existing = await connection.fetchrow(
+        query,
+        phone_number_variants(DEFAULT_FOREMAN["phone_number"]),
+    )
+    password_hash_value = existing["password_hash"] if existing else None
+    hashed_password = (
+        password_hash_value
+        if existing and verify_password(DEFAULT_FOREMAN["password"], password_hash_value)
+        else hash_password(DEFAULT_FOREMAN["password"])
+    )
+    if existing:
+        await connection.execute(
+            update_query,
+            DEFAULT_FOREMAN["full_name"],
+            DEFAULT_FOREMAN["gender"],
+            DEFAULT_FOREMAN["workshop"],
+            DEFAULT_FOREMAN["phone_number"],
+            hashed_password,
+            existing["foreman_id"],
+        )
+        return
+
+    await connection.execute(
+        insert_query,
+        DEFAULT_FOREMAN["full_name"],
+        DEFAULT_FOREMAN["gender"],
+        DEFAULT_FOREMAN["workshop"],
+        DEFAULT_FOREMAN["phone_number"],
+        hashed_password,
+    )
@@ -0,0 +1,42 @@
+from asyncpg import Connection
+
+
+# Composite indexes matching the task list access paths: each filter column
+# followed by task_id DESC, so the ORDER BY and the keyset cursor are served
+# from the same index.
+INDEXES = {
+    "technician_tasks_technician_task_idx": (
+        "ON technician_tasks (technician_id, task_id DESC)"
+    ),
+    "technician_tasks_foreman_task_idx": (
+        "ON technician_tasks (foreman_id, task_id DESC)"
+    ),
+    "technician_tasks_status_task_idx": (
+        "ON technician_tasks (status, task_id DESC)"
+    ),
+    "notifications_task_idx": "ON notifications (task_id)",
+}
+
+
+async def create_indexes(connection: Connection, indexes: dict[str, str]) -> None:
+    for name, definition in indexes.items():
+        # A failed concurrent build leaves an invalid index that IF NOT EXISTS
+        # would keep; drop it and build again.
+        is_valid = await connection.fetchval(
+            """
+            SELECT i.indisvalid
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE c.relname = $1;
+            """,
+            name,
+        )
+        if is_valid is False:
+            await connection.execute(f"DROP INDEX CONCURRENTLY {name};")
+        await connection.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition};"
+        )
+
+
+async def upgrade(connection: Connection) -> None:
+    await create_indexes(connection, INDEXES)
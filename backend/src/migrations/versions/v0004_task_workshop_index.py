@@ -0,0 +1,14 @@
+from asyncpg import Connection
+
+from migrations.versions.v0003_task_access_indexes import create_indexes
+
+
+INDEXES = {
+    "technician_tasks_workshop_status_idx": (
+        "ON technician_tasks (workshop, status)"
+    ),
+}
+
+
+async def upgrade(connection: Connection) -> None:
+    await create_indexes(connection, INDEXES)
@@ -0,0 +1,45 @@
+from asyncpg import Connection
+
+
+# row_version is taken from one shared sequence on insert and on every
+# update, so for any set of rows MAX(row_version) grows whenever a row in it
+# changes and COUNT(*) changes when one is deleted. The pair is a cheap
+# validator for conditional GETs.
+STATEMENTS = [
+    "CREATE SEQUENCE IF NOT EXISTS row_version_seq;",
+    """
+    ALTER TABLE technician_tasks
+    ADD COLUMN IF NOT EXISTS row_version BIGINT NOT NULL
+    DEFAULT nextval('row_version_seq');
+    """,
+    """
+    ALTER TABLE notifications
+    ADD COLUMN IF NOT EXISTS row_version BIGINT NOT NULL
+    DEFAULT nextval('row_version_seq');
+    """,
+    """
+    CREATE OR REPLACE FUNCTION bump_row_version()
+    RETURNS TRIGGER
+    LANGUAGE plpgsql
+    AS $$
+    BEGIN
+        NEW.row_version := nextval('row_version_seq');
+        RETURN NEW;
+    END $$;
+    """,
+    """
+    CREATE OR REPLACE TRIGGER technician_tasks_row_version
+    BEFORE UPDATE ON technician_tasks
+    FOR EACH ROW EXECUTE FUNCTION bump_row_version();
+    """,
+    """
+    CREATE OR REPLACE TRIGGER notifications_row_version
+    BEFORE UPDATE ON notifications
+    FOR EACH ROW EXECUTE FUNCTION bump_row_version();
+    """,
+]
+
+
+async def upgrade(connection: Connection) -> None:
+    for statement in STATEMENTS:
+        await connection.execute(statement)
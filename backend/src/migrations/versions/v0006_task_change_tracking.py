@@ -0,0 +1,75 @@
+from asyncpg import Connection
+
+
+# changed_xid records the transaction that last wrote a task. A reader that
+# remembers pg_snapshot_xmin() of its snapshot can later ask for rows with
+# changed_xid >= that watermark and never miss a transaction that was still
+# in flight when it last synced.
+STATEMENTS = [
+    """
+    ALTER TABLE technician_tasks
+    ADD COLUMN IF NOT EXISTS changed_xid XID8 NOT NULL DEFAULT pg_current_xact_id(),
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP NOT NULL DEFAULT NOW();
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS technician_tasks_technician_changed_idx
+    ON technician_tasks (technician_id, changed_xid);
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS technician_task_tombstones (
+        tombstone_id BIGSERIAL PRIMARY KEY,
+        task_id INTEGER NOT NULL,
+        technician_id INTEGER,
+        foreman_id INTEGER,
+        deleted_xid XID8 NOT NULL DEFAULT pg_current_xact_id(),
+        deleted_at TIMESTAMP NOT NULL DEFAULT NOW()
+    );
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS technician_task_tombstones_technician_idx
+    ON technician_task_tombstones (technician_id, deleted_xid);
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS technician_task_tombstones_deleted_at_idx
+    ON technician_task_tombstones (deleted_at);
+    """,
+    """
+    CREATE OR REPLACE FUNCTION track_technician_task_change()
+    RETURNS TRIGGER
+    LANGUAGE plpgsql
+    AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            INSERT INTO technician_task_tombstones (task_id, technician_id, foreman_id)
+            VALUES (OLD.task_id, OLD.technician_id, OLD.foreman_id);
+            RETURN OLD;
+        END IF;
+        -- A reassigned task disappears from its previous owner's list.
+        IF OLD.technician_id IS DISTINCT FROM NEW.technician_id
+           OR OLD.foreman_id IS DISTINCT FROM NEW.foreman_id THEN
+            INSERT INTO technician_task_tombstones (task_id, technician_id, foreman_id)
+            VALUES (OLD.task_id, OLD.technician_id, OLD.foreman_id);
+        END IF;
+        NEW.row_version := nextval('row_version_seq');
+        NEW.changed_xid := pg_current_xact_id();
+        NEW.updated_at := NOW();
+        RETURN NEW;
+    END $$;
+    """,
+    "DROP TRIGGER IF EXISTS technician_tasks_row_version ON technician_tasks;",
+    """
+    CREATE OR REPLACE TRIGGER technician_tasks_track_update
+    BEFORE UPDATE ON technician_tasks
+    FOR EACH ROW EXECUTE FUNCTION track_technician_task_change();
+    """,
+    """
+    CREATE OR REPLACE TRIGGER technician_tasks_track_delete
+    AFTER DELETE ON technician_tasks
+    FOR EACH ROW EXECUTE FUNCTION track_technician_task_change();
+    """,
+]
+
+
+async def upgrade(connection: Connection) -> None:
+    for statement in STATEMENTS:
+        await connection.execute(statement)
@@ -0,0 +1,35 @@
+from asyncpg import Connection
+
+
+# technician_tasks.updated_at was maintained on every update but never read;
+# the change feed is driven by changed_xid alone.
+STATEMENTS = [
+    """
+    CREATE OR REPLACE FUNCTION track_technician_task_change()
+    RETURNS TRIGGER
+    LANGUAGE plpgsql
+    AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            INSERT INTO technician_task_tombstones (task_id, technician_id, foreman_id)
+            VALUES (OLD.task_id, OLD.technician_id, OLD.foreman_id);
+            RETURN OLD;
+        END IF;
+        -- A reassigned task disappears from its previous owner's list.
+        IF OLD.technician_id IS DISTINCT FROM NEW.technician_id
+           OR OLD.foreman_id IS DISTINCT FROM NEW.foreman_id THEN
+            INSERT INTO technician_task_tombstones (task_id, technician_id, foreman_id)
+            VALUES (OLD.task_id, OLD.technician_id, OLD.foreman_id);
+        END IF;
+        NEW.row_version := nextval('row_version_seq');
+        NEW.changed_xid := pg_current_xact_id();
+        RETURN NEW;
+    END $$;
+    """,
+    "ALTER TABLE technician_tasks DROP COLUMN IF EXISTS updated_at;",
+]
+
+
+async def upgrade(connection: Connection) -> None:
+    for statement in STATEMENTS:
+        await connection.execute(statement)
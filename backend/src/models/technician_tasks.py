@@ -1,19 +1,42 @@
+import time
 from datetime import datetime
 
+from config import config
 from database import database
 from errors import AppError, ErrorCode
-from models import foremen
+from queries import Statement
+from queries.technician_tasks import (
+    BULK_INSERT_TASKS,
+    BULK_TASK_REFERENCES,
+    DELETE_EXPIRED_TOMBSTONES,
+    INSERT_TASK,
+    SNAPSHOT_XMIN,
+    TASK_BY_ID,
+    TASK_VERSION_BY_ID,
+    UPDATE_TASK,
+    UPDATE_TASK_STATUS,
+)
 from schemas.technician_task import (
+    TASK_DATE_FORMAT,
+    BulkCreatedTask,
+    BulkItemError,
     TechnicianTask,
+    TechnicianTaskBulkResult,
+    TechnicianTaskChanges,
     TechnicianTaskCreate,
+    TechnicianTaskSummary,
     TechnicianTaskUpdate,
     TechnicianTaskFilter,
 )
+from schemas.pagination import Page, PageParams
 from services import notifications
+from services.pagination import decode_cursor, encode_cursor, page_limit
+from services.search import QueryFilters
 
 
-TASK_DATE_FORMAT = "%d.%m.%Y %H:%M"
 TASK_STATUSES = {"Не выполнено", "В процессе", "Выполнено", "Отменено"}
+CLOSED_TASK_STATUSES = ["Выполнено", "Отменено"]
+MAX_TASK_BATCH_SIZE = 500
 
 
 def parse_task_datetime(
@@ -30,6 +53,7 @@ def validate_task_window(start_time: str, end_time: str, error_code: ErrorCode):
     end = parse_task_datetime(end_time)
     if end <= start:
         raise AppError(error_code)
+    return start, end
 
 
 def validate_task_description(description: str, error_code: ErrorCode):
@@ -39,201 +63,470 @@ def validate_task_description(description: str, error_code: ErrorCode):
         raise AppError(error_code)
 
 
-async def ensure_technician_exists(technician_id: int):
-    query = """
-    SELECT technician_id
-    FROM technicians
-    WHERE technician_id = $1;
-    """
-    async with database.pool.acquire() as connection:
-        technician = await connection.fetchrow(query, technician_id)
-    if technician is None:
-        raise AppError(ErrorCode.TECHNICIAN_NOT_FOUND)
+TASK_COLUMNS = """
+    ts.task_id, ts.start_time, ts.end_time, ts.workshop, ts.foreman_id, ts.technician_id, ts.task_description, ts.status, ts.important
+"""
 
 
-async def get_technician_tasks(
+def build_task_list_filters(
     filter: TechnicianTaskFilter, foreman_id: int | None = None
-):
+) -> tuple[str, QueryFilters]:
+    filters = QueryFilters()
+    joins = []
     if filter.date_start:
-        parse_task_datetime(filter.date_start, ErrorCode.INVALID_FILTER_PARAMS)
+        filters.add(
+            "ts.start_time >= {}",
+            parse_task_datetime(filter.date_start, ErrorCode.INVALID_FILTER_PARAMS),
+        )
     if filter.date_end:
-        parse_task_datetime(filter.date_end, ErrorCode.INVALID_FILTER_PARAMS)
+        filters.add(
+            "ts.start_time <= {}",
+            parse_task_datetime(filter.date_end, ErrorCode.INVALID_FILTER_PARAMS),
+        )
+    if filter.workshop.strip():
+        filters.add_contains("ts.workshop", filter.workshop)
+    if filter.foreman_name.strip():
+        joins.append("INNER JOIN foremen f USING(foreman_id)")
+        filters.add_contains("f.full_name", filter.foreman_name)
+    if filter.technician_name.strip():
+        joins.append("INNER JOIN technicians t USING(technician_id)")
+        filters.add_contains("t.full_name", filter.technician_name)
+    if filter.status.strip() in TASK_STATUSES:
+        filters.add("ts.status = {}", filter.status.strip())
+    elif filter.status.strip():
+        filters.add_contains("ts.status", filter.status)
+    if foreman_id is not None:
+        filters.add("ts.foreman_id = {}", foreman_id)
 
-    start_date = filter.date_start if filter.date_start != "" else "01.01.2000 00:00"
-    end_date = filter.date_end if filter.date_end != "" else "01.01.2033 00:00"
+    from_clause = " ".join(["technician_tasks ts", *joins])
+    return from_clause, filters
 
-    query = """
-    SELECT ts.task_id, ts.start_time, ts.end_time, ts.workshop, ts.foreman_id, ts.technician_id, ts.task_description, ts.status, ts.important
-    FROM technician_tasks ts
-    INNER JOIN technicians t USING(technician_id)
-    INNER JOIN foremen f USING(foreman_id)
-    WHERE ts.workshop LIKE '%' || $1 || '%'
-          AND f.full_name LIKE '%' || $2 || '%'
-          AND t.full_name LIKE '%' || $3 || '%'
-          AND ts.status LIKE '%' || $4 || '%'
-          AND TO_TIMESTAMP(ts.start_time,'DD-mm-YYYY HH24:MI') BETWEEN TO_TIMESTAMP($5,'DD-mm-YYYY HH24:MI')
-          AND TO_TIMESTAMP($6,'DD-mm-YYYY HH24:MI')
-          AND ($7::INTEGER IS NULL OR ts.foreman_id = $7)
-    ORDER BY task_id DESC;
+
+def build_technician_filters(
+    technician_id: int, foreman_id: int | None = None
+) -> tuple[str, QueryFilters]:
+    filters = QueryFilters()
+    filters.add("ts.technician_id = {}", technician_id)
+    if foreman_id is not None:
+        filters.add("ts.foreman_id = {}", foreman_id)
+    return "technician_tasks ts", filters
+
+
+async def fetch_tasks(name: str, from_clause: str, filters: QueryFilters):
+    query = f"""
+    SELECT {TASK_COLUMNS}
+    FROM {from_clause}
+    {filters.where()}
+    ORDER BY ts.task_id DESC;
     """
-    async with database.pool.acquire() as connection:
-        rows = await connection.fetch(
-            query,
-            filter.workshop,
-            filter.foreman_name,
-            filter.technician_name,
-            filter.status,
-            start_date,
-            end_date,
-            foreman_id,
-        )
-        tasks = [
-            TechnicianTask(
-                task_id=record["task_id"],
-                start_time=record["start_time"],
-                end_time=record["end_time"],
-                workshop=record["workshop"],
-                foreman_id=record["foreman_id"],
-                technician_id=record["technician_id"],
-                task_description=record["task_description"],
-                status=record["status"],
-                important=record["important"],
+    rows = await database.fetch(Statement(name, query), *filters.params)
+    return [TechnicianTask(**record) for record in rows]
+
+
+async def fetch_tasks_version(
+    name: str, from_clause: str, filters: QueryFilters
+) -> tuple[int, int]:
+    """Returns (row count, max row_version) of the tasks matching filters."""
+    query = f"""
+    SELECT COUNT(*), COALESCE(MAX(ts.row_version), 0)
+    FROM {from_clause}
+    {filters.where()};
+    """
+    count, version = await database.fetchrow(Statement(name, query), *filters.params)
+    return count, version
+
+
+async def fetch_tasks_page(
+    name: str, from_clause: str, filters: QueryFilters, page: PageParams
+) -> Page[TechnicianTask]:
+    limit = page_limit(page)
+    count_query = f"""
+    SELECT COUNT(*)
+    FROM {from_clause}
+    {filters.where()};
+    """
+    count_params = list(filters.params)
+
+    if page.cursor is not None:
+        last_task_id = decode_cursor(page.cursor, "task_id")["task_id"]
+        if not isinstance(last_task_id, int):
+            raise AppError(ErrorCode.INVALID_PAGINATION_PARAMS)
+        filters.add("ts.task_id < {}", last_task_id)
+    params = [*filters.params, limit + 1]
+    query = f"""
+    SELECT {TASK_COLUMNS}
+    FROM {from_clause}
+    {filters.where()}
+    ORDER BY ts.task_id DESC
+    LIMIT ${len(params)};
+    """
+
+    async with database.connection():
+        rows = await database.fetch(Statement(name, query), *params)
+        total_count = (
+            await database.fetchval(
+                Statement(f"{name}_count", count_query), *count_params
             )
-            for record in rows
-        ]
-        return tasks
+            if page.include_total
+            else None
+        )
+
+    tasks = [TechnicianTask(**record) for record in rows[:limit]]
+    next_cursor = (
+        encode_cursor(task_id=tasks[-1].task_id) if len(rows) > limit else None
+    )
+    return Page[TechnicianTask](
+        items=tasks, next_cursor=next_cursor, total_count=total_count
+    )
+
+
+async def get_technician_tasks(
+    filter: TechnicianTaskFilter, foreman_id: int | None = None
+):
+    return await fetch_tasks(
+        "technician_tasks.list", *build_task_list_filters(filter, foreman_id)
+    )
+
+
+async def get_technician_tasks_page(
+    filter: TechnicianTaskFilter, page: PageParams, foreman_id: int | None = None
+):
+    return await fetch_tasks_page(
+        "technician_tasks.page", *build_task_list_filters(filter, foreman_id), page
+    )
 
 
 async def get_technician_tasks_by_technician_id(
     id: int, foreman_id: int | None = None
 ):
-    query = """
-    SELECT task_id, start_time, end_time, workshop, foreman_id, technician_id, task_description, status, important
+    return await fetch_tasks(
+        "technician_tasks.by_technician", *build_technician_filters(id, foreman_id)
+    )
 
-    FROM technician_tasks
-    WHERE technician_id = $1 AND ($2::INTEGER IS NULL OR foreman_id = $2)
-    ORDER BY task_id DESC;
+
+async def get_technician_tasks_page_by_technician_id(
+    id: int, page: PageParams, foreman_id: int | None = None
+):
+    return await fetch_tasks_page(
+        "technician_tasks.page_by_technician",
+        *build_technician_filters(id, foreman_id),
+        page,
+    )
+
+
+async def get_technician_tasks_version_by_technician_id(
+    id: int, foreman_id: int | None = None
+):
+    return await fetch_tasks_version(
+        "technician_tasks.by_technician_version",
+        *build_technician_filters(id, foreman_id),
+    )
+
+
+def decode_sync_watermark(watermark: str) -> int:
+    try:
+        values = decode_cursor(watermark, "xmin", "issued_at")
+    except AppError:
+        raise AppError(ErrorCode.INVALID_SYNC_WATERMARK)
+    if not all(isinstance(value, int) for value in values.values()):
+        raise AppError(ErrorCode.INVALID_SYNC_WATERMARK)
+    max_age = config.sync.TOMBSTONE_RETENTION_DAYS * 86400
+    if time.time() - values["issued_at"] > max_age:
+        raise AppError(ErrorCode.SYNC_RESET_REQUIRED)
+    return values["xmin"]
+
+
+async def get_technician_task_changes(
+    technician_id: int, since: str | None, foreman_id: int | None = None
+) -> TechnicianTaskChanges:
+    """Returns the technician's tasks written since the watermark.
+
+    Without since, every task is returned, as for an initial sync. The new
+    watermark is the xmin of the reading snapshot: every transaction below it
+    had finished, so its writes are in this response, and anything still in
+    flight is picked up by the next call.
+    """
+    since_xmin = decode_sync_watermark(since) if since is not None else None
+    from_clause, filters = build_technician_filters(technician_id, foreman_id)
+    scope = list(filters.params)
+    if since_xmin is not None:
+        filters.add("ts.changed_xid >= {}::TEXT::XID8", str(since_xmin))
+    changed_query = f"""
+    SELECT {TASK_COLUMNS}
+    FROM {from_clause}
+    {filters.where()}
+    ORDER BY ts.task_id DESC;
     """
-    async with database.pool.acquire() as connection:
-        rows = await connection.fetch(query, id, foreman_id)
-        tasks = [
-            TechnicianTask(
-                task_id=record["task_id"],
-                start_time=record["start_time"],
-                end_time=record["end_time"],
-                workshop=record["workshop"],
-                foreman_id=record["foreman_id"],
-                technician_id=record["technician_id"],
-                task_description=record["task_description"],
-                status=record["status"],
-                important=record["important"],
+    # Tombstones left in this scope by tasks that are not back in it.
+    foreman_scope = "AND {}.foreman_id = $3" if foreman_id is not None else ""
+    deleted_query = f"""
+    SELECT DISTINCT d.task_id
+    FROM technician_task_tombstones d
+    WHERE d.technician_id = $1
+      {foreman_scope.format("d")}
+      AND d.deleted_xid >= $2::TEXT::XID8
+      AND NOT EXISTS (
+          SELECT 1
+          FROM technician_tasks ts
+          WHERE ts.task_id = d.task_id
+            AND ts.technician_id = $1
+            {foreman_scope.format("ts")}
+      )
+    ORDER BY d.task_id;
+    """
+
+    async with database.connection() as connection:
+        async with connection.transaction(isolation="repeatable_read", readonly=True):
+            xmin = await database.fetchval(SNAPSHOT_XMIN)
+            rows = await database.fetch(
+                Statement("technician_tasks.changes", changed_query),
+                *filters.params,
+            )
+            deleted = (
+                await database.fetch(
+                    Statement("technician_tasks.deleted_since", deleted_query),
+                    scope[0],
+                    str(since_xmin),
+                    *scope[1:],
+                )
+                if since_xmin is not None
+                else []
             )
-            for record in rows
-        ]
-        return tasks
 
+    return TechnicianTaskChanges(
+        changed=[TechnicianTask(**record) for record in rows],
+        deleted=[record["task_id"] for record in deleted],
+        watermark=encode_cursor(xmin=xmin, issued_at=int(time.time())),
+    )
 
-async def get_technician_task_by_id(task_id: int):
-    query = """
-    SELECT task_id, start_time, end_time, workshop, foreman_id, technician_id, task_description, status, important
- 
-    FROM technician_tasks
-    WHERE task_id = $1;
+
+async def delete_expired_task_tombstones() -> None:
+    await database.execute(
+        DELETE_EXPIRED_TOMBSTONES, config.sync.TOMBSTONE_RETENTION_DAYS + 1
+    )
+
+
+async def get_technician_task_summary(
+    foreman_id: int | None = None,
+    technician_id: int | None = None,
+    workshop: str | None = None,
+) -> TechnicianTaskSummary:
+    filters = QueryFilters()
+    if foreman_id is not None:
+        filters.add("ts.foreman_id = {}", foreman_id)
+    if technician_id is not None:
+        filters.add("ts.technician_id = {}", technician_id)
+    if workshop is not None:
+        filters.add("ts.workshop = {}", workshop)
+    closed_placeholder = f"${len(filters.params) + 1}"
+    query = f"""
+    SELECT
+        ts.status,
+        COUNT(*) AS total,
+        COUNT(*) FILTER (WHERE ts.important) AS important,
+        COUNT(*) FILTER (
+            WHERE ts.end_time < LOCALTIMESTAMP
+              AND ts.status <> ALL({closed_placeholder}::VARCHAR[])
+        ) AS overdue
+    FROM technician_tasks ts
+    {filters.where()}
+    GROUP BY ts.status;
     """
-    async with database.pool.acquire() as connection:
-        task = await connection.fetchrow(query, task_id)
-        if task is None:
-            raise AppError(ErrorCode.TASK_NOT_FOUND)
-        return TechnicianTask(**task)
+    rows = await database.fetch(
+        Statement("technician_tasks.summary", query),
+        *filters.params,
+        CLOSED_TASK_STATUSES,
+    )
 
+    by_status = {row["status"]: row["total"] for row in rows}
+    return TechnicianTaskSummary(
+        total=sum(by_status.values()),
+        by_status={status: by_status.get(status, 0) for status in sorted(TASK_STATUSES)},
+        important=sum(row["important"] for row in rows),
+        overdue=sum(row["overdue"] for row in rows),
+    )
 
-async def insert_technician_task(dto: TechnicianTaskCreate):
+
+async def get_technician_task_version(task_id: int) -> tuple[int, int]:
+    """Returns (technician_id, row_version) without loading the task."""
+    row = await database.fetchrow(TASK_VERSION_BY_ID, task_id)
+    if row is None:
+        raise AppError(ErrorCode.TASK_NOT_FOUND)
+    return row["technician_id"], row["row_version"]
+
+
+async def get_technician_task_by_id(task_id: int):
+    task = await database.fetchrow(TASK_BY_ID, task_id)
+    if task is None:
+        raise AppError(ErrorCode.TASK_NOT_FOUND)
+    return TechnicianTask(**task)
+
+
+def validate_task_create(dto: TechnicianTaskCreate):
     if not dto.technician_id:
         raise AppError(ErrorCode.TECHNICIAN_REQUIRED)
-    validate_task_window(
+    start_time, end_time = validate_task_window(
         dto.start_time,
         dto.end_time,
         ErrorCode.INVALID_TASK_DEADLINE,
     )
     validate_task_description(dto.task_description, ErrorCode.INVALID_TASK_EDIT_DATA)
-    await ensure_technician_exists(dto.technician_id)
-    foreman = await foremen.get_foreman_by_id(dto.foreman_id)
-    query = """
-    INSERT INTO technician_tasks (start_time, end_time, workshop, foreman_id, technician_id, task_description, status, important)
-    VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-    RETURNING task_id, start_time, end_time, workshop, foreman_id, technician_id, task_description, status, important
-    """
-    async with database.pool.acquire() as connection:
-        result = await connection.fetchrow(
-            query,
-            dto.start_time,
-            dto.end_time,
-            foreman.workshop,
+    return start_time, end_time
+
+
+async def insert_technician_task(dto: TechnicianTaskCreate):
+    start_time, end_time = validate_task_create(dto)
+    async with database.transaction():
+        result = await database.fetchrow(
+            INSERT_TASK,
+            start_time,
+            end_time,
             dto.foreman_id,
             dto.technician_id,
             dto.task_description,
-            "Не выполнено",
             dto.important,
         )
-    task = TechnicianTask(**result)
-    await notifications.create_notification(
-        "technician",
-        task.technician_id,
-        task.task_id,
-        f"Вам назначена задача №{task.task_id}",
-    )
+        if not result["technician_exists"]:
+            raise AppError(ErrorCode.TECHNICIAN_NOT_FOUND)
+        if not result["foreman_exists"]:
+            raise AppError(ErrorCode.USER_NOT_FOUND)
+        task = TechnicianTask(**result)
+        await notifications.create_notification(
+            "technician",
+            task.technician_id,
+            task.task_id,
+            f"Вам назначена задача №{task.task_id}",
+        )
     return task
 
 
+def bulk_item_error(index: int, error: AppError) -> BulkItemError:
+    return BulkItemError(
+        index=index, error_code=error.error_code, message=error.message
+    )
+
+
+async def insert_technician_tasks(dtos: list[TechnicianTaskCreate]):
+    if not 1 <= len(dtos) <= MAX_TASK_BATCH_SIZE:
+        raise AppError(
+            ErrorCode.INVALID_TASK_BATCH,
+            message=f"Пакет должен содержать от 1 до {MAX_TASK_BATCH_SIZE} задач",
+        )
+
+    errors: list[BulkItemError] = []
+    valid: list[tuple[int, TechnicianTaskCreate, datetime, datetime]] = []
+    for index, dto in enumerate(dtos):
+        try:
+            start_time, end_time = validate_task_create(dto)
+        except AppError as exc:
+            errors.append(bulk_item_error(index, exc))
+            continue
+        valid.append((index, dto, start_time, end_time))
+    if not valid:
+        return TechnicianTaskBulkResult(created=[], errors=errors)
+
+    created: list[BulkCreatedTask] = []
+    async with database.transaction():
+        references = await database.fetch(
+            BULK_TASK_REFERENCES,
+            list({dto.technician_id for _, dto, _, _ in valid}),
+            list({dto.foreman_id for _, dto, _, _ in valid}),
+        )
+        technician_ids = {
+            record["id"]
+            for record in references
+            if record["kind"] == "technician"
+        }
+        workshops = {
+            record["id"]: record["workshop"]
+            for record in references
+            if record["kind"] == "foreman"
+        }
+
+        rows = []
+        row_indexes = []
+        for index, dto, start_time, end_time in valid:
+            if dto.technician_id not in technician_ids:
+                error = AppError(ErrorCode.TECHNICIAN_NOT_FOUND)
+                errors.append(bulk_item_error(index, error))
+            elif dto.foreman_id not in workshops:
+                error = AppError(ErrorCode.USER_NOT_FOUND)
+                errors.append(bulk_item_error(index, error))
+            else:
+                row_indexes.append(index)
+                rows.append(
+                    (
+                        start_time,
+                        end_time,
+                        workshops[dto.foreman_id],
+                        dto.foreman_id,
+                        dto.technician_id,
+                        dto.task_description,
+                        dto.important,
+                    )
+                )
+
+        if rows:
+            # Serial ids follow the unnest order, so sorting by task_id
+            # lines the created tasks up with the submitted items.
+            records = await database.fetch(
+                BULK_INSERT_TASKS, *map(list, zip(*rows))
+            )
+            created = [
+                BulkCreatedTask(index=index, **record)
+                for index, record in zip(
+                    row_indexes, sorted(records, key=lambda record: record["task_id"])
+                )
+            ]
+            await notifications.create_notifications(
+                [
+                    (
+                        "technician",
+                        task.technician_id,
+                        task.task_id,
+                        f"Вам назначена задача №{task.task_id}",
+                    )
+                    for task in created
+                ]
+            )
+
+    return TechnicianTaskBulkResult(
+        created=created, errors=sorted(errors, key=lambda error: error.index)
+    )
+
+
 async def update_technician_task(task_id: int, dto: TechnicianTaskUpdate):
-    validate_task_window(
+    start_time, end_time = validate_task_window(
         dto.start_time,
         dto.end_time,
         ErrorCode.INVALID_TASK_EDIT_DATA,
     )
     validate_task_description(dto.task_description, ErrorCode.INVALID_TASK_EDIT_DATA)
-    query = """
-    UPDATE technician_tasks
-    SET start_time = $1, end_time = $2, task_description = $3, important = $4
-    WHERE task_id = $5
-    RETURNING task_id, start_time, end_time, workshop, foreman_id, technician_id, task_description, status, important
-    """
-    async with database.pool.acquire() as connection:
-        result = await connection.fetchrow(
-            query,
-            dto.start_time,
-            dto.end_time,
-            dto.task_description,
-            dto.important,
-            task_id,
-        )
-        if result is None:
-            raise AppError(ErrorCode.TASK_NOT_FOUND)
-        return TechnicianTask(**result)
+    result = await database.fetchrow(
+        UPDATE_TASK,
+        start_time,
+        end_time,
+        dto.task_description,
+        dto.important,
+        task_id,
+    )
+    if result is None:
+        raise AppError(ErrorCode.TASK_NOT_FOUND)
+    return TechnicianTask(**result)
 
 
 async def update_technician_task_status(task_id: int, status: str):
     if status not in TASK_STATUSES:
         raise AppError(ErrorCode.INVALID_TASK_STATUS)
-    query = """
-    UPDATE technician_tasks
-    SET status = $1
-    WHERE task_id = $2
-    RETURNING task_id, start_time, end_time, workshop, foreman_id, technician_id, task_description, status, important;
-    """
-    async with database.pool.acquire() as connection:
-        result = await connection.fetchrow(
-            query,
-            status,
-            task_id,
-        )
+    async with database.transaction():
+        result = await database.fetchrow(UPDATE_TASK_STATUS, status, task_id)
         if result is None:
             raise AppError(ErrorCode.TASK_STATUS_NOT_FOUND)
-    task = TechnicianTask(**result)
-    await notifications.create_notification(
-        "foreman",
-        task.foreman_id,
-        task.task_id,
-        f"Статус задачи №{task.task_id} изменён на '{task.status}'",
-    )
+        task = TechnicianTask(**result)
+        await notifications.create_notification(
+            "foreman",
+            task.foreman_id,
+            task.task_id,
+            f"Статус задачи №{task.task_id} изменён на '{task.status}'",
+        )
     return task
@@ -1,8 +1,17 @@
 from database import database
 from errors import AppError, ErrorCode
+from queries.foremen import FOREMAN_BY_PHONE
+from queries.technicians import (
+    INSERT_TECHNICIAN,
+    LIST_TECHNICIANS,
+    TECHNICIAN_BY_ID,
+    TECHNICIAN_BY_PHONE,
+    UPDATE_TECHNICIAN,
+)
 from schemas.technician import Technician, TechnicianCreate, TechnicianUpdate
-from services.passwords import hash_password
+from services.passwords import hash_password_async
 from services.phone import is_valid_phone_number, normalize_phone_number
+from services.reference_cache import TECHNICIANS, reference_cache
 
 
 def validate_technician_payload(full_name: str, specialization: str, phone_number: str):
@@ -17,37 +26,24 @@ def validate_technician_payload(full_name: str, specialization: str, phone_numbe
 
 
 async def get_technicians():
-    query = """
-    SELECT technician_id, specialization, full_name, gender, phone_number 
-    FROM technicians
-    ORDER BY technician_id ASC;
-    """
-    async with database.pool.acquire() as connection:
-        rows = await connection.fetch(query)
-        technicians = [
-            Technician(
-                technician_id=record["technician_id"],
-                specialization=record["specialization"],
-                full_name=record["full_name"],
-                gender=record["gender"],
-                phone_number=record["phone_number"],
-            )
-            for record in rows
-        ]
-        return technicians
+    rows = await database.fetch(LIST_TECHNICIANS)
+    return [
+        Technician(
+            technician_id=record["technician_id"],
+            specialization=record["specialization"],
+            full_name=record["full_name"],
+            gender=record["gender"],
+            phone_number=record["phone_number"],
+        )
+        for record in rows
+    ]
 
 
 async def get_technician_by_id(technician_id: int):
-    query = """
-    SELECT technician_id, specialization, full_name, gender, phone_number
-    FROM technicians
-    WHERE technician_id = $1;
-    """
-    async with database.pool.acquire() as connection:
-        technician = await connection.fetchrow(query, technician_id)
-        if technician is None:
-            raise AppError(ErrorCode.PROFILE_NOT_FOUND)
-        return Technician(**technician)
+    technician = await database.fetchrow(TECHNICIAN_BY_ID, technician_id)
+    if technician is None:
+        raise AppError(ErrorCode.PROFILE_NOT_FOUND)
+    return Technician(**technician)
 
 
 async def insert_technician(dto: TechnicianCreate):
@@ -55,81 +51,43 @@ async def insert_technician(dto: TechnicianCreate):
     validate_technician_payload(dto.full_name, dto.specialization, phone_number)
     if not dto.gender.strip() or not dto.password.strip():
         raise AppError(ErrorCode.REQUIRED_FIELDS_MISSING)
-    query = """
-    INSERT INTO technicians (specialization, full_name, gender, phone_number, password_hash) 
-    VALUES ($1, $2, $3, $4, $5)
-    RETURNING technician_id, specialization, full_name, gender, phone_number;
-    """
-
-    check_technician_query = """
-    SELECT technician_id
-    FROM technicians 
-    WHERE phone_number = $1 
-    LIMIT 1;
-    """
-
-    check_foreman_phone_query = """
-    SELECT foreman_id
-    FROM foremen 
-    WHERE phone_number = $1 
-    LIMIT 1;
-    """
-
-    async with database.pool.acquire() as connection:
-        exists = await connection.fetchrow(check_foreman_phone_query, phone_number)
+    # Hash before taking a connection so the pool is not held during Argon2.
+    password_hash = await hash_password_async(dto.password)
+    async with database.connection():
+        exists = await database.fetchrow(FOREMAN_BY_PHONE, phone_number)
         if exists:
             raise AppError(ErrorCode.PHONE_ALREADY_EXISTS)
 
-        exists = await connection.fetchrow(check_technician_query, phone_number)
+        exists = await database.fetchrow(TECHNICIAN_BY_PHONE, phone_number)
         if exists:
             raise AppError(ErrorCode.PHONE_ALREADY_EXISTS)
 
-        result = await connection.fetchrow(
-            query,
+        result = await database.fetchrow(
+            INSERT_TECHNICIAN,
             dto.specialization,
             dto.full_name,
             dto.gender,
             phone_number,
-            hash_password(dto.password),
+            password_hash,
         )
+        await reference_cache.invalidate(TECHNICIANS)
         return Technician(**result)
 
 
 async def update_technician(technician_id: int, dto: TechnicianUpdate):
     phone_number = normalize_phone_number(dto.phone_number)
     validate_technician_payload(dto.full_name, dto.specialization, phone_number)
-    query = """
-    UPDATE technicians
-    SET specialization = $1, full_name = $2, phone_number = $3
-    WHERE technician_id = $4
-    RETURNING technician_id, specialization, full_name, gender, phone_number;
-    """
-
-    check_technician_query = """
-    SELECT technician_id
-    FROM technicians 
-    WHERE phone_number = $1 
-    LIMIT 1;
-    """
-
-    check_foreman_phone_query = """
-    SELECT foreman_id
-    FROM foremen 
-    WHERE phone_number = $1 
-    LIMIT 1;
-    """
-
-    async with database.pool.acquire() as connection:
-        exists = await connection.fetchrow(check_foreman_phone_query, phone_number)
+    async with database.connection():
+        exists = await database.fetchrow(FOREMAN_BY_PHONE, phone_number)
         if exists:
             raise AppError(ErrorCode.PHONE_ALREADY_EXISTS)
 
-        exists = await connection.fetchrow(check_technician_query, phone_number)
+        exists = await database.fetchrow(TECHNICIAN_BY_PHONE, phone_number)
         if exists and technician_id != exists["technician_id"]:
             raise AppError(ErrorCode.PHONE_ALREADY_EXISTS)
 
-        result = await connection.fetchrow(
-            query,
+        result = await database.fetchrow(
+            UPDATE_TECHNICIAN,
             dto.specialization,
             dto.full_name,
             phone_number,
@@ -137,4 +95,5 @@ async def update_technician(technician_id: int, dto: TechnicianUpdate):
         )
         if result is None:
             raise AppError(ErrorCode.PROFILE_NOT_FOUND)
+        await reference_cache.invalidate(TECHNICIANS)
         return Technician(**result)
@@ -0,0 +1,24 @@
+__all__ = [
+    "Statement",
+    "StatementCheckError",
+    "StatementRegistry",
+    "statements",
+]
+
+from queries.registry import (
+    Statement,
+    StatementCheckError,
+    StatementRegistry,
+    statements,
+)
+
+# Importing the statement modules registers their statements.
+from queries import (
+    auth,
+    foremen,
+    notifications,
+    rate_limit,
+    reference_cache,
+    technician_tasks,
+    technicians,
+)
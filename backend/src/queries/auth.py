@@ -0,0 +1,78 @@
+from queries.registry import statements
+
+
+USER_SELECTS = {
+    "foreman": """
+        SELECT foreman_id AS user_id, phone_number, full_name, workshop, password_hash
+        FROM foremen
+    """,
+    "technician": """
+        SELECT technician_id AS user_id, phone_number, full_name, NULL AS workshop, password_hash
+        FROM technicians
+    """,
+}
+USER_ID_COLUMNS = {"foreman": "foreman_id", "technician": "technician_id"}
+
+USER_BY_PHONE = {
+    role: statements.add(
+        f"auth.{role}_by_phone",
+        select + "WHERE phone_number = ANY($1::TEXT[]);",
+    )
+    for role, select in USER_SELECTS.items()
+}
+USER_BY_ID = {
+    role: statements.add(
+        f"auth.{role}_by_id",
+        select + f"WHERE {USER_ID_COLUMNS[role]} = $1;",
+    )
+    for role, select in USER_SELECTS.items()
+}
+
+INSERT_REFRESH_TOKEN = statements.add(
+    "auth.insert_refresh_token",
+    """
+    INSERT INTO refresh_tokens (token_hash, family_id, user_role, user_id, expires_at)
+    VALUES ($1, $2, $3, $4, NOW() + make_interval(days => $5));
+    """,
+)
+
+LOCK_REFRESH_TOKEN = statements.add(
+    "auth.lock_refresh_token",
+    """
+    SELECT family_id, user_role, user_id, revoked_at, expires_at > NOW() AS active
+    FROM refresh_tokens
+    WHERE token_hash = $1
+    FOR UPDATE;
+    """,
+)
+
+REVOKE_REFRESH_TOKEN = statements.add(
+    "auth.revoke_refresh_token",
+    "UPDATE refresh_tokens SET revoked_at = NOW() WHERE token_hash = $1;",
+)
+
+REVOKE_REFRESH_TOKEN_FAMILY = statements.add(
+    "auth.revoke_refresh_token_family",
+    """
+    UPDATE refresh_tokens
+    SET revoked_at = NOW()
+    WHERE family_id = $1 AND revoked_at IS NULL;
+    """,
+)
+
+REVOKE_REFRESH_TOKEN_SESSION = statements.add(
+    "auth.revoke_refresh_token_session",
+    """
+    UPDATE refresh_tokens
+    SET revoked_at = NOW()
+    WHERE family_id = (
+        SELECT family_id FROM refresh_tokens WHERE token_hash = $1
+    )
+      AND revoked_at IS NULL;
+    """,
+)
+
+DELETE_EXPIRED_REFRESH_TOKENS = statements.add(
+    "auth.delete_expired_refresh_tokens",
+    "DELETE FROM refresh_tokens WHERE expires_at <= NOW();",
+)
@@ -0,0 +1,59 @@
+from queries.registry import statements
+
+
+LIST_FOREMEN = statements.add(
+    "foremen.list",
+    """
+    SELECT foreman_id, full_name, gender, workshop, phone_number
+    FROM foremen
+    ORDER BY foreman_id ASC;
+    """,
+)
+
+FOREMAN_BY_ID = statements.add(
+    "foremen.by_id",
+    """
+    SELECT foreman_id, full_name, gender, workshop, phone_number
+    FROM foremen
+    WHERE foreman_id = $1;
+    """,
+)
+
+FOREMAN_BY_PHONE = statements.add(
+    "foremen.by_phone",
+    """
+    SELECT foreman_id
+    FROM foremen
+    WHERE phone_number = $1
+    LIMIT 1;
+    """,
+)
+
+FOREMAN_BY_WORKSHOP = statements.add(
+    "foremen.by_workshop",
+    """
+    SELECT foreman_id
+    FROM foremen
+    WHERE workshop = $1
+    LIMIT 1;
+    """,
+)
+
+INSERT_FOREMAN = statements.add(
+    "foremen.insert",
+    """
+    INSERT INTO foremen (full_name, gender, workshop, phone_number, password_hash)
+    VALUES ($1, $2, $3, $4, $5)
+    RETURNING foreman_id, full_name, gender, workshop, phone_number;
+    """,
+)
+
+UPDATE_FOREMAN = statements.add(
+    "foremen.update",
+    """
+    UPDATE foremen
+    SET full_name = $1, workshop = $2, phone_number = $3
+    WHERE foreman_id = $4
+    RETURNING foreman_id, full_name, gender, workshop, phone_number;
+    """,
+)
@@ -0,0 +1,184 @@
+from queries.registry import statements
+
+
+NOTIFICATION_COLUMNS = (
+    "notification_id, recipient_role, recipient_id, task_id, message, is_read, created_at"
+)
+
+INSERT_NOTIFICATIONS = statements.add(
+    "notifications.insert",
+    f"""
+    WITH inserted AS (
+        INSERT INTO notifications (recipient_role, recipient_id, task_id, message)
+        SELECT recipient_role, recipient_id, task_id, message
+        FROM unnest($1::VARCHAR[], $2::INTEGER[], $3::INTEGER[], $4::VARCHAR[])
+            AS batch(recipient_role, recipient_id, task_id, message)
+        RETURNING {NOTIFICATION_COLUMNS}
+    )
+    SELECT inserted.*
+    FROM inserted
+    CROSS JOIN LATERAL pg_notify($5, row_to_json(inserted)::TEXT) AS notify
+    ORDER BY inserted.notification_id;
+    """,
+)
+
+LIST_NOTIFICATIONS = statements.add(
+    "notifications.list",
+    f"""
+    SELECT {NOTIFICATION_COLUMNS}
+    FROM notifications
+    WHERE recipient_role = $1 AND recipient_id = $2
+    ORDER BY created_at DESC, notification_id DESC;
+    """,
+)
+
+NOTIFICATIONS_VERSION = statements.add(
+    "notifications.version",
+    """
+    SELECT COUNT(*), COALESCE(MAX(row_version), 0)
+    FROM notifications
+    WHERE recipient_role = $1 AND recipient_id = $2;
+    """,
+)
+
+NOTIFICATIONS_FIRST_PAGE = statements.add(
+    "notifications.first_page",
+    f"""
+    SELECT {NOTIFICATION_COLUMNS}
+    FROM notifications
+    WHERE recipient_role = $1 AND recipient_id = $2
+    ORDER BY created_at DESC, notification_id DESC
+    LIMIT $3;
+    """,
+)
+
+NOTIFICATIONS_NEXT_PAGE = statements.add(
+    "notifications.next_page",
+    f"""
+    SELECT {NOTIFICATION_COLUMNS}
+    FROM notifications
+    WHERE recipient_role = $1 AND recipient_id = $2
+      AND (created_at, notification_id) < ($3, $4)
+    ORDER BY created_at DESC, notification_id DESC
+    LIMIT $5;
+    """,
+)
+
+COUNT_NOTIFICATIONS = statements.add(
+    "notifications.count",
+    """
+    SELECT COUNT(*)
+    FROM notifications
+    WHERE recipient_role = $1 AND recipient_id = $2;
+    """,
+)
+
+UNREAD_COUNT = statements.add(
+    "notifications.unread_count",
+    """
+    SELECT unread_count
+    FROM notification_counters
+    WHERE recipient_role = $1 AND recipient_id = $2;
+    """,
+)
+
+MARK_READ = statements.add(
+    "notifications.mark_read",
+    f"""
+    UPDATE notifications
+    SET is_read = TRUE
+    WHERE notification_id = $1 AND recipient_role = $2 AND recipient_id = $3
+    RETURNING {NOTIFICATION_COLUMNS};
+    """,
+)
+
+# Keyed by the selector of NotificationsReadRequest that is set.
+MARK_READ_SELECTIONS = {
+    selection: statements.add(
+        f"notifications.mark_read_{selection}",
+        f"""
+        UPDATE notifications
+        SET is_read = TRUE
+        WHERE recipient_role = $1 AND recipient_id = $2 AND NOT is_read
+          AND {condition};
+        """,
+    )
+    for selection, condition in (
+        ("ids", "notification_id = ANY($3::INTEGER[])"),
+        ("up_to_id", "notification_id <= $3"),
+        ("up_to", "created_at <= $3"),
+    )
+}
+
+ARCHIVE_READ = statements.add(
+    "notifications.archive_read",
+    f"""
+    WITH moved AS (
+        DELETE FROM notifications
+        WHERE notification_id IN (
+            SELECT notification_id
+            FROM notifications
+            WHERE is_read AND created_at < $1
+            ORDER BY created_at
+            LIMIT $2
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING {NOTIFICATION_COLUMNS}
+    )
+    INSERT INTO notifications_archive ({NOTIFICATION_COLUMNS})
+    SELECT {NOTIFICATION_COLUMNS}
+    FROM moved;
+    """,
+)
+
+# Arbitrary key shared by every worker that schedules the reconciliation.
+RECONCILE_LOCK_KEY = 727_002
+
+TRY_RECONCILE_LOCK = statements.add(
+    "notifications.try_reconcile_lock", "SELECT pg_try_advisory_lock($1);"
+)
+
+RECONCILE_UNLOCK = statements.add(
+    "notifications.reconcile_unlock", "SELECT pg_advisory_unlock($1);"
+)
+
+DRIFTED_COUNTERS = statements.add(
+    "notifications.drifted_counters",
+    """
+    SELECT recipient_role, recipient_id
+    FROM (
+        SELECT recipient_role, recipient_id, COUNT(*) AS unread_count
+        FROM notifications
+        WHERE NOT is_read
+        GROUP BY recipient_role, recipient_id
+    ) n
+    FULL JOIN notification_counters c USING (recipient_role, recipient_id)
+    WHERE COALESCE(n.unread_count, 0) <> COALESCE(c.unread_count, 0);
+    """,
+)
+
+# Creates a missing counter; either way the row stays locked until commit.
+LOCK_COUNTER = statements.add(
+    "notifications.lock_counter",
+    """
+    INSERT INTO notification_counters AS c (recipient_role, recipient_id, unread_count)
+    VALUES ($1, $2, 0)
+    ON CONFLICT (recipient_role, recipient_id)
+    DO UPDATE SET unread_count = c.unread_count;
+    """,
+)
+
+REPAIR_COUNTER = statements.add(
+    "notifications.repair_counter",
+    """
+    UPDATE notification_counters c
+    SET unread_count = n.unread_count
+    FROM (
+        SELECT COUNT(*) AS unread_count
+        FROM notifications
+        WHERE recipient_role = $1 AND recipient_id = $2 AND NOT is_read
+    ) n
+    WHERE c.recipient_role = $1 AND c.recipient_id = $2
+      AND c.unread_count <> n.unread_count;
+    """,
+)
@@ -0,0 +1,37 @@
+from queries.registry import statements
+
+
+REFILLED_TOKENS = """LEAST(
+    $2::DOUBLE PRECISION,
+    bucket.tokens
+    + EXTRACT(EPOCH FROM clock_timestamp() - bucket.updated_at)
+    * $3::DOUBLE PRECISION
+)"""
+
+# Every SET expression sees the old row, so allowed and tokens are both
+# derived from the same refill.
+TAKE_TOKEN = statements.add(
+    "rate_limit.take",
+    f"""
+    INSERT INTO login_rate_limits AS bucket (bucket_key, tokens, allowed, updated_at)
+    VALUES ($1, $2::DOUBLE PRECISION - 1, TRUE, clock_timestamp())
+    ON CONFLICT (bucket_key) DO UPDATE
+    SET allowed = {REFILLED_TOKENS} >= 1,
+        tokens = CASE
+            WHEN {REFILLED_TOKENS} >= 1 THEN {REFILLED_TOKENS} - 1
+            ELSE {REFILLED_TOKENS}
+        END,
+        updated_at = clock_timestamp()
+    RETURNING bucket.allowed;
+    """,
+)
+
+DELETE_IDLE_BUCKETS = statements.add(
+    "rate_limit.delete_idle",
+    """
+    DELETE FROM login_rate_limits
+    WHERE updated_at < clock_timestamp() - make_interval(secs => $1);
+    """,
+)
+
+RESET_BUCKETS = statements.add("rate_limit.reset", "TRUNCATE login_rate_limits;")
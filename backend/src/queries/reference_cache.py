@@ -0,0 +1,6 @@
+from queries.registry import statements
+
+
+NOTIFY_REFERENCE_CHANGE = statements.add(
+    "reference_cache.notify", "SELECT pg_notify($1, $2);"
+)
@@ -0,0 +1,76 @@
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+import asyncpg
+
+
+@dataclass(frozen=True)
+class Statement:
+    """SQL text and the stable name it is timed and logged under."""
+
+    name: str
+    sql: str
+
+
+class StatementCheckError(RuntimeError):
+    pass
+
+
+class StatementRegistry:
+    """Static SQL of the application, each statement declared once by name.
+
+    Registered statements are prepared on every new pool connection and
+    parsed against the schema at startup. Queries assembled from request
+    filters cannot be declared up front; they run as ad hoc Statement
+    objects and are prepared on first use like any other query.
+    """
+
+    def __init__(self) -> None:
+        self.statements: dict[str, Statement] = {}
+
+    def add(self, name: str, sql: str) -> Statement:
+        if name in self.statements:
+            raise ValueError(f"Statement {name} is already registered")
+        statement = self.statements[name] = Statement(name, sql)
+        return statement
+
+    def __iter__(self) -> Iterator[Statement]:
+        return iter(self.statements.values())
+
+    def __len__(self) -> int:
+        return len(self.statements)
+
+    async def check(self, connection: asyncpg.Connection) -> None:
+        """Parses every statement against the database schema.
+
+        A column renamed or dropped by a migration fails startup with the
+        names of the affected statements, instead of failing the first
+        request that uses one of them.
+        """
+        failures = []
+        for statement in self:
+            try:
+                await connection.prepare(statement.sql)
+            except asyncpg.PostgresError as exc:
+                failures.append(f"{statement.name}: {exc}")
+        if failures:
+            raise StatementCheckError(
+                "Statements do not match the database schema:\n"
+                + "\n".join(failures)
+            )
+
+    async def prepare(self, connection: asyncpg.Connection) -> None:
+        """Puts every statement into the connection's statement cache.
+
+        fetch() and execute() look statements up there by their text, so
+        the first request on a fresh connection skips the parse round trip.
+        executemany() without argument rows prepares a statement and runs
+        it zero times. Parsing takes locks on the tables a statement uses;
+        the transaction releases them before the connection goes idle.
+        """
+        async with connection.transaction():
+            for statement in self:
+                await connection.executemany(statement.sql, [])
+
+
+statements = StatementRegistry()
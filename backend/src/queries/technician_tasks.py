@@ -0,0 +1,113 @@
+from queries.registry import statements
+
+
+# Task lists, pages, versions, summaries and change feeds are assembled from
+# request filters in models.technician_tasks and are not registered here.
+
+SNAPSHOT_XMIN = statements.add(
+    "technician_tasks.snapshot_xmin",
+    "SELECT pg_snapshot_xmin(pg_current_snapshot())::TEXT::BIGINT;",
+)
+
+# One extra day covers transactions that were running when a watermark
+# was issued and whose deleted_at therefore predates it.
+DELETE_EXPIRED_TOMBSTONES = statements.add(
+    "technician_tasks.delete_expired_tombstones",
+    """
+    DELETE FROM technician_task_tombstones
+    WHERE deleted_at < NOW() - make_interval(days => $1);
+    """,
+)
+
+TASK_VERSION_BY_ID = statements.add(
+    "technician_tasks.version_by_id",
+    """
+    SELECT technician_id, row_version
+    FROM technician_tasks
+    WHERE task_id = $1;
+    """,
+)
+
+TASK_BY_ID = statements.add(
+    "technician_tasks.by_id",
+    """
+    SELECT task_id, start_time, end_time, workshop, foreman_id, technician_id, task_description, status, important
+    FROM technician_tasks
+    WHERE task_id = $1;
+    """,
+)
+
+# Reference checks and the insert run as one statement; the flags tell
+# which reference was missing when nothing was inserted.
+INSERT_TASK = statements.add(
+    "technician_tasks.insert",
+    """
+    WITH technician AS (
+        SELECT technician_id
+        FROM technicians
+        WHERE technician_id = $4
+    ),
+    foreman AS (
+        SELECT foreman_id, workshop
+        FROM foremen
+        WHERE foreman_id = $3
+    ),
+    inserted AS (
+        INSERT INTO technician_tasks (start_time, end_time, workshop, foreman_id, technician_id, task_description, status, important)
+        SELECT $1, $2, foreman.workshop, foreman.foreman_id, technician.technician_id, $5, 'Не выполнено', $6
+        FROM technician, foreman
+        RETURNING task_id, start_time, end_time, workshop, foreman_id, technician_id, task_description, status, important
+    )
+    SELECT EXISTS (SELECT 1 FROM technician) AS technician_exists,
+           EXISTS (SELECT 1 FROM foreman) AS foreman_exists,
+           inserted.*
+    FROM (VALUES (1)) AS request
+    LEFT JOIN inserted ON TRUE;
+    """,
+)
+
+BULK_TASK_REFERENCES = statements.add(
+    "technician_tasks.bulk_references",
+    """
+    SELECT 'technician' AS kind, technician_id AS id, NULL AS workshop
+    FROM technicians
+    WHERE technician_id = ANY($1::INTEGER[])
+    UNION ALL
+    SELECT 'foreman' AS kind, foreman_id AS id, workshop
+    FROM foremen
+    WHERE foreman_id = ANY($2::INTEGER[]);
+    """,
+)
+
+BULK_INSERT_TASKS = statements.add(
+    "technician_tasks.bulk_insert",
+    """
+    INSERT INTO technician_tasks (start_time, end_time, workshop, foreman_id, technician_id, task_description, status, important)
+    SELECT start_time, end_time, workshop, foreman_id, technician_id, task_description, 'Не выполнено', important
+    FROM unnest(
+        $1::TIMESTAMP[], $2::TIMESTAMP[], $3::VARCHAR[], $4::INTEGER[],
+        $5::INTEGER[], $6::VARCHAR[], $7::BOOLEAN[]
+    ) AS batch(start_time, end_time, workshop, foreman_id, technician_id, task_description, important)
+    RETURNING task_id, start_time, end_time, workshop, foreman_id, technician_id, task_description, status, important;
+    """,
+)
+
+UPDATE_TASK = statements.add(
+    "technician_tasks.update",
+    """
+    UPDATE technician_tasks
+    SET start_time = $1, end_time = $2, task_description = $3, important = $4
+    WHERE task_id = $5
+    RETURNING task_id, start_time, end_time, workshop, foreman_id, technician_id, task_description, status, important;
+    """,
+)
+
+UPDATE_TASK_STATUS = statements.add(
+    "technician_tasks.update_status",
+    """
+    UPDATE technician_tasks
+    SET status = $1
+    WHERE task_id = $2
+    RETURNING task_id, start_time, end_time, workshop, foreman_id, technician_id, task_description, status, important;
+    """,
+)
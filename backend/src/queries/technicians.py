@@ -0,0 +1,49 @@
+from queries.registry import statements
+
+
+LIST_TECHNICIANS = statements.add(
+    "technicians.list",
+    """
+    SELECT technician_id, specialization, full_name, gender, phone_number
+    FROM technicians
+    ORDER BY technician_id ASC;
+    """,
+)
+
+TECHNICIAN_BY_ID = statements.add(
+    "technicians.by_id",
+    """
+    SELECT technician_id, specialization, full_name, gender, phone_number
+    FROM technicians
+    WHERE technician_id = $1;
+    """,
+)
+
+TECHNICIAN_BY_PHONE = statements.add(
+    "technicians.by_phone",
+    """
+    SELECT technician_id
+    FROM technicians
+    WHERE phone_number = $1
+    LIMIT 1;
+    """,
+)
+
+INSERT_TECHNICIAN = statements.add(
+    "technicians.insert",
+    """
+    INSERT INTO technicians (specialization, full_name, gender, phone_number, password_hash)
+    VALUES ($1, $2, $3, $4, $5)
+    RETURNING technician_id, specialization, full_name, gender, phone_number;
+    """,
+)
+
+UPDATE_TECHNICIAN = statements.add(
+    "technicians.update",
+    """
+    UPDATE technicians
+    SET specialization = $1, full_name = $2, phone_number = $3
+    WHERE technician_id = $4
+    RETURNING technician_id, specialization, full_name, gender, phone_number;
+    """,
+)
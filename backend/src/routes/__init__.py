@@ -1,6 +1,7 @@
 __all__ = [
     "auth_router",
     "foremen_router",
+    "metrics_router",
     "notifications_router",
     "technician_tasks_router",
     "technicians_router",
@@ -8,6 +9,7 @@ __all__ = [
 
 from routes.auth import auth_router
 from routes.foremen import foremen_router
+from routes.metrics import metrics_router
 from routes.notifications import notifications_router
 from routes.technician_tasks import technician_tasks_router
 from routes.technicians import technicians_router
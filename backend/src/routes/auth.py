@@ -1,23 +1,50 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, status
 
-from schemas.auth import CurrentUser, LoginRequest, TokenResponse
-from services.auth import authenticate_user, create_access_token, get_current_user
+from config import config
+from schemas.auth import CurrentUser, LoginRequest, RefreshRequest, TokenResponse
+from services.auth import (
+    authenticate_user,
+    create_access_token,
+    create_refresh_token,
+    get_current_user,
+    revoke_refresh_token,
+    rotate_refresh_token,
+)
+from services.rate_limit import client_ip, login_rate_limiter
 
 
 auth_router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
-@auth_router.post("/login", response_model=TokenResponse)
-async def login(dto: LoginRequest):
-    user = await authenticate_user(dto)
+def token_response(user: CurrentUser, refresh_token: str) -> TokenResponse:
     return TokenResponse(
         access_token=create_access_token(user),
+        refresh_token=refresh_token,
+        expires_in=config.jwt.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
         role=user.role,
         user_id=user.user_id,
         full_name=user.full_name,
     )
 
 
+@auth_router.post("/login", response_model=TokenResponse)
+async def login(dto: LoginRequest, request: Request):
+    await login_rate_limiter.check(dto.phone_number, client_ip(request))
+    user = await authenticate_user(dto)
+    return token_response(user, await create_refresh_token(user))
+
+
+@auth_router.post("/refresh", response_model=TokenResponse)
+async def refresh(dto: RefreshRequest):
+    user, refresh_token = await rotate_refresh_token(dto.refresh_token)
+    return token_response(user, refresh_token)
+
+
+@auth_router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(dto: RefreshRequest):
+    await revoke_refresh_token(dto.refresh_token)
+
+
 @auth_router.get("/me", response_model=CurrentUser)
 async def me(user: CurrentUser = Depends(get_current_user)):
     return user
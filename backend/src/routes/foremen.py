@@ -1,16 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from errors import AppError
 from models import foremen
 from schemas.foreman import Foreman, ForemanCreate, ForemanUpdate
 from schemas.auth import CurrentUser
 from services.auth import require_role
+from services.etag import json_response
+from services.reference_cache import FOREMEN, reference_cache
 
 foremen_router = APIRouter(prefix="/foremen", tags=["Foremen"])
 
 
 @foremen_router.get("", response_model=list[Foreman])
-async def get_foremen(_: CurrentUser = Depends(require_role("foreman"))):
-    return await foremen.get_foremen()
+async def get_foremen(
+    request: Request, _: CurrentUser = Depends(require_role("foreman"))
+):
+    cached = await reference_cache.get(FOREMEN, foremen.get_foremen)
+    return json_response(request, cached.body, cached.etag)
 
 
 @foremen_router.get("/{foreman_id}", response_model=Foreman)
@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Response
+
+from services.metrics import CONTENT_TYPE, metrics
+
+
+metrics_router = APIRouter(tags=["Metrics"])
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
@@ -1,25 +1,96 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
 
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+
+from config import config
 from schemas.auth import CurrentUser
-from schemas.notification import Notification, UnreadCount
-from services.auth import get_current_user
+from schemas.notification import (
+    Notification,
+    NotificationsReadRequest,
+    NotificationsReadResult,
+    UnreadCount,
+)
+from schemas.pagination import Page, PageParams
+from services.auth import get_current_user, get_event_stream_user
+from services.etag import etag_matches, not_modified, request_etag, set_etag
 from services import notifications
+from services.notification_events import notification_broker
+from services.pagination import is_paginated
 
 
 notifications_router = APIRouter(prefix="/notifications", tags=["Notifications"])
 
 
-@notifications_router.get("", response_model=list[Notification])
-async def get_notifications(user: CurrentUser = Depends(get_current_user)):
+@notifications_router.get("", response_model=list[Notification] | Page[Notification])
+async def get_notifications(
+    request: Request,
+    response: Response,
+    cursor: str | None = None,
+    limit: int | None = None,
+    include_total: bool = True,
+    user: CurrentUser = Depends(get_current_user),
+):
+    page = PageParams(cursor=cursor, limit=limit, include_total=include_total)
+    etag = request_etag(
+        request,
+        user.role,
+        user.user_id,
+        *await notifications.get_notifications_version(user.role, user.user_id),
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    if is_paginated(page):
+        return await notifications.get_notifications_page(
+            user.role, user.user_id, page
+        )
     return await notifications.get_notifications(user.role, user.user_id)
 
 
+@notifications_router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    user: CurrentUser = Depends(get_event_stream_user),
+):
+    async def event_stream():
+        with notification_broker.subscribe(user.role, user.user_id) as queue:
+            while not await request.is_disconnected():
+                try:
+                    payload = await asyncio.wait_for(
+                        queue.get(),
+                        timeout=config.notifications.STREAM_KEEPALIVE_SECONDS,
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: notification\ndata: {payload}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @notifications_router.get("/unread-count", response_model=UnreadCount)
 async def get_unread_count(user: CurrentUser = Depends(get_current_user)):
     unread_count = await notifications.get_unread_count(user.role, user.user_id)
     return UnreadCount(unread_count=unread_count)
 
 
+@notifications_router.post("/read", response_model=NotificationsReadResult)
+async def read_notifications(
+    dto: NotificationsReadRequest,
+    user: CurrentUser = Depends(get_current_user),
+):
+    return await notifications.mark_notifications_as_read(
+        user.role,
+        user.user_id,
+        dto,
+    )
+
+
 @notifications_router.post("/{notification_id}/read", response_model=Notification)
 async def read_notification(
     notification_id: int,
@@ -1,29 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from errors import AppError, ErrorCode
 from models import technician_tasks
 from schemas.auth import CurrentUser
+from schemas.pagination import Page, PageParams
 from schemas.technician_task import (
     TaskStatusUpdate,
     TechnicianTask,
+    TechnicianTaskBulkCreate,
+    TechnicianTaskBulkResult,
     TechnicianTaskCreate,
+    TechnicianTaskSummary,
     TechnicianTaskUpdate,
     TechnicianTaskFilter
 )
 from services.auth import get_current_user, require_role
+from services.etag import (
+    etag_matches,
+    not_modified,
+    request_etag,
+    result_response,
+    set_etag,
+)
+from services.pagination import is_paginated
 
 technician_tasks_router = APIRouter(
     prefix="/technician-tasks", tags=["Technician Tasks"]
 )
 
 
-@technician_tasks_router.get("", response_model=list[TechnicianTask])
+@technician_tasks_router.get(
+    "", response_model=list[TechnicianTask] | Page[TechnicianTask]
+)
 async def get_technician_tasks(
+        request: Request,
         date_start: str = "",
         date_end: str = "",
         workshop: str = "",
         technician_name: str = "",
         foreman_name: str = "",
         status: str = "",
+        cursor: str | None = None,
+        limit: int | None = None,
+        include_total: bool = True,
         _user: CurrentUser = Depends(
             require_role("foreman", error_code=ErrorCode.TASK_LIST_FORBIDDEN)
         )):
@@ -37,18 +55,52 @@ async def get_technician_tasks(
 
     }
     prop = TechnicianTaskFilter(**d)
-    return await technician_tasks.get_technician_tasks(prop)
+    page = PageParams(cursor=cursor, limit=limit, include_total=include_total)
+    if is_paginated(page):
+        result = await technician_tasks.get_technician_tasks_page(prop, page)
+    else:
+        result = await technician_tasks.get_technician_tasks(prop)
+    return result_response(request, result)
+
+
+@technician_tasks_router.get("/summary", response_model=TechnicianTaskSummary)
+async def get_technician_task_summary(
+    foreman_id: int | None = None,
+    technician_id: int | None = None,
+    workshop: str | None = None,
+    user: CurrentUser = Depends(get_current_user),
+):
+    if user.role == "technician":
+        if foreman_id is not None or workshop is not None:
+            raise AppError(ErrorCode.FILTER_FORBIDDEN)
+        if technician_id not in (None, user.user_id):
+            raise AppError(ErrorCode.TASK_LIST_FORBIDDEN)
+        technician_id = user.user_id
+    elif foreman_id is None and technician_id is None and workshop is None:
+        foreman_id = user.user_id
+    return await technician_tasks.get_technician_task_summary(
+        foreman_id, technician_id, workshop
+    )
 
 
 @technician_tasks_router.get("/{task_id}", response_model=TechnicianTask)
 async def get_technician_task_by_id(
-    task_id: int, user: CurrentUser = Depends(get_current_user)
+    task_id: int,
+    request: Request,
+    response: Response,
+    user: CurrentUser = Depends(get_current_user),
 ):
     try:
-        task = await technician_tasks.get_technician_task_by_id(task_id)
-        if user.role == "technician" and task.technician_id != user.user_id:
+        technician_id, row_version = (
+            await technician_tasks.get_technician_task_version(task_id)
+        )
+        if user.role == "technician" and technician_id != user.user_id:
             raise AppError(ErrorCode.TASK_CROSS_WORKSHOP_ACCESS)
-        return task
+        etag = request_etag(request, row_version)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+        return await technician_tasks.get_technician_task_by_id(task_id)
     except AppError:
         raise
     except HTTPException:
@@ -92,6 +144,16 @@ async def create_technician_task(
     return await technician_tasks.insert_technician_task(dto)
 
 
+@technician_tasks_router.post("/bulk", response_model=TechnicianTaskBulkResult)
+async def create_technician_tasks(
+    dto: TechnicianTaskBulkCreate,
+    _user: CurrentUser = Depends(
+        require_role("foreman", error_code=ErrorCode.TASK_CREATE_FORBIDDEN)
+    ),
+):
+    return await technician_tasks.insert_technician_tasks(dto.tasks)
+
+
 @technician_tasks_router.put("/{task_id}", response_model=TechnicianTask)
 async def update_technician_task(
     task_id: int,
@@ -1,17 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from errors import AppError, ErrorCode
 from models import technicians, technician_tasks
 from schemas.auth import CurrentUser
+from schemas.pagination import Page, PageParams
 from schemas.technician import Technician, TechnicianCreate, TechnicianUpdate
-from schemas.technician_task import TechnicianTask
+from schemas.technician_task import TechnicianTask, TechnicianTaskChanges
 from services.auth import get_current_user, require_role
+from services.etag import (
+    etag_matches,
+    json_response,
+    not_modified,
+    request_etag,
+    set_etag,
+)
+from services.pagination import is_paginated
+from services.reference_cache import TECHNICIANS, reference_cache
 
 technicians_router = APIRouter(prefix="/technicians", tags=["Technicians"])
 
 
 @technicians_router.get("", response_model=list[Technician])
-async def get_technicians(_: CurrentUser = Depends(require_role("foreman"))):
-    return await technicians.get_technicians()
+async def get_technicians(
+    request: Request, _: CurrentUser = Depends(require_role("foreman"))
+):
+    cached = await reference_cache.get(TECHNICIANS, technicians.get_technicians)
+    return json_response(request, cached.body, cached.etag)
 
 
 @technicians_router.get("/{technician_id}", response_model=Technician)
@@ -28,16 +41,40 @@ async def get_technician_by_id(
         raise HTTPException(status_code=404, detail=str(e))
 
 
-@technicians_router.get("/{technician_id}/tasks", response_model=list[TechnicianTask])
+@technicians_router.get(
+    "/{technician_id}/tasks",
+    response_model=list[TechnicianTask] | Page[TechnicianTask],
+)
 async def get_tasks_by_technician_id(
-    technician_id: int, user: CurrentUser = Depends(get_current_user)
+    technician_id: int,
+    request: Request,
+    response: Response,
+    cursor: str | None = None,
+    limit: int | None = None,
+    include_total: bool = True,
+    user: CurrentUser = Depends(get_current_user),
 ):
     if user.role == "technician" and user.user_id != technician_id:
         raise AppError(ErrorCode.TASK_NOT_ASSIGNED_TO_USER)
+    foreman_id = user.user_id if user.role == "foreman" else None
+    page = PageParams(cursor=cursor, limit=limit, include_total=include_total)
     try:
+        etag = request_etag(
+            request,
+            user.user_id,
+            *await technician_tasks.get_technician_tasks_version_by_technician_id(
+                technician_id, foreman_id
+            ),
+        )
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+        if is_paginated(page):
+            return await technician_tasks.get_technician_tasks_page_by_technician_id(
+                technician_id, page, foreman_id
+            )
         return await technician_tasks.get_technician_tasks_by_technician_id(
-            technician_id,
-            user.user_id if user.role == "foreman" else None,
+            technician_id, foreman_id
         )
     except AppError:
         raise
@@ -45,6 +82,22 @@ async def get_tasks_by_technician_id(
         raise HTTPException(status_code=404, detail=str(e))
 
 
+@technicians_router.get(
+    "/{technician_id}/tasks/changes", response_model=TechnicianTaskChanges
+)
+async def get_task_changes_by_technician_id(
+    technician_id: int,
+    since: str | None = None,
+    user: CurrentUser = Depends(get_current_user),
+):
+    if user.role == "technician" and user.user_id != technician_id:
+        raise AppError(ErrorCode.TASK_NOT_ASSIGNED_TO_USER)
+    foreman_id = user.user_id if user.role == "foreman" else None
+    return await technician_tasks.get_technician_task_changes(
+        technician_id, since, foreman_id
+    )
+
+
 @technicians_router.post("", response_model=Technician)
 async def create_technician(
     dto: TechnicianCreate, _: CurrentUser = Depends(require_role("foreman"))
@@ -1,6 +1,12 @@
 from datetime import datetime
+from typing import Annotated
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+
+# notification_id is an INTEGER column; larger values would only fail in the
+# database driver.
+NotificationId = Annotated[int, Field(ge=-(2**31), le=2**31 - 1)]
 
 
 class Notification(BaseModel):
@@ -15,3 +21,14 @@ class Notification(BaseModel):
 
 class UnreadCount(BaseModel):
     unread_count: int
+
+
+class NotificationsReadRequest(BaseModel):
+    notification_ids: list[NotificationId] | None = None
+    up_to_id: NotificationId | None = None
+    up_to: datetime | None = None
+
+
+class NotificationsReadResult(BaseModel):
+    updated_count: int
+    unread_count: int
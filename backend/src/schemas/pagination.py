@@ -0,0 +1,18 @@
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel
+
+
+T = TypeVar("T")
+
+
+class PageParams(BaseModel):
+    cursor: str | None = None
+    limit: int | None = None
+    include_total: bool = True
+
+
+class Page(BaseModel, Generic[T]):
+    items: list[T]
+    next_cursor: str | None = None
+    total_count: int | None = None
@@ -1,4 +1,9 @@
-from pydantic import BaseModel
+from datetime import datetime
+
+from pydantic import BaseModel, field_validator
+
+
+TASK_DATE_FORMAT = "%d.%m.%Y %H:%M"
 
 
 class TaskStatusUpdate(BaseModel):
@@ -17,6 +22,13 @@ class TechnicianTask(BaseModel):
     status: str
     important: bool
 
+    @field_validator("start_time", "end_time", mode="before")
+    @classmethod
+    def format_task_datetime(cls, value: datetime | str) -> str:
+        if isinstance(value, datetime):
+            return value.strftime(TASK_DATE_FORMAT)
+        return value
+
 
 class TechnicianTaskCreate(BaseModel):
     start_time: str
@@ -27,6 +39,38 @@ class TechnicianTaskCreate(BaseModel):
     important: bool
 
 
+class TechnicianTaskBulkCreate(BaseModel):
+    tasks: list[TechnicianTaskCreate]
+
+
+class BulkItemError(BaseModel):
+    index: int
+    error_code: str
+    message: str
+
+
+class BulkCreatedTask(TechnicianTask):
+    index: int
+
+
+class TechnicianTaskBulkResult(BaseModel):
+    created: list[BulkCreatedTask]
+    errors: list[BulkItemError]
+
+
+class TechnicianTaskSummary(BaseModel):
+    total: int
+    by_status: dict[str, int]
+    important: int
+    overdue: int
+
+
+class TechnicianTaskChanges(BaseModel):
+    changed: list[TechnicianTask]
+    deleted: list[int]
+    watermark: str
+
+
 class TechnicianTaskUpdate(BaseModel):
     start_time: str
     end_time: str
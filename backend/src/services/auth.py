@@ -1,5 +1,9 @@
+import hashlib
+import secrets
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Annotated
+from uuid import UUID, uuid4
 
 import jwt
 from fastapi import Depends
@@ -9,14 +13,33 @@ from jwt import InvalidTokenError
 from config import config
 from database import database
 from errors import AppError, ErrorCode
+from queries.auth import (
+    DELETE_EXPIRED_REFRESH_TOKENS,
+    INSERT_REFRESH_TOKEN,
+    LOCK_REFRESH_TOKEN,
+    REVOKE_REFRESH_TOKEN,
+    REVOKE_REFRESH_TOKEN_FAMILY,
+    REVOKE_REFRESH_TOKEN_SESSION,
+    USER_BY_ID,
+    USER_BY_PHONE,
+)
 from schemas.auth import CurrentUser, LoginRequest
-from services.passwords import verify_password
+from services.cache import TTLCache
+from services.passwords import verify_password_async
 from services.phone import phone_number_variants
 
 
 bearer_scheme = HTTPBearer(auto_error=False)
 
 
+# Access tokens that already passed signature verification, so repeat
+# requests skip the HMAC check and CurrentUser construction.
+verified_tokens: TTLCache[str, CurrentUser] = TTLCache(
+    ttl_seconds=config.jwt.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    max_size=config.jwt.VERIFIED_TOKEN_CACHE_SIZE,
+)
+
+
 def create_access_token(user: CurrentUser) -> str:
     expires_at = datetime.now(timezone.utc) + timedelta(
         minutes=config.jwt.ACCESS_TOKEN_EXPIRE_MINUTES
@@ -32,46 +55,99 @@ def create_access_token(user: CurrentUser) -> str:
     return jwt.encode(payload, config.jwt.SECRET_KEY, algorithm=config.jwt.ALGORITHM)
 
 
+def user_from_row(role: str, row) -> CurrentUser:
+    return CurrentUser(
+        role=role,
+        user_id=row["user_id"],
+        phone_number=row["phone_number"],
+        full_name=row["full_name"],
+        workshop=row["workshop"],
+    )
+
+
 async def authenticate_user(dto: LoginRequest) -> CurrentUser:
-    if dto.role == "foreman":
-        query = """
-        SELECT foreman_id AS user_id, phone_number, full_name, workshop, password_hash
-        FROM foremen
-        WHERE phone_number = ANY($1::TEXT[]);
-        """
-    else:
-        query = """
-        SELECT technician_id AS user_id, phone_number, full_name, NULL AS workshop, password_hash
-        FROM technicians
-        WHERE phone_number = ANY($1::TEXT[]);
-        """
-
-    async with database.pool.acquire() as connection:
-        user = await connection.fetchrow(query, phone_number_variants(dto.phone_number))
-
-    if not user or not verify_password(dto.password, user["password_hash"]):
+    user = await database.fetchrow(
+        USER_BY_PHONE[dto.role], phone_number_variants(dto.phone_number)
+    )
+
+    # Unknown phones still pay for one verification, so response time does not
+    # reveal which numbers are registered.
+    password_hash_value = user["password_hash"] if user else None
+    if not await verify_password_async(dto.password, password_hash_value) or not user:
         raise AppError(ErrorCode.UNAUTHORIZED)
 
-    return CurrentUser(
-        role=dto.role,
-        user_id=user["user_id"],
-        phone_number=user["phone_number"],
-        full_name=user["full_name"],
-        workshop=user["workshop"],
+    return user_from_row(dto.role, user)
+
+
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+async def create_refresh_token(user: CurrentUser, family_id: UUID | None = None) -> str:
+    """Issues an opaque refresh token; only its SHA-256 is stored."""
+    token = secrets.token_urlsafe(32)
+    await database.execute(
+        INSERT_REFRESH_TOKEN,
+        hash_refresh_token(token),
+        family_id or uuid4(),
+        user.role,
+        user.user_id,
+        config.jwt.REFRESH_TOKEN_EXPIRE_DAYS,
     )
+    return token
 
 
-async def get_current_user(
-    credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(bearer_scheme)]
-) -> CurrentUser:
-    if credentials is None:
-        raise AppError(ErrorCode.UNAUTHORIZED)
+async def rotate_refresh_token(token: str) -> tuple[CurrentUser, str]:
+    """Exchanges a refresh token for the current user and a new token.
+
+    Each token is single-use. Presenting one that was already rotated means
+    it leaked, so the whole family issued from that login is revoked.
+    """
+    reused = False
+    async with database.transaction():
+        stored = await database.fetchrow(LOCK_REFRESH_TOKEN, hash_refresh_token(token))
+        if stored is None or not stored["active"]:
+            raise AppError(ErrorCode.INVALID_REFRESH_TOKEN)
+        if stored["revoked_at"] is not None:
+            reused = True
+            await revoke_refresh_token_family(stored["family_id"])
+        else:
+            await database.execute(REVOKE_REFRESH_TOKEN, hash_refresh_token(token))
+            role = stored["user_role"]
+            user = await database.fetchrow(USER_BY_ID[role], stored["user_id"])
+            if user is None:
+                raise AppError(ErrorCode.INVALID_REFRESH_TOKEN)
+            current_user = user_from_row(role, user)
+            new_token = await create_refresh_token(current_user, stored["family_id"])
 
+    if reused:
+        raise AppError(ErrorCode.INVALID_REFRESH_TOKEN)
+    return current_user, new_token
+
+
+async def revoke_refresh_token_family(family_id: UUID) -> None:
+    await database.execute(REVOKE_REFRESH_TOKEN_FAMILY, family_id)
+
+
+async def revoke_refresh_token(token: str) -> None:
+    """Logs out the session that the refresh token belongs to."""
+    await database.execute(REVOKE_REFRESH_TOKEN_SESSION, hash_refresh_token(token))
+
+
+async def delete_expired_refresh_tokens() -> None:
+    await database.execute(DELETE_EXPIRED_REFRESH_TOKENS)
+
+
+def decode_access_token(token: str) -> CurrentUser:
+    cached = verified_tokens.get(token)
+    if cached is not None:
+        return cached
     try:
         payload = jwt.decode(
-            credentials.credentials,
+            token,
             config.jwt.SECRET_KEY,
             algorithms=[config.jwt.ALGORITHM],
+            options={"require": ["exp", "sub"]},
         )
         user_id = int(payload["sub"])
         role = payload["role"]
@@ -80,13 +156,35 @@ async def get_current_user(
     except (InvalidTokenError, KeyError, TypeError, ValueError):
         raise AppError(ErrorCode.INVALID_CURRENT_USER)
 
-    return CurrentUser(
+    user = CurrentUser(
         role=role,
         user_id=user_id,
         phone_number=payload["phone_number"],
         full_name=payload["full_name"],
         workshop=payload.get("workshop"),
     )
+    verified_tokens.set(token, user, ttl_seconds=payload["exp"] - time.time())
+    return user
+
+
+async def get_current_user(
+    credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(bearer_scheme)]
+) -> CurrentUser:
+    if credentials is None:
+        raise AppError(ErrorCode.UNAUTHORIZED)
+    return decode_access_token(credentials.credentials)
+
+
+async def get_event_stream_user(
+    credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(bearer_scheme)],
+    access_token: str | None = None,
+) -> CurrentUser:
+    """Browsers' EventSource cannot send headers, so also accept ?access_token=."""
+    if credentials is not None:
+        return decode_access_token(credentials.credentials)
+    if access_token is None:
+        raise AppError(ErrorCode.UNAUTHORIZED)
+    return decode_access_token(access_token)
 
 
 def require_role(*roles: str, error_code: ErrorCode = ErrorCode.TASK_LIST_FORBIDDEN):
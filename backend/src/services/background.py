@@ -0,0 +1,44 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundJobs:
+    def __init__(self) -> None:
+        self.tasks: list[asyncio.Task] = []
+
+    def schedule(
+        self,
+        name: str,
+        interval_seconds: float,
+        job: Callable[[], Awaitable[object]],
+    ) -> None:
+        task = asyncio.create_task(
+            self.run_periodically(name, interval_seconds, job), name=name
+        )
+        self.tasks.append(task)
+
+    async def run_periodically(
+        self,
+        name: str,
+        interval_seconds: float,
+        job: Callable[[], Awaitable[object]],
+    ) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await job()
+            except Exception:
+                logger.exception("Background job %s failed", name)
+
+    async def stop(self) -> None:
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks.clear()
+
+
+background_jobs = BackgroundJobs()
@@ -0,0 +1,46 @@
+import time
+from collections.abc import Hashable
+from typing import Generic, TypeVar
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """Small in-process cache whose entries expire after a fixed time.
+
+    When full, the least recently used entry is evicted.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int = 10_000) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.entries: dict[K, tuple[float, V]] = {}
+
+    def get(self, key: K) -> V | None:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        del self.entries[key]
+        if expires_at <= time.monotonic():
+            return None
+        self.entries[key] = entry
+        return value
+
+    def set(self, key: K, value: V, ttl_seconds: float | None = None) -> None:
+        """Stores value; ttl_seconds shortens or extends the default lifetime."""
+        ttl_seconds = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        if ttl_seconds <= 0:
+            return
+        self.entries.pop(key, None)
+        if len(self.entries) >= self.max_size:
+            del self.entries[next(iter(self.entries))]
+        self.entries[key] = (time.monotonic() + ttl_seconds, value)
+
+    def delete(self, key: K) -> None:
+        self.entries.pop(key, None)
+
+    def clear(self) -> None:
+        self.entries.clear()
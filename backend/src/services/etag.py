@@ -0,0 +1,80 @@
+import hashlib
+
+from fastapi import Request, Response, status
+from pydantic import BaseModel
+
+
+def make_etag(*parts: object) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b"\0")
+    return f'"{digest.hexdigest()}"'
+
+
+def make_weak_etag(*parts: object) -> str:
+    """ETag derived from row versions rather than from the response bytes."""
+    return "W/" + make_etag(*parts)
+
+
+def request_etag(request: Request, *parts: object) -> str:
+    """Weak ETag scoped to the request URL, so filters and pages differ."""
+    return make_weak_etag(request.url.path, request.url.query, *parts)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison, as If-None-Match requires."""
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return False
+    candidates = {value.strip().removeprefix("W/") for value in header.split(",")}
+    return etag.removeprefix("W/") in candidates or "*" in candidates
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": "private, no-cache"},
+    )
+
+
+def json_response(request: Request, body: bytes, etag: str) -> Response:
+    """Serves a pre-serialised JSON body, or 304 when the client has it.
+
+    no-cache makes browsers revalidate every time, so a change is never
+    missed, while unchanged data costs only the 304.
+    """
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": "private, no-cache"},
+    )
+
+
+def dump_json(result: BaseModel | list[BaseModel]) -> bytes:
+    if isinstance(result, BaseModel):
+        return result.model_dump_json().encode()
+    return b"[%s]" % b",".join(item.model_dump_json().encode() for item in result)
+
+
+def result_response(
+    request: Request, result: BaseModel | list[BaseModel], *parts: object
+) -> Response:
+    """Serves a query result with an ETag derived from the returned body.
+
+    For lists whose filters can match most of a table, where a COUNT and
+    MAX(row_version) validator would cost a pass over every matching row
+    on each poll. Hashing the body costs only the page query itself, but a
+    matching request still runs that query and serialises the result; only
+    the transfer is saved. Lists bounded by an indexed owner, such as one
+    technician's tasks, are cheaper to validate by row versions up front.
+    """
+    body = dump_json(result)
+    return json_response(request, body, request_etag(request, *parts, body))
@@ -0,0 +1,316 @@
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Sequence
+
+from fastapi import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config import config
+from database import database
+from services.passwords import password_hasher
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+UNMATCHED_ROUTE = "unmatched"
+IN_FLIGHT_SCOPE_KEY = "metrics.in_flight"
+
+Labels = tuple[str, ...]
+
+
+def escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(names: Sequence[str], values: Labels) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{escape_label_value(value)}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, int) or value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = ()) -> None:
+        super().__init__(name, help, label_names)
+        self.values: dict[Labels, float] = defaultdict(int)
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        self.values[labels] += amount
+
+    def set(self, labels: Labels, value: float) -> None:
+        """Copies a total kept elsewhere; meant for collectors."""
+        self.values[labels] = value
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self.values.items():
+            yield (
+                f"{self.name}{format_labels(self.label_names, labels)} "
+                f"{format_value(value)}"
+            )
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: Labels = (), amount: float = 1) -> None:
+        self.values[labels] -= amount
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = (),
+    ) -> None:
+        super().__init__(name, help, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: one count per bucket plus +Inf, then the sum.
+        self.values: dict[Labels, list[float]] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        counts = self.values.get(labels)
+        if counts is None:
+            counts = self.values[labels] = [0] * (len(self.buckets) + 2)
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def samples(self) -> Iterable[str]:
+        label_names = (*self.label_names, "le")
+        for labels, counts in self.values.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                yield (
+                    f"{self.name}_bucket"
+                    f"{format_labels(label_names, (*labels, format_value(bound)))} "
+                    f"{cumulative}"
+                )
+            suffix = format_labels(self.label_names, labels)
+            yield f"{self.name}_sum{suffix} {format_value(counts[-1])}"
+            yield f"{self.name}_count{suffix} {cumulative}"
+
+
+class MetricsRegistry:
+    """Process-local metrics rendered in the Prometheus text format.
+
+    Metrics are only updated from the event loop thread, so plain dict and
+    number updates are safe without locks and cost a few dictionary
+    operations per request. Collectors run at scrape time to refresh values
+    read from elsewhere, such as pool statistics.
+
+    With several workers every process keeps its own values; each scrape is
+    answered by one of them.
+    """
+
+    def __init__(self) -> None:
+        self.metrics: list[Metric] = []
+        self.collectors: list[Callable[[], None]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, label_names: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, label_names))
+
+    def gauge(self, name: str, help: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, label_names))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = (),
+    ) -> Histogram:
+        return self.register(Histogram(name, help, label_names, buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self.collectors:
+            collector()
+        lines = []
+        for metric in self.metrics:
+            lines += metric.header()
+            lines += metric.samples()
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+http_requests = metrics.counter(
+    "http_requests_total",
+    "HTTP requests by route template and status.",
+    ("method", "route", "status"),
+)
+http_request_duration = metrics.histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the end of its response.",
+    ("method", "route", "status"),
+    config.metrics.LATENCY_BUCKETS,
+)
+http_requests_in_flight = metrics.gauge(
+    "http_requests_in_flight",
+    "HTTP requests being processed, including open event streams.",
+    ("method", "route"),
+)
+
+db_pool_connections = metrics.gauge(
+    "db_pool_connections",
+    "Connections in the pool of this worker by state.",
+    ("state",),
+)
+db_pool_limits = metrics.gauge(
+    "db_pool_size_limit", "Configured pool size bounds.", ("bound",)
+)
+db_pool_waiters = metrics.gauge(
+    "db_pool_waiters", "Requests waiting for a pool connection."
+)
+db_pool_acquisitions = metrics.counter(
+    "db_pool_acquisitions_total", "Connections handed out by the pool."
+)
+db_pool_acquire_wait = metrics.counter(
+    "db_pool_acquire_wait_seconds_total", "Time spent waiting for a connection."
+)
+db_query_duration = metrics.histogram(
+    "db_query_duration_seconds",
+    "Time spent in named queries, including waiting for the result.",
+    ("query",),
+    config.metrics.QUERY_LATENCY_BUCKETS,
+)
+db_query_rows = metrics.counter(
+    "db_query_rows_total",
+    "Rows returned or affected by named queries.",
+    ("query",),
+)
+password_hasher_jobs = metrics.gauge(
+    "password_hasher_jobs", "Argon2 jobs by state.", ("state",)
+)
+password_hasher_completed = metrics.counter(
+    "password_hasher_completed_total", "Argon2 jobs finished."
+)
+password_hasher_rejected = metrics.counter(
+    "password_hasher_rejected_total", "Argon2 jobs rejected with a full queue."
+)
+
+
+def collect_pool_metrics() -> None:
+    if getattr(database, "pool", None) is None:
+        return
+    pool = database.pool_metrics()
+    db_pool_connections.set(("open",), pool.size)
+    db_pool_connections.set(("idle",), pool.idle)
+    db_pool_connections.set(("acquired",), pool.acquired)
+    db_pool_limits.set(("min",), pool.min_size)
+    db_pool_limits.set(("max",), pool.max_size)
+    db_pool_waiters.set((), pool.waiters)
+    db_pool_acquisitions.set((), pool.acquisitions)
+    db_pool_acquire_wait.set((), pool.acquire_wait_seconds)
+
+
+def collect_password_hasher_metrics() -> None:
+    stats = password_hasher.stats()
+    password_hasher_jobs.set(("queued",), stats.queued)
+    password_hasher_jobs.set(("running",), stats.running)
+    password_hasher_completed.set((), stats.completed)
+    password_hasher_rejected.set((), stats.rejected)
+
+
+def observe_query(name: str, seconds: float, rows: int) -> None:
+    labels = (name,)
+    db_query_duration.observe(labels, seconds)
+    db_query_rows.inc(labels, rows)
+
+
+metrics.add_collector(collect_pool_metrics)
+metrics.add_collector(collect_password_hasher_metrics)
+if config.metrics.ENABLED:
+    database.add_query_observer(observe_query)
+
+
+def route_template(scope: Scope) -> str:
+    """Path template of the route that handled the request.
+
+    Labelling by template instead of the raw path keeps ids out of the
+    label values. The router stores the route in the scope, also for a
+    path that only matched with another method (405).
+    """
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+async def track_in_flight(request: Request) -> None:
+    """App-wide dependency counting the request as in flight for its route.
+
+    It runs right after routing, the first point where the template is
+    known; MetricsMiddleware ends the count when the response is sent.
+    Being async, it runs on the event loop rather than taking a threadpool
+    thread for every request.
+    """
+    labels = (request.method, route_template(request.scope))
+    http_requests_in_flight.inc(labels)
+    request.scope[IN_FLIGHT_SCOPE_KEY] = labels
+
+
+class MetricsMiddleware:
+    """Records count and latency of every HTTP request."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            labels = (scope["method"], route_template(scope), status)
+            http_request_duration.observe(labels, time.perf_counter() - started)
+            http_requests.inc(labels)
+            in_flight_labels = scope.pop(IN_FLIGHT_SCOPE_KEY, None)
+            if in_flight_labels is not None:
+                http_requests_in_flight.dec(in_flight_labels)
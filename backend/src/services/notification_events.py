@@ -0,0 +1,137 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+import asyncpg
+
+from config import config
+
+
+NOTIFICATIONS_CHANNEL = "notifications"
+RECONNECT_DELAY_SECONDS = 5
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationBroker:
+    """Fans out pg_notify events to the event streams open in this worker.
+
+    A single dedicated connection LISTENs on the notifications channel, so the
+    number of database connections does not grow with connected clients.
+    Other channels can be added with add_channel_handler and share it.
+    """
+
+    def __init__(self) -> None:
+        self.dsn: str | None = None
+        self.connection: asyncpg.Connection | None = None
+        self.subscribers: dict[tuple[str, int], set[asyncio.Queue[str]]] = (
+            defaultdict(set)
+        )
+        self.reconnect_task: asyncio.Task | None = None
+        self.handlers: list[Callable[[dict], None]] = []
+        self.channel_handlers: dict[str, list[Callable[[str], None]]] = (
+            defaultdict(list)
+        )
+
+    async def start(self, dsn: str) -> None:
+        self.dsn = dsn
+        await self.listen()
+
+    async def stop(self) -> None:
+        if self.reconnect_task is not None:
+            self.reconnect_task.cancel()
+            self.reconnect_task = None
+        if self.connection is not None:
+            connection, self.connection = self.connection, None
+            await connection.close()
+
+    async def listen(self) -> None:
+        self.connection = await asyncpg.connect(self.dsn)
+        self.connection.add_termination_listener(self.on_connection_lost)
+        await self.connection.add_listener(NOTIFICATIONS_CHANNEL, self.dispatch)
+        for channel in self.channel_handlers:
+            await self.connection.add_listener(channel, self.dispatch_channel)
+
+    def add_handler(self, handler: Callable[[dict], None]) -> None:
+        """Registers a callback run in this worker for every event."""
+        self.handlers.append(handler)
+
+    def add_channel_handler(
+        self, channel: str, handler: Callable[[str], None]
+    ) -> None:
+        """Registers a callback for raw payloads on another channel.
+
+        Takes effect when the listener connects, so call it at import time.
+        """
+        self.channel_handlers[channel].append(handler)
+
+    def dispatch_channel(
+        self,
+        _connection: asyncpg.Connection,
+        _pid: int,
+        channel: str,
+        payload: str,
+    ) -> None:
+        for handler in self.channel_handlers.get(channel, ()):
+            handler(payload)
+
+    def on_connection_lost(self, connection: asyncpg.Connection) -> None:
+        if connection is not self.connection:
+            return
+        logger.warning("Notification listener connection lost, reconnecting")
+        self.connection = None
+        self.reconnect_task = asyncio.create_task(self.reconnect())
+
+    async def reconnect(self) -> None:
+        while self.connection is None:
+            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+            try:
+                await self.listen()
+            except (OSError, asyncpg.PostgresError):
+                logger.exception("Notification listener reconnect failed")
+        self.reconnect_task = None
+
+    def dispatch(
+        self,
+        _connection: asyncpg.Connection,
+        _pid: int,
+        _channel: str,
+        payload: str,
+    ) -> None:
+        try:
+            event = json.loads(payload)
+            key = (event["recipient_role"], int(event["recipient_id"]))
+        except (KeyError, TypeError, ValueError):
+            logger.warning("Malformed notification event: %s", payload)
+            return
+        for handler in self.handlers:
+            handler(event)
+        for queue in self.subscribers.get(key, ()):
+            try:
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                # A slow client misses pushes, not data: the next full fetch
+                # of /notifications returns everything.
+                pass
+
+    @contextmanager
+    def subscribe(
+        self, recipient_role: str, recipient_id: int
+    ) -> Iterator[asyncio.Queue[str]]:
+        key = (recipient_role, recipient_id)
+        queue: asyncio.Queue[str] = asyncio.Queue(
+            maxsize=config.notifications.STREAM_QUEUE_SIZE
+        )
+        self.subscribers[key].add(queue)
+        try:
+            yield queue
+        finally:
+            self.subscribers[key].discard(queue)
+            if not self.subscribers[key]:
+                del self.subscribers[key]
+
+
+notification_broker = NotificationBroker()
@@ -1,5 +1,40 @@
+from datetime import datetime, timedelta
+
+from config import config
 from database import database
-from schemas.notification import Notification
+from errors import AppError, ErrorCode
+from queries.notifications import (
+    ARCHIVE_READ,
+    COUNT_NOTIFICATIONS,
+    DRIFTED_COUNTERS,
+    INSERT_NOTIFICATIONS,
+    LIST_NOTIFICATIONS,
+    LOCK_COUNTER,
+    MARK_READ,
+    MARK_READ_SELECTIONS,
+    NOTIFICATIONS_FIRST_PAGE,
+    NOTIFICATIONS_NEXT_PAGE,
+    NOTIFICATIONS_VERSION,
+    RECONCILE_LOCK_KEY,
+    RECONCILE_UNLOCK,
+    REPAIR_COUNTER,
+    TRY_RECONCILE_LOCK,
+    UNREAD_COUNT,
+)
+from schemas.notification import (
+    Notification,
+    NotificationsReadRequest,
+    NotificationsReadResult,
+)
+from schemas.pagination import Page, PageParams
+from services.cache import TTLCache
+from services.notification_events import NOTIFICATIONS_CHANNEL, notification_broker
+from services.pagination import decode_cursor, encode_cursor, page_limit
+
+
+unread_counts: TTLCache[tuple[str, int], int] = TTLCache(
+    config.notifications.UNREAD_COUNT_CACHE_SECONDS
+)
 
 
 async def create_notification(
@@ -8,43 +43,99 @@ async def create_notification(
     task_id: int | None,
     message: str,
 ) -> Notification:
-    query = """
-    INSERT INTO notifications (recipient_role, recipient_id, task_id, message)
-    VALUES ($1, $2, $3, $4)
-    RETURNING notification_id, recipient_role, recipient_id, task_id, message, is_read, created_at;
+    [notification] = await create_notifications(
+        [(recipient_role, recipient_id, task_id, message)]
+    )
+    return notification
+
+
+async def create_notifications(
+    notifications: list[tuple[str, int, int | None, str]],
+) -> list[Notification]:
+    """Inserts (recipient_role, recipient_id, task_id, message) rows at once.
+
+    The pg_notify events are raised by the same statement, so they are
+    delivered only if the surrounding unit of work commits.
     """
-    async with database.pool.acquire() as connection:
-        notification = await connection.fetchrow(
-            query,
-            recipient_role,
-            recipient_id,
-            task_id,
-            message,
+    records = await database.fetch(
+        INSERT_NOTIFICATIONS,
+        *map(list, zip(*notifications)),
+        NOTIFICATIONS_CHANNEL,
+    )
+    created = [Notification(**record) for record in records]
+    for notification in created:
+        unread_counts.delete(
+            (notification.recipient_role, notification.recipient_id)
         )
-    return Notification(**notification)
+    return created
 
 
 async def get_notifications(recipient_role: str, recipient_id: int) -> list[Notification]:
-    query = """
-    SELECT notification_id, recipient_role, recipient_id, task_id, message, is_read, created_at
-    FROM notifications
-    WHERE recipient_role = $1 AND recipient_id = $2
-    ORDER BY created_at DESC, notification_id DESC;
-    """
-    async with database.pool.acquire() as connection:
-        rows = await connection.fetch(query, recipient_role, recipient_id)
+    rows = await database.fetch(LIST_NOTIFICATIONS, recipient_role, recipient_id)
     return [Notification(**row) for row in rows]
 
 
+async def get_notifications_version(
+    recipient_role: str, recipient_id: int
+) -> tuple[int, int]:
+    """Returns (row count, max row_version) of the recipient's notifications."""
+    count, version = await database.fetchrow(
+        NOTIFICATIONS_VERSION, recipient_role, recipient_id
+    )
+    return count, version
+
+
+async def get_notifications_page(
+    recipient_role: str, recipient_id: int, page: PageParams
+) -> Page[Notification]:
+    limit = page_limit(page)
+    if page.cursor is None:
+        statement = NOTIFICATIONS_FIRST_PAGE
+        params = [recipient_role, recipient_id, limit + 1]
+    else:
+        cursor = decode_cursor(page.cursor, "created_at", "notification_id")
+        try:
+            created_at = datetime.fromisoformat(cursor["created_at"])
+        except (TypeError, ValueError):
+            raise AppError(ErrorCode.INVALID_PAGINATION_PARAMS)
+        if not isinstance(cursor["notification_id"], int):
+            raise AppError(ErrorCode.INVALID_PAGINATION_PARAMS)
+        statement = NOTIFICATIONS_NEXT_PAGE
+        params = [
+            recipient_role,
+            recipient_id,
+            created_at,
+            cursor["notification_id"],
+            limit + 1,
+        ]
+    async with database.connection():
+        rows = await database.fetch(statement, *params)
+        total_count = (
+            await database.fetchval(COUNT_NOTIFICATIONS, recipient_role, recipient_id)
+            if page.include_total
+            else None
+        )
+
+    items = [Notification(**row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(
+            created_at=items[-1].created_at.isoformat(),
+            notification_id=items[-1].notification_id,
+        )
+    return Page[Notification](
+        items=items, next_cursor=next_cursor, total_count=total_count
+    )
+
+
 async def get_unread_count(recipient_role: str, recipient_id: int) -> int:
-    query = """
-    SELECT COUNT(*) AS unread_count
-    FROM notifications
-    WHERE recipient_role = $1 AND recipient_id = $2 AND is_read = FALSE;
-    """
-    async with database.pool.acquire() as connection:
-        row = await connection.fetchrow(query, recipient_role, recipient_id)
-    return row["unread_count"]
+    cached = unread_counts.get((recipient_role, recipient_id))
+    if cached is not None:
+        return cached
+    unread_count = await database.fetchval(UNREAD_COUNT, recipient_role, recipient_id)
+    unread_count = unread_count or 0
+    unread_counts.set((recipient_role, recipient_id), unread_count)
+    return unread_count
 
 
 async def mark_notification_as_read(
@@ -52,19 +143,100 @@ async def mark_notification_as_read(
     recipient_role: str,
     recipient_id: int,
 ) -> Notification:
-    query = """
-    UPDATE notifications
-    SET is_read = TRUE
-    WHERE notification_id = $1 AND recipient_role = $2 AND recipient_id = $3
-    RETURNING notification_id, recipient_role, recipient_id, task_id, message, is_read, created_at;
-    """
-    async with database.pool.acquire() as connection:
-        notification = await connection.fetchrow(
-            query,
-            notification_id,
-            recipient_role,
-            recipient_id,
-        )
+    notification = await database.fetchrow(
+        MARK_READ,
+        notification_id,
+        recipient_role,
+        recipient_id,
+    )
     if notification is None:
         raise Exception(f"Уведомление {notification_id} не найдено")
+    unread_counts.delete((recipient_role, recipient_id))
     return Notification(**notification)
+
+
+async def mark_notifications_as_read(
+    recipient_role: str,
+    recipient_id: int,
+    dto: NotificationsReadRequest,
+) -> NotificationsReadResult:
+    selectors = [
+        selector
+        for selector in (dto.notification_ids, dto.up_to_id, dto.up_to)
+        if selector is not None
+    ]
+    if len(selectors) != 1:
+        raise AppError(ErrorCode.INVALID_NOTIFICATION_SELECTION)
+    # created_at is a naive TIMESTAMP, as returned by the API; an offset
+    # could only be applied by guessing the database time zone.
+    if dto.up_to is not None and dto.up_to.tzinfo is not None:
+        raise AppError(ErrorCode.INVALID_NOTIFICATION_SELECTION)
+
+    if dto.notification_ids is not None:
+        selection = "ids"
+    elif dto.up_to_id is not None:
+        selection = "up_to_id"
+    else:
+        selection = "up_to"
+    status = await database.execute(
+        MARK_READ_SELECTIONS[selection],
+        recipient_role,
+        recipient_id,
+        selectors[0],
+    )
+    unread_counts.delete((recipient_role, recipient_id))
+    return NotificationsReadResult(
+        updated_count=int(status.split()[-1]),
+        unread_count=await get_unread_count(recipient_role, recipient_id),
+    )
+
+
+async def archive_read_notifications(older_than: datetime, batch_size: int) -> int:
+    status = await database.execute(ARCHIVE_READ, older_than, batch_size)
+    return int(status.split()[-1])
+
+
+async def run_notification_retention() -> int:
+    older_than = datetime.now() - timedelta(days=config.notifications.RETENTION_DAYS)
+    batch_size = config.notifications.ARCHIVE_BATCH_SIZE
+    archived = 0
+    while True:
+        moved = await archive_read_notifications(older_than, batch_size)
+        archived += moved
+        if moved < batch_size:
+            return archived
+
+
+async def reconcile_unread_counters() -> int:
+    """Rewrites counters that drifted from the notifications table.
+
+    Every worker schedules the job, but an advisory lock lets only one of
+    them run it at a time. Drifted recipients are found without locking
+    and repaired one at a time: the counter row is locked before the
+    recount, so a concurrent writer either committed before the recount or
+    applies its trigger delta on top of the repaired value.
+    """
+    repaired = 0
+    async with database.connection():
+        if not await database.fetchval(TRY_RECONCILE_LOCK, RECONCILE_LOCK_KEY):
+            return 0
+        try:
+            drifted = await database.fetch(DRIFTED_COUNTERS)
+            for recipient_role, recipient_id in drifted:
+                async with database.transaction():
+                    await database.execute(LOCK_COUNTER, recipient_role, recipient_id)
+                    status = await database.execute(
+                        REPAIR_COUNTER, recipient_role, recipient_id
+                    )
+                repaired += int(status.split()[-1])
+                unread_counts.delete((recipient_role, recipient_id))
+        finally:
+            await database.fetchval(RECONCILE_UNLOCK, RECONCILE_LOCK_KEY)
+    return repaired
+
+
+def forget_unread_count(event: dict) -> None:
+    unread_counts.delete((event["recipient_role"], int(event["recipient_id"])))
+
+
+notification_broker.add_handler(forget_unread_count)
@@ -0,0 +1,38 @@
+import base64
+import binascii
+import json
+from typing import Any
+
+from errors import AppError, ErrorCode
+from schemas.pagination import PageParams
+
+
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 200
+
+
+def is_paginated(page: PageParams) -> bool:
+    return page.cursor is not None or page.limit is not None
+
+
+def page_limit(page: PageParams) -> int:
+    limit = page.limit if page.limit is not None else DEFAULT_PAGE_LIMIT
+    if not 1 <= limit <= MAX_PAGE_LIMIT:
+        raise AppError(ErrorCode.INVALID_PAGINATION_PARAMS)
+    return limit
+
+
+def encode_cursor(**values: Any) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *keys: str) -> dict[str, Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise AppError(ErrorCode.INVALID_PAGINATION_PARAMS)
+    if not isinstance(values, dict) or set(values) != set(keys):
+        raise AppError(ErrorCode.INVALID_PAGINATION_PARAMS)
+    return values
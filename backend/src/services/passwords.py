@@ -1,7 +1,28 @@
+import asyncio
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TypeVar
+
 from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+from config import config
+from errors import AppError, ErrorCode
+
 
+T = TypeVar("T")
 
-password_hash = PasswordHash.recommended()
+password_hash = PasswordHash(
+    (
+        Argon2Hasher(
+            time_cost=config.passwords.ARGON2_TIME_COST,
+            memory_cost=config.passwords.ARGON2_MEMORY_COST,
+            parallelism=config.passwords.ARGON2_PARALLELISM,
+        ),
+    )
+)
 
 
 def hash_password(password: str) -> str:
@@ -12,3 +33,105 @@ def verify_password(password: str, password_hash_value: str | None) -> bool:
     if not password_hash_value:
         return False
     return password_hash.verify(password, password_hash_value)
+
+
+@dataclass
+class HasherStats:
+    workers: int
+    queued: int
+    running: int
+    completed: int
+    rejected: int
+
+
+class PasswordHasherPool:
+    """Runs Argon2 work on a few dedicated threads instead of the event loop.
+
+    argon2-cffi releases the GIL while hashing, so requests keep being served
+    while a hash is computed. Calls beyond max_queue waiting jobs are
+    rejected rather than queued without bound.
+    """
+
+    def __init__(self, workers: int, max_queue: int) -> None:
+        self.workers = workers
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hasher"
+        )
+        self.lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def call(self, func: Callable[..., T], *args) -> T:
+        with self.lock:
+            self.queued -= 1
+            self.running += 1
+        try:
+            return func(*args)
+        finally:
+            with self.lock:
+                self.running -= 1
+                self.completed += 1
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        with self.lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise AppError(ErrorCode.AUTH_SERVICE_BUSY)
+            self.queued += 1
+        job = self.executor.submit(self.call, func, *args)
+        try:
+            return await asyncio.wrap_future(job)
+        except asyncio.CancelledError:
+            # A job that never started will not release its queue slot in
+            # call(); cancel() only succeeds while the job is still waiting.
+            if job.cancel():
+                with self.lock:
+                    self.queued -= 1
+            raise
+
+    def stats(self) -> HasherStats:
+        with self.lock:
+            return HasherStats(
+                workers=self.workers,
+                queued=self.queued,
+                running=self.running,
+                completed=self.completed,
+                rejected=self.rejected,
+            )
+
+
+password_hasher = PasswordHasherPool(
+    config.passwords.HASHER_WORKERS,
+    config.passwords.HASHER_MAX_QUEUE,
+)
+
+
+async def hash_password_async(password: str) -> str:
+    return await password_hasher.run(hash_password, password)
+
+
+# Verified in place of a missing hash so that unknown accounts take as long
+# to reject as a wrong password. Computed on first use, through the pool,
+# rather than on import.
+dummy_password_hash: str | None = None
+
+
+async def get_dummy_password_hash() -> str:
+    global dummy_password_hash
+    if dummy_password_hash is None:
+        dummy_password_hash = await hash_password_async("dummy-password-for-timing")
+    return dummy_password_hash
+
+
+async def verify_password_async(
+    password: str, password_hash_value: str | None
+) -> bool:
+    if not password_hash_value:
+        await password_hasher.run(
+            verify_password, password, await get_dummy_password_hash()
+        )
+        return False
+    return await password_hasher.run(verify_password, password, password_hash_value)
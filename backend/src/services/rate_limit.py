@@ -0,0 +1,143 @@
+import math
+import time
+from typing import Protocol
+
+from fastapi import Request
+
+from config import config
+from database import database
+from errors import AppError, ErrorCode
+from queries.rate_limit import DELETE_IDLE_BUCKETS, RESET_BUCKETS, TAKE_TOKEN
+from services.phone import normalize_phone_number
+
+
+class TokenBucketBackend(Protocol):
+    async def take(self, key: str, capacity: float, refill_per_second: float) -> bool:
+        """Removes one token from the bucket; False when it is empty."""
+        ...
+
+    async def delete_idle(self, idle_seconds: float) -> None:
+        """Forgets buckets untouched for idle_seconds; they start full again."""
+        ...
+
+    async def reset(self) -> None: ...
+
+
+class InMemoryTokenBuckets:
+    """Buckets local to this worker process.
+
+    Each worker enforces its own limits, so with N workers a client gets up
+    to N times the configured rate. Use the postgres backend to share them.
+    """
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self.max_keys = max_keys
+        self.buckets: dict[str, tuple[float, float]] = {}
+
+    async def take(self, key: str, capacity: float, refill_per_second: float) -> bool:
+        now = time.monotonic()
+        tokens, updated_at = self.buckets.pop(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        if len(self.buckets) >= self.max_keys:
+            del self.buckets[next(iter(self.buckets))]
+        self.buckets[key] = (tokens, now)
+        return allowed
+
+    async def delete_idle(self, idle_seconds: float) -> None:
+        cutoff = time.monotonic() - idle_seconds
+        self.buckets = {
+            key: bucket for key, bucket in self.buckets.items() if bucket[1] >= cutoff
+        }
+
+    async def reset(self) -> None:
+        self.buckets.clear()
+
+
+class PostgresTokenBuckets:
+    """Buckets kept in an UNLOGGED table, shared by every worker and host."""
+
+    async def take(self, key: str, capacity: float, refill_per_second: float) -> bool:
+        return await database.fetchval(TAKE_TOKEN, key, capacity, refill_per_second)
+
+    async def delete_idle(self, idle_seconds: float) -> None:
+        await database.execute(DELETE_IDLE_BUCKETS, idle_seconds)
+
+    async def reset(self) -> None:
+        await database.execute(RESET_BUCKETS)
+
+
+def create_backend(name: str) -> TokenBucketBackend:
+    if name == "postgres":
+        return PostgresTokenBuckets()
+    return InMemoryTokenBuckets()
+
+
+class LoginRateLimiter:
+    """Caps login attempts per phone number and per client address.
+
+    Rejected attempts never reach the database lookup or Argon2, which bounds
+    the CPU a login storm can take from a worker.
+    """
+
+    def __init__(self, backend: TokenBucketBackend) -> None:
+        self.backend = backend
+
+    async def check(self, phone_number: str, client_ip: str | None) -> None:
+        settings = config.login_rate_limit
+        if not settings.ENABLED:
+            return
+        phone_allowed = await self.backend.take(
+            f"phone:{normalize_phone_number(phone_number)}",
+            settings.PHONE_CAPACITY,
+            settings.PHONE_REFILL_PER_MINUTE / 60,
+        )
+        ip_allowed = client_ip is None or await self.backend.take(
+            f"ip:{client_ip}",
+            settings.IP_CAPACITY,
+            settings.IP_REFILL_PER_MINUTE / 60,
+        )
+        if not (phone_allowed and ip_allowed):
+            raise AppError(ErrorCode.TOO_MANY_LOGIN_ATTEMPTS)
+
+    async def delete_refilled_buckets(self) -> None:
+        """Deletes buckets that have been idle long enough to be full again.
+
+        A deleted bucket is recreated full on the next attempt, so limits are
+        unaffected, while keys cycled by an attacker do not pile up.
+        """
+        settings = config.login_rate_limit
+        refill_seconds = max(
+            full_refill_seconds(
+                settings.PHONE_CAPACITY, settings.PHONE_REFILL_PER_MINUTE
+            ),
+            full_refill_seconds(settings.IP_CAPACITY, settings.IP_REFILL_PER_MINUTE),
+        )
+        if math.isfinite(refill_seconds):
+            await self.backend.delete_idle(refill_seconds)
+
+    async def reset(self) -> None:
+        await self.backend.reset()
+
+
+def full_refill_seconds(capacity: float, refill_per_minute: float) -> float:
+    if refill_per_minute <= 0:
+        return math.inf
+    return capacity / refill_per_minute * 60
+
+
+def client_ip(request: Request) -> str | None:
+    """Address the request came from.
+
+    Behind the reverse proxy uvicorn has already replaced the peer with the
+    X-Forwarded-For client, but only for peers in FORWARDED_ALLOW_IPS, so a
+    client connecting directly cannot pick its own rate limit bucket.
+    """
+    return request.client.host if request.client else None
+
+
+login_rate_limiter = LoginRateLimiter(
+    create_backend(config.login_rate_limit.BACKEND)
+)
@@ -0,0 +1,81 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
+
+from pydantic import BaseModel
+
+from config import config
+from database import database
+from queries.reference_cache import NOTIFY_REFERENCE_CHANGE
+from services.cache import TTLCache
+from services.etag import make_etag
+from services.notification_events import notification_broker
+
+
+REFERENCE_DATA_CHANNEL = "reference_data"
+FOREMEN = "foremen"
+TECHNICIANS = "technicians"
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    body: bytes
+    etag: str
+
+
+class ReferenceDataCache:
+    """Read-through cache of serialised reference lists.
+
+    Entries are dropped by the write functions through invalidate(), which
+    also notifies every other worker over LISTEN/NOTIFY. The TTL only bounds
+    staleness if such a notification is lost.
+
+    Every invalidation bumps the generation of its list. A load that was
+    running meanwhile may have read the rows before the write committed, so
+    its body is returned to its caller but not cached.
+    """
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self.entries: TTLCache[str, CachedBody] = TTLCache(ttl_seconds)
+        self.locks: dict[str, asyncio.Lock] = {}
+        self.generations: dict[str, int] = {}
+
+    async def get(
+        self, name: str, load: Callable[[], Awaitable[Sequence[BaseModel]]]
+    ) -> CachedBody:
+        cached = self.entries.get(name)
+        if cached is not None:
+            return cached
+        # Concurrent misses wait for one load instead of each querying.
+        async with self.locks.setdefault(name, asyncio.Lock()):
+            cached = self.entries.get(name)
+            if cached is not None:
+                return cached
+            generation = self.generations.setdefault(name, 0)
+            items = await load()
+            body = b"[%s]" % b",".join(
+                item.model_dump_json().encode() for item in items
+            )
+            cached = CachedBody(body=body, etag=make_etag(name, body))
+            if self.generations[name] == generation:
+                self.entries.set(name, cached)
+            return cached
+
+    async def invalidate(self, name: str) -> None:
+        self.forget(name)
+        # Delivered on commit when called inside a transaction; this worker
+        # receives it too and forgets any load that ran before the commit.
+        await database.execute(NOTIFY_REFERENCE_CHANGE, REFERENCE_DATA_CHANNEL, name)
+
+    def forget(self, name: str) -> None:
+        self.generations[name] = self.generations.get(name, 0) + 1
+        self.entries.delete(name)
+
+    def clear(self) -> None:
+        for name in self.generations:
+            self.generations[name] += 1
+        self.entries.clear()
+
+
+reference_cache = ReferenceDataCache(config.cache.REFERENCE_DATA_TTL_SECONDS)
+notification_broker.add_channel_handler(REFERENCE_DATA_CHANNEL, reference_cache.forget)
@@ -0,0 +1,59 @@
+from typing import Any
+
+
+CYRILLIC_UPPER = "АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯё"
+CYRILLIC_LOWER = "абвгдеежзийклмнопрстуфхцчшщъыьэюяе"
+
+# Mirrors normalize_search_term on the database side. The explicit Cyrillic
+# mapping keeps matching case-insensitive even when the cluster runs with the
+# C locale, where lower() only folds ASCII letters.
+CREATE_SEARCH_NORMALIZE_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION search_normalize(value TEXT)
+RETURNS TEXT
+LANGUAGE SQL
+IMMUTABLE
+PARALLEL SAFE
+AS $$
+    SELECT lower(translate(value, '{CYRILLIC_UPPER}', '{CYRILLIC_LOWER}'))
+$$;
+"""
+
+
+def normalize_search_term(value: str) -> str:
+    return value.strip().lower().replace("ё", "е")
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def contains_pattern(value: str) -> str:
+    return f"%{escape_like(normalize_search_term(value))}%"
+
+
+class QueryFilters:
+    """Collects WHERE predicates together with their positional parameters.
+
+    Conditions are written with ``{}`` in place of the parameter; it is
+    replaced with the next ``$n`` placeholder when the condition is added.
+    """
+
+    def __init__(self) -> None:
+        self.conditions: list[str] = []
+        self.params: list[Any] = []
+
+    def add(self, condition: str, *values: Any) -> None:
+        placeholders = []
+        for value in values:
+            self.params.append(value)
+            placeholders.append(f"${len(self.params)}")
+        self.conditions.append(condition.format(*placeholders))
+
+    def add_contains(self, column: str, value: str) -> None:
+        """Case-insensitive substring match served by a pg_trgm GIN index."""
+        self.add(f"search_normalize({column}) LIKE {{}}", contains_pattern(value))
+
+    def where(self) -> str:
+        if not self.conditions:
+            return ""
+        return "WHERE " + "\n      AND ".join(self.conditions)
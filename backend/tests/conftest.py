@@ -0,0 +1,120 @@
+import os
+from uuid import uuid4
+
+import asyncpg
+import pytest
+from asgi_lifespan import LifespanManager
+from httpx import ASGITransport, AsyncClient
+
+os.environ.setdefault("APP_CONFIG__POSTGRESQL__HOST", "localhost")
+os.environ.setdefault("APP_CONFIG__POSTGRESQL__PORT", "5432")
+os.environ.setdefault("APP_CONFIG__JWT__SECRET_KEY", "test-secret-with-at-least-32-bytes")
+
+from database import database
+from main import app
+from migrations import MIGRATIONS, apply_migrations
+from services.passwords import hash_password
+from services.rate_limit import login_rate_limiter
+from services.reference_cache import reference_cache
+
+
+@pytest.fixture
+async def client():
+    suffix = uuid4().hex[:8]
+    phone_digits = str(uuid4().int)[:7]
+    foreman_phone = f"+7900{phone_digits}"
+    technician_phone = f"+7910{phone_digits}"
+    password = "secret123"
+    seeded_ids: dict[str, int] = {}
+
+    try:
+        connection = await asyncpg.connect(database.url)
+        try:
+            await apply_migrations(connection, MIGRATIONS)
+        finally:
+            await connection.close()
+        async with LifespanManager(app):
+            await login_rate_limiter.reset()
+            async with database.pool.acquire() as connection:
+                foreman = await connection.fetchrow(
+                    """
+                    INSERT INTO foremen (full_name, gender, workshop, phone_number, password_hash)
+                    VALUES ($1, 'М', $2, $3, $4)
+                    RETURNING foreman_id;
+                    """,
+                    "Иванов Иван Иванович",
+                    f"Цех {suffix}",
+                    foreman_phone,
+                    hash_password(password),
+                )
+                technician = await connection.fetchrow(
+                    """
+                    INSERT INTO technicians (specialization, full_name, gender, phone_number, password_hash)
+                    VALUES ('Слесарь', $1, 'М', $2, $3)
+                    RETURNING technician_id;
+                    """,
+                    "Петров Петр Петрович",
+                    technician_phone,
+                    hash_password(password),
+                )
+                # Seeded directly, bypassing the write functions' invalidation.
+                reference_cache.clear()
+                seeded_ids["foreman_id"] = foreman["foreman_id"]
+                seeded_ids["technician_id"] = technician["technician_id"]
+
+            transport = ASGITransport(app=app)
+            async with AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as async_client:
+                async_client.test_data = {
+                    "foreman_phone": foreman_phone,
+                    "technician_phone": technician_phone,
+                    "password": password,
+                    **seeded_ids,
+                }
+                yield async_client
+            async with database.pool.acquire() as connection:
+                await connection.execute(
+                    "DELETE FROM notifications WHERE recipient_id = $1 OR recipient_id = $2;",
+                    seeded_ids["foreman_id"],
+                    seeded_ids["technician_id"],
+                )
+                await connection.execute(
+                    "DELETE FROM notifications_archive WHERE recipient_id = $1 OR recipient_id = $2;",
+                    seeded_ids["foreman_id"],
+                    seeded_ids["technician_id"],
+                )
+                await connection.execute(
+                    "DELETE FROM notification_counters WHERE recipient_id = $1 OR recipient_id = $2;",
+                    seeded_ids["foreman_id"],
+                    seeded_ids["technician_id"],
+                )
+                await connection.execute(
+                    """
+                    DELETE FROM refresh_tokens
+                    WHERE (user_role = 'foreman' AND user_id = $1)
+                       OR (user_role = 'technician' AND user_id = $2);
+                    """,
+                    seeded_ids["foreman_id"],
+                    seeded_ids["technician_id"],
+                )
+                await connection.execute(
+                    "DELETE FROM technician_tasks WHERE foreman_id = $1 OR technician_id = $2;",
+                    seeded_ids["foreman_id"],
+                    seeded_ids["technician_id"],
+                )
+                await connection.execute(
+                    "DELETE FROM technician_task_tombstones WHERE foreman_id = $1 OR technician_id = $2;",
+                    seeded_ids["foreman_id"],
+                    seeded_ids["technician_id"],
+                )
+                await connection.execute(
+                    "DELETE FROM technicians WHERE technician_id = $1;",
+                    seeded_ids["technician_id"],
+                )
+                await connection.execute(
+                    "DELETE FROM foremen WHERE foreman_id = $1;",
+                    seeded_ids["foreman_id"],
+                )
+    except OSError as exc:
+        pytest.skip(f"Postgres is not available for integration tests: {exc}")
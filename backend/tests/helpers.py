@@ -0,0 +1,32 @@
+from httpx import AsyncClient
+
+
+async def login(client: AsyncClient, role: str) -> dict:
+    phone_key = "foreman_phone" if role == "foreman" else "technician_phone"
+    response = await client.post(
+        "/auth/login",
+        json={
+            "role": role,
+            "phone_number": client.test_data[phone_key],
+            "password": client.test_data["password"],
+        },
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+async def create_task(client: AsyncClient, foreman_token: str) -> dict:
+    response = await client.post(
+        "/technician-tasks",
+        headers={"Authorization": f"Bearer {foreman_token}"},
+        json={
+            "start_time": "01.01.2026 10:00",
+            "end_time": "01.01.2026 11:00",
+            "foreman_id": client.test_data["foreman_id"],
+            "technician_id": client.test_data["technician_id"],
+            "task_description": "Проверить оборудование",
+            "important": False,
+        },
+    )
+    assert response.status_code == 200
+    return response.json()
@@ -1,144 +1,283 @@
-import os
-from uuid import uuid4
+import asyncio
+import json
+import threading
 
 import pytest
-from asgi_lifespan import LifespanManager
 from httpx import ASGITransport, AsyncClient
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 
-os.environ.setdefault("APP_CONFIG__POSTGRESQL__HOST", "localhost")
-os.environ.setdefault("APP_CONFIG__POSTGRESQL__PORT", "5432")
-os.environ.setdefault("APP_CONFIG__JWT__SECRET_KEY", "test-secret-with-at-least-32-bytes")
-
+from config import config
 from database import database
+from helpers import create_task, login
 from main import app
-from services.passwords import hash_password
+from queries import notifications as notification_queries
+from services import auth, notifications
+from services.notification_events import notification_broker
+from services.passwords import (
+    PasswordHasherPool,
+    get_dummy_password_hash,
+    password_hasher,
+)
+from services.rate_limit import PostgresTokenBuckets, login_rate_limiter
 
 
 pytestmark = pytest.mark.asyncio
 
 
-@pytest.fixture
-async def client():
-    suffix = uuid4().hex[:8]
-    phone_digits = str(uuid4().int)[:7]
-    foreman_phone = f"+7900{phone_digits}"
-    technician_phone = f"+7910{phone_digits}"
-    password = "secret123"
-    seeded_ids: dict[str, int] = {}
+async def test_login_foreman_success(client: AsyncClient):
+    token = await login(client, "foreman")
+    assert token["role"] == "foreman"
+    assert token["user_id"] == client.test_data["foreman_id"]
+    assert token["token_type"] == "bearer"
+
 
-    try:
-        async with LifespanManager(app):
-            async with database.pool.acquire() as connection:
-                foreman = await connection.fetchrow(
-                    """
-                    INSERT INTO foremen (full_name, gender, workshop, phone_number, password_hash)
-                    VALUES ($1, 'М', $2, $3, $4)
-                    RETURNING foreman_id;
-                    """,
-                    "Иванов Иван Иванович",
-                    f"Цех {suffix}",
-                    foreman_phone,
-                    hash_password(password),
-                )
-                technician = await connection.fetchrow(
-                    """
-                    INSERT INTO technicians (specialization, full_name, gender, phone_number, password_hash)
-                    VALUES ('Слесарь', $1, 'М', $2, $3)
-                    RETURNING technician_id;
-                    """,
-                    "Петров Петр Петрович",
-                    technician_phone,
-                    hash_password(password),
-                )
-                seeded_ids["foreman_id"] = foreman["foreman_id"]
-                seeded_ids["technician_id"] = technician["technician_id"]
-
-            transport = ASGITransport(app=app)
-            async with AsyncClient(
-                transport=transport, base_url="http://test"
-            ) as async_client:
-                async_client.test_data = {
-                    "foreman_phone": foreman_phone,
-                    "technician_phone": technician_phone,
-                    "password": password,
-                    **seeded_ids,
-                }
-                yield async_client
-            async with database.pool.acquire() as connection:
-                await connection.execute(
-                    "DELETE FROM notifications WHERE recipient_id = $1 OR recipient_id = $2;",
-                    seeded_ids["foreman_id"],
-                    seeded_ids["technician_id"],
-                )
-                await connection.execute(
-                    "DELETE FROM technician_tasks WHERE foreman_id = $1 OR technician_id = $2;",
-                    seeded_ids["foreman_id"],
-                    seeded_ids["technician_id"],
-                )
-                await connection.execute(
-                    "DELETE FROM technicians WHERE technician_id = $1;",
-                    seeded_ids["technician_id"],
-                )
-                await connection.execute(
-                    "DELETE FROM foremen WHERE foreman_id = $1;",
-                    seeded_ids["foreman_id"],
-                )
-    except OSError as exc:
-        pytest.skip(f"Postgres is not available for integration tests: {exc}")
-
-
-async def login(client: AsyncClient, role: str) -> dict:
-    phone_key = "foreman_phone" if role == "foreman" else "technician_phone"
+async def test_default_foreman_login_success(client: AsyncClient):
     response = await client.post(
         "/auth/login",
         json={
-            "role": role,
-            "phone_number": client.test_data[phone_key],
-            "password": client.test_data["password"],
+            "role": "foreman",
+            "phone_number": "89000000000",
+            "password": "user123",
         },
     )
+
     assert response.status_code == 200
-    return response.json()
+    token = response.json()
+    assert token["role"] == "foreman"
+    assert token["full_name"] == "Данюк Кирилл Константинович"
+
 
+async def test_login_hashes_off_the_event_loop(client: AsyncClient):
+    before = password_hasher.stats()
+    await login(client, "foreman")
+    after = password_hasher.stats()
 
-async def create_task(client: AsyncClient, foreman_token: str) -> dict:
+    assert after.completed == before.completed + 1
+    assert after.queued == 0
+    assert after.running == 0
+
+
+async def test_login_rejected_when_hasher_queue_is_full(
+    client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(password_hasher, "max_queue", 0)
     response = await client.post(
-        "/technician-tasks",
-        headers={"Authorization": f"Bearer {foreman_token}"},
+        "/auth/login",
         json={
-            "start_time": "01.01.2026 10:00",
-            "end_time": "01.01.2026 11:00",
-            "foreman_id": client.test_data["foreman_id"],
-            "technician_id": client.test_data["technician_id"],
-            "task_description": "Проверить оборудование",
-            "important": False,
+            "role": "foreman",
+            "phone_number": client.test_data["foreman_phone"],
+            "password": client.test_data["password"],
         },
     )
-    assert response.status_code == 200
-    return response.json()
 
+    assert response.status_code == 503
+    assert response.json()["error_code"] == "AUTH_SERVICE_BUSY"
 
-async def test_login_foreman_success(client: AsyncClient):
-    token = await login(client, "foreman")
-    assert token["role"] == "foreman"
-    assert token["user_id"] == client.test_data["foreman_id"]
-    assert token["token_type"] == "bearer"
 
+async def test_cancelled_hasher_jobs_release_their_queue_slots():
+    pool = PasswordHasherPool(workers=1, max_queue=2)
+    release = threading.Event()
+    try:
+        blocker = asyncio.create_task(pool.run(release.wait))
+        waiting = asyncio.create_task(pool.run(release.wait))
+        while pool.stats().running == 0:
+            await asyncio.sleep(0.01)
+        assert pool.stats().queued == 1
 
-async def test_default_foreman_login_success(client: AsyncClient):
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert pool.stats().queued == 0
+
+        release.set()
+        assert await blocker is True
+        assert await pool.run(release.wait) is True
+        stats = pool.stats()
+        assert (stats.queued, stats.running, stats.completed) == (0, 0, 2)
+    finally:
+        release.set()
+        pool.executor.shutdown()
+
+
+async def test_login_unknown_phone_costs_one_verification(client: AsyncClient):
+    # The dummy hash is computed on first use, then reused.
+    await get_dummy_password_hash()
+    before = password_hasher.stats()
     response = await client.post(
         "/auth/login",
         json={
             "role": "foreman",
-            "phone_number": "89000000000",
-            "password": "user123",
+            "phone_number": "+70000000000",
+            "password": client.test_data["password"],
         },
     )
 
-    assert response.status_code == 200
-    token = response.json()
-    assert token["role"] == "foreman"
-    assert token["full_name"] == "Данюк Кирилл Константинович"
+    assert response.status_code == 401
+    assert password_hasher.stats().completed == before.completed + 1
+
+
+async def test_login_is_rate_limited_per_phone(client: AsyncClient):
+    payload = {
+        "role": "foreman",
+        "phone_number": client.test_data["foreman_phone"],
+        "password": "wrong-password",
+    }
+    statuses = [
+        (await client.post("/auth/login", json=payload)).status_code
+        for _ in range(6)
+    ]
+
+    assert statuses == [401] * 5 + [429]
+    response = await client.post("/auth/login", json=payload)
+    assert response.json()["error_code"] == "TOO_MANY_LOGIN_ATTEMPTS"
+
+
+async def test_login_ip_limit_ignores_client_supplied_headers(
+    client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(config.login_rate_limit, "IP_CAPACITY", 2)
+    monkeypatch.setattr(config.login_rate_limit, "IP_REFILL_PER_MINUTE", 0)
+    statuses = [
+        (
+            await client.post(
+                "/auth/login",
+                headers={
+                    "X-Real-IP": f"203.0.113.{attempt}",
+                    "X-Forwarded-For": f"203.0.113.{attempt}",
+                },
+                json={
+                    "role": "foreman",
+                    "phone_number": f"+7000000000{attempt}",
+                    "password": "wrong-password",
+                },
+            )
+        ).status_code
+        for attempt in range(3)
+    ]
+
+    assert statuses == [401, 401, 429]
+
+
+async def test_login_ip_limit_uses_client_address_from_trusted_proxy(
+    client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(config.login_rate_limit, "IP_CAPACITY", 1)
+    monkeypatch.setattr(config.login_rate_limit, "IP_REFILL_PER_MINUTE", 0)
+    # What uvicorn puts in front of the app for a proxy in a container network.
+    transport = ASGITransport(
+        app=ProxyHeadersMiddleware(app, trusted_hosts="127.0.0.1,172.16.0.0/12"),
+        client=("172.18.0.5", 40000),
+    )
+
+    async def attempt(forwarded_for: str) -> int:
+        async with AsyncClient(transport=transport, base_url="http://test") as proxied:
+            response = await proxied.post(
+                "/auth/login",
+                headers={"X-Forwarded-For": forwarded_for},
+                json={
+                    "role": "foreman",
+                    "phone_number": client.test_data["foreman_phone"],
+                    "password": "wrong-password",
+                },
+            )
+        return response.status_code
+
+    assert await attempt("203.0.113.1") == 401
+    assert await attempt("203.0.113.2") == 401
+    assert await attempt("203.0.113.1") == 429
+
+
+async def test_postgres_token_buckets_are_shared(client: AsyncClient):
+    buckets = PostgresTokenBuckets()
+    await buckets.reset()
+
+    assert [await buckets.take("ip:test", 2, 0) for _ in range(3)] == [
+        True,
+        True,
+        False,
+    ]
+    assert await buckets.take("ip:other", 2, 0)
+    await buckets.reset()
+
+
+async def test_refilled_postgres_buckets_are_deleted(
+    client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+):
+    buckets = PostgresTokenBuckets()
+    await buckets.reset()
+    monkeypatch.setattr(login_rate_limiter, "backend", buckets)
+    await buckets.take("ip:idle", 2, 1)
+    await buckets.take("ip:recent", 2, 1)
+    async with database.pool.acquire() as connection:
+        await connection.execute(
+            """
+            UPDATE login_rate_limits
+            SET updated_at = updated_at - INTERVAL '1 day'
+            WHERE bucket_key = 'ip:idle';
+            """
+        )
+
+    await login_rate_limiter.delete_refilled_buckets()
+
+    async with database.pool.acquire() as connection:
+        keys = await connection.fetchval(
+            "SELECT array_agg(bucket_key) FROM login_rate_limits;"
+        )
+    assert keys == ["ip:recent"]
+    await buckets.reset()
+
+
+async def test_refresh_token_rotation_detects_reuse(client: AsyncClient):
+    token = await login(client, "foreman")
+
+    refreshed = await client.post(
+        "/auth/refresh", json={"refresh_token": token["refresh_token"]}
+    )
+    assert refreshed.status_code == 200
+    rotated = refreshed.json()
+    assert rotated["user_id"] == client.test_data["foreman_id"]
+    assert rotated["refresh_token"] != token["refresh_token"]
+
+    me = await client.get(
+        "/auth/me", headers={"Authorization": f"Bearer {rotated['access_token']}"}
+    )
+    assert me.status_code == 200
+
+    reused = await client.post(
+        "/auth/refresh", json={"refresh_token": token["refresh_token"]}
+    )
+    assert reused.status_code == 401
+    assert reused.json()["error_code"] == "INVALID_REFRESH_TOKEN"
+
+    # Reuse revoked the whole family, including the newest token.
+    response = await client.post(
+        "/auth/refresh", json={"refresh_token": rotated["refresh_token"]}
+    )
+    assert response.status_code == 401
+
+
+async def test_logout_revokes_refresh_token(client: AsyncClient):
+    token = await login(client, "technician")
+
+    response = await client.post(
+        "/auth/logout", json={"refresh_token": token["refresh_token"]}
+    )
+    assert response.status_code == 204
+
+    response = await client.post(
+        "/auth/refresh", json={"refresh_token": token["refresh_token"]}
+    )
+    assert response.status_code == 401
+
+
+async def test_verified_access_tokens_are_cached(client: AsyncClient):
+    token = await login(client, "foreman")
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+
+    await client.get("/auth/me", headers=headers)
+    cached = auth.verified_tokens.get(token["access_token"])
+    assert cached is not None
+    assert cached.user_id == client.test_data["foreman_id"]
 
 
 async def test_login_technician_success(client: AsyncClient):
@@ -209,3 +348,249 @@ async def test_technician_changes_own_task_status_and_foreman_gets_notification(
     assert response.json()[0]["message"] == (
         f"Статус задачи №{task['task_id']} изменён на 'В процессе'"
     )
+
+
+async def test_notifications_cursor_pagination(client: AsyncClient):
+    foreman = await login(client, "foreman")
+    technician = await login(client, "technician")
+    tasks = [await create_task(client, foreman["access_token"]) for _ in range(3)]
+    headers = {"Authorization": f"Bearer {technician['access_token']}"}
+
+    first = await client.get("/notifications", headers=headers, params={"limit": 2})
+    assert first.status_code == 200
+    first_page = first.json()
+    assert first_page["total_count"] == 3
+    assert [item["task_id"] for item in first_page["items"]] == [
+        tasks[2]["task_id"],
+        tasks[1]["task_id"],
+    ]
+
+    second = await client.get(
+        "/notifications",
+        headers=headers,
+        params={"limit": 2, "cursor": first_page["next_cursor"]},
+    )
+    assert second.status_code == 200
+    second_page = second.json()
+    assert [item["task_id"] for item in second_page["items"]] == [
+        tasks[0]["task_id"]
+    ]
+    assert second_page["next_cursor"] is None
+
+
+async def test_retention_archives_old_read_notifications(client: AsyncClient):
+    technician_id = client.test_data["technician_id"]
+    async with database.pool.acquire() as connection:
+        old_read = await connection.fetchval(
+            """
+            INSERT INTO notifications (recipient_role, recipient_id, message, is_read, created_at)
+            VALUES ('technician', $1, 'old', TRUE, NOW() - INTERVAL '400 days')
+            RETURNING notification_id;
+            """,
+            technician_id,
+        )
+        old_unread = await connection.fetchval(
+            """
+            INSERT INTO notifications (recipient_role, recipient_id, message, is_read, created_at)
+            VALUES ('technician', $1, 'old', FALSE, NOW() - INTERVAL '400 days')
+            RETURNING notification_id;
+            """,
+            technician_id,
+        )
+
+    assert await notifications.run_notification_retention() >= 1
+
+    async with database.pool.acquire() as connection:
+        live_ids = await connection.fetch(
+            """
+            SELECT notification_id
+            FROM notifications
+            WHERE recipient_role = 'technician' AND recipient_id = $1;
+            """,
+            technician_id,
+        )
+        archived = await connection.fetchval(
+            "SELECT COUNT(*) FROM notifications_archive WHERE notification_id = $1;",
+            old_read,
+        )
+    assert [row["notification_id"] for row in live_ids] == [old_unread]
+    assert archived == 1
+
+
+async def test_created_notification_is_pushed_to_subscribers(client: AsyncClient):
+    foreman = await login(client, "foreman")
+    technician_id = client.test_data["technician_id"]
+
+    with notification_broker.subscribe("technician", technician_id) as queue:
+        task = await create_task(client, foreman["access_token"])
+        payload = await asyncio.wait_for(queue.get(), timeout=5)
+
+    event = json.loads(payload)
+    assert event["recipient_id"] == technician_id
+    assert event["task_id"] == task["task_id"]
+
+
+async def test_notification_stream_requires_token(client: AsyncClient):
+    response = await client.get("/notifications/stream")
+    assert response.status_code == 401
+
+
+async def test_unread_count_follows_create_and_read(client: AsyncClient):
+    foreman = await login(client, "foreman")
+    technician = await login(client, "technician")
+    headers = {"Authorization": f"Bearer {technician['access_token']}"}
+    await create_task(client, foreman["access_token"])
+    await create_task(client, foreman["access_token"])
+
+    response = await client.get("/notifications/unread-count", headers=headers)
+    assert response.json() == {"unread_count": 2}
+
+    inbox = await client.get("/notifications", headers=headers)
+    notification_id = inbox.json()[0]["notification_id"]
+    await client.post(f"/notifications/{notification_id}/read", headers=headers)
+
+    response = await client.get("/notifications/unread-count", headers=headers)
+    assert response.json() == {"unread_count": 1}
+
+
+async def test_reconciliation_repairs_counter_drift(client: AsyncClient):
+    foreman = await login(client, "foreman")
+    technician_id = client.test_data["technician_id"]
+    await create_task(client, foreman["access_token"])
+    async with database.pool.acquire() as connection:
+        await connection.execute(
+            """
+            UPDATE notification_counters
+            SET unread_count = 42
+            WHERE recipient_role = 'technician' AND recipient_id = $1;
+            """,
+            technician_id,
+        )
+
+    assert await notifications.reconcile_unread_counters() >= 1
+    assert await notifications.get_unread_count("technician", technician_id) == 1
+
+
+async def test_reconciliation_runs_in_one_worker_at_a_time(client: AsyncClient):
+    foreman = await login(client, "foreman")
+    technician_id = client.test_data["technician_id"]
+    await create_task(client, foreman["access_token"])
+    async with database.pool.acquire() as connection:
+        await connection.execute(
+            """
+            UPDATE notification_counters
+            SET unread_count = 42
+            WHERE recipient_role = 'technician' AND recipient_id = $1;
+            """,
+            technician_id,
+        )
+        # Another worker holding the lock makes this one skip the run.
+        await connection.execute(
+            "SELECT pg_advisory_lock($1);", notification_queries.RECONCILE_LOCK_KEY
+        )
+        try:
+            assert await notifications.reconcile_unread_counters() == 0
+        finally:
+            await connection.execute(
+                "SELECT pg_advisory_unlock($1);",
+                notification_queries.RECONCILE_LOCK_KEY,
+            )
+
+    assert await notifications.reconcile_unread_counters() == 1
+    assert await notifications.get_unread_count("technician", technician_id) == 1
+
+
+async def test_mark_notifications_read_in_bulk(client: AsyncClient):
+    foreman = await login(client, "foreman")
+    technician = await login(client, "technician")
+    headers = {"Authorization": f"Bearer {technician['access_token']}"}
+    for _ in range(3):
+        await create_task(client, foreman["access_token"])
+    inbox = (await client.get("/notifications", headers=headers)).json()
+
+    response = await client.post(
+        "/notifications/read",
+        headers=headers,
+        json={"notification_ids": [inbox[0]["notification_id"]]},
+    )
+    assert response.status_code == 200
+    assert response.json() == {"updated_count": 1, "unread_count": 2}
+
+    response = await client.post(
+        "/notifications/read",
+        headers=headers,
+        json={"up_to_id": inbox[0]["notification_id"]},
+    )
+    assert response.status_code == 200
+    assert response.json() == {"updated_count": 2, "unread_count": 0}
+
+
+async def test_notifications_support_conditional_get(client: AsyncClient):
+    foreman = await login(client, "foreman")
+    technician = await login(client, "technician")
+    headers = {"Authorization": f"Bearer {technician['access_token']}"}
+    await create_task(client, foreman["access_token"])
+
+    first = await client.get("/notifications", headers=headers)
+    etag = first.headers["etag"]
+    response = await client.get(
+        "/notifications", headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+    response = await client.post(
+        "/notifications/read",
+        headers=headers,
+        json={"notification_ids": [first.json()[0]["notification_id"]]},
+    )
+    assert response.status_code == 200
+    response = await client.get(
+        "/notifications", headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.json()[0]["is_read"] is True
+
+
+async def test_mark_notifications_read_up_to_timestamp(client: AsyncClient):
+    foreman = await login(client, "foreman")
+    technician = await login(client, "technician")
+    headers = {"Authorization": f"Bearer {technician['access_token']}"}
+    for _ in range(2):
+        await create_task(client, foreman["access_token"])
+    oldest = (await client.get("/notifications", headers=headers)).json()[-1]
+
+    response = await client.post(
+        "/notifications/read",
+        headers=headers,
+        json={"up_to": oldest["created_at"] + "Z"},
+    )
+    assert response.status_code == 400
+    assert response.json()["error_code"] == "INVALID_NOTIFICATION_SELECTION"
+
+    response = await client.post(
+        "/notifications/read",
+        headers=headers,
+        json={"up_to": oldest["created_at"]},
+    )
+    assert response.status_code == 200
+    assert response.json() == {"updated_count": 1, "unread_count": 1}
+
+
+async def test_mark_notifications_read_requires_one_selector(client: AsyncClient):
+    technician = await login(client, "technician")
+    response = await client.post(
+        "/notifications/read",
+        headers={"Authorization": f"Bearer {technician['access_token']}"},
+        json={"notification_ids": [1], "up_to_id": 1},
+    )
+    assert response.status_code == 400
+    assert response.json()["error_code"] == "INVALID_NOTIFICATION_SELECTION"
+
+    for selection in ({"notification_ids": [2**31]}, {"up_to_id": 2**63}):
+        response = await client.post(
+            "/notifications/read",
+            headers={"Authorization": f"Bearer {technician['access_token']}"},
+            json=selection,
+        )
+        assert response.status_code == 400
+        assert response.json()["error_code"] == "INVALID_NOTIFICATION_SELECTION"
@@ -0,0 +1,41 @@
+import pytest
+from httpx import AsyncClient
+
+from benchmarks import (
+    SCENARIOS,
+    BenchmarkUsers,
+    build_report,
+    compare_reports,
+    run_benchmark,
+)
+
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_every_scenario_runs_against_the_app(client: AsyncClient):
+    users = BenchmarkUsers(
+        foreman_id=client.test_data["foreman_id"],
+        technician_id=client.test_data["technician_id"],
+        foreman_phone=client.test_data["foreman_phone"],
+        technician_phone=client.test_data["technician_phone"],
+        password=client.test_data["password"],
+    )
+
+    results = await run_benchmark(
+        client, users, list(SCENARIOS), requests=2, concurrency=2
+    )
+
+    assert [result.name for result in results] == list(SCENARIOS)
+    for result in results:
+        assert result.requests == 2
+        assert result.errors == 0, result.name
+        assert 0 < result.latency_ms.p50 <= result.latency_ms.p99
+
+    report = build_report(results, "in-process", 2, 2, 0)
+    slower = build_report(results, "in-process", 2, 2, 0)
+    slower["scenarios"]["foreman_task_page"]["latency_ms"]["p95"] *= 2
+    _, regressions = compare_reports(report, report, threshold_percent=10)
+    assert regressions == []
+    _, regressions = compare_reports(report, slower, threshold_percent=10)
+    assert regressions == ["foreman_task_page"]
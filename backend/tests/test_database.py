@@ -0,0 +1,172 @@
+import logging
+
+import pytest
+from httpx import AsyncClient
+
+from config import config
+from database import database, pool_size_limits
+from helpers import login
+from migrations import (
+    MIGRATIONS,
+    Migration,
+    SchemaVersionError,
+    apply_migrations,
+    check_schema_version,
+    latest_version,
+)
+from queries import Statement, StatementCheckError, StatementRegistry, statements
+
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_nested_units_of_work_share_a_connection(client: AsyncClient):
+    async with database.transaction() as outer:
+        async with database.connection() as inner:
+            assert inner is outer
+        assert database.pool_metrics().acquired == 1
+
+
+async def test_pool_metrics_track_acquisitions(client: AsyncClient):
+    before = database.pool_metrics()
+    async with database.connection() as connection:
+        application_name = await connection.fetchval("SHOW application_name;")
+    after = database.pool_metrics()
+
+    assert application_name == "mechanical-backend"
+    assert after.acquisitions == before.acquisitions + 1
+    assert after.acquired == 0
+    assert after.waiters == 0
+    assert after.max_size == 10
+
+
+async def test_pool_budget_is_split_between_workers(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(config.startup, "MODE", "production")
+    monkeypatch.setattr(config.startup, "WORKERS", 4)
+    monkeypatch.setattr(config.postgresql, "MAX_CONNECTIONS_TOTAL", 24)
+
+    assert pool_size_limits() == (5, 5)
+
+    # The default budget keeps a 16-core host within max_connections=100.
+    monkeypatch.setattr(config.startup, "WORKERS", 16)
+    monkeypatch.setattr(config.postgresql, "MAX_CONNECTIONS_TOTAL", 80)
+    assert pool_size_limits() == (4, 4)
+
+    monkeypatch.setattr(config.startup, "WORKERS", 4)
+    monkeypatch.setattr(config.postgresql, "MAX_CONNECTIONS_TOTAL", None)
+    assert pool_size_limits() == (10, 10)
+
+
+async def test_schema_version_check_rejects_pending_migrations(client: AsyncClient):
+    async def upgrade(_connection) -> None:
+        pass
+
+    pending = Migration(latest_version(MIGRATIONS) + 1, "pending", upgrade)
+    async with database.connection() as connection:
+        assert await apply_migrations(connection, MIGRATIONS) == []
+        await check_schema_version(connection, MIGRATIONS)
+        with pytest.raises(SchemaVersionError):
+            await check_schema_version(connection, [*MIGRATIONS, pending])
+
+
+async def test_named_queries_report_timing_and_rows(client: AsyncClient):
+    observed = []
+    database.add_query_observer(lambda *args: observed.append(args))
+    try:
+        rows = await database.fetch(
+            Statement("test.series", "SELECT generate_series(1, 3);")
+        )
+        async with database.transaction():
+            status = await database.execute(
+                Statement(
+                    "test.update",
+                    "UPDATE foremen SET full_name = full_name WHERE FALSE;",
+                )
+            )
+    finally:
+        database.query_observers.pop()
+
+    assert len(rows) == 3
+    assert status == "UPDATE 0"
+    assert [(name, rows) for name, _, rows in observed] == [
+        ("test.series", 3),
+        ("test.update", 0),
+    ]
+    assert all(seconds > 0 for _, seconds, _ in observed)
+
+    await login(client, "foreman")
+    metrics = (await client.get("/metrics")).text
+    assert 'db_query_duration_seconds_count{query="auth.foreman_by_phone"}' in metrics
+    assert 'db_query_rows_total{query="auth.foreman_by_phone"}' in metrics
+
+
+async def test_slow_queries_are_logged_with_plan(
+    client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+):
+    monkeypatch.setattr(config.postgresql, "SLOW_QUERY_THRESHOLD_MS", 0)
+    monkeypatch.setattr(config.postgresql, "SLOW_QUERY_EXPLAIN", True)
+
+    with caplog.at_level(logging.WARNING, logger="database"):
+        async with database.transaction():
+            value = await database.fetchval(
+                Statement("test.secret", "SELECT length($1::TEXT);"), "hunter2"
+            )
+            # The EXPLAIN ran in a savepoint and left the transaction usable.
+            assert await database.fetchval(Statement("test.after", "SELECT 1;")) == 1
+
+    assert value == 7
+    [record] = [r for r in caplog.records if "test.secret" in r.getMessage()]
+    message = record.getMessage()
+    assert "SELECT length($1::TEXT);" in message
+    assert "params=['str[7]']" in message
+    assert "hunter2" not in message
+    assert "Result" in message
+
+
+async def test_registered_statements_are_prepared_on_pool_connections(
+    client: AsyncClient,
+):
+    async with database.connection() as connection:
+        prepared = {
+            record["statement"]
+            for record in await connection.fetch(
+                "SELECT statement FROM pg_prepared_statements;"
+            )
+        }
+        # Preparing must not leave idle connections inside a transaction,
+        # where they would hold locks on the parsed tables.
+        open_transactions = await connection.fetchval(
+            """
+            SELECT COUNT(*)
+            FROM pg_stat_activity
+            WHERE application_name = $1
+              AND pid <> pg_backend_pid()
+              AND xact_start IS NOT NULL;
+            """,
+            config.postgresql.APPLICATION_NAME,
+        )
+
+    assert len(statements) > 0
+    assert {statement.sql for statement in statements} <= prepared
+    assert open_transactions == 0
+
+
+async def test_statement_check_names_statements_that_do_not_parse(
+    client: AsyncClient,
+):
+    registry = StatementRegistry()
+    registry.add("test.valid", "SELECT foreman_id FROM foremen WHERE foreman_id = $1;")
+    registry.add("test.renamed_column", "SELECT foreman_name FROM foremen;")
+    with pytest.raises(ValueError):
+        registry.add("test.valid", "SELECT 1;")
+
+    async with database.connection() as connection:
+        with pytest.raises(StatementCheckError) as error:
+            await registry.check(connection)
+
+    message = str(error.value)
+    assert "test.renamed_column" in message
+    assert "foreman_name" in message
+    assert "test.valid" not in message
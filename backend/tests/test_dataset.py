@@ -0,0 +1,73 @@
+import pytest
+from httpx import AsyncClient
+
+from database import database
+from dataset import DatasetGenerator, DatasetSpec, load_dataset
+from models.technician_tasks import TASK_STATUSES
+from services.phone import is_valid_phone_number
+
+
+SPEC = DatasetSpec(foremen=4, technicians=10, tasks=300, workshops=2, batch_size=120)
+
+
+def generate(spec: DatasetSpec) -> tuple[list, list, list]:
+    generator = DatasetGenerator(spec)
+    foremen = generator.foremen(1, "hash")
+    technicians = generator.technicians(1, "hash")
+    tasks, notifications = [], []
+    for task_batch, notification_batch in generator.task_batches(1):
+        tasks += task_batch
+        notifications += notification_batch
+    return foremen + technicians, tasks, notifications
+
+
+def test_generator_is_deterministic_and_valid():
+    users, tasks, notifications = generate(SPEC)
+
+    assert generate(SPEC) == (users, tasks, notifications)
+    assert generate(DatasetSpec(**{**SPEC.__dict__, "seed": 2}))[1] != tasks
+    assert all(is_valid_phone_number(user[-2]) for user in users)
+    assert len(tasks) == SPEC.tasks
+    for _, start_time, end_time, _, _, _, _, status, _ in tasks:
+        assert status in TASK_STATUSES
+        assert start_time < end_time
+    assert {notification[2] for notification in notifications} == {
+        task[0] for task in tasks
+    }
+
+
+def test_spec_rejects_workshops_without_staff():
+    with pytest.raises(ValueError):
+        DatasetSpec(foremen=1, technicians=10, workshops=2).validate()
+
+
+@pytest.mark.asyncio
+async def test_load_dataset_copies_rows(client: AsyncClient):
+    async with database.connection() as connection:
+        transaction = connection.transaction()
+        await transaction.start()
+        try:
+            stats = await load_dataset(SPEC)
+            counts = await connection.fetchrow(
+                """
+                SELECT
+                    (SELECT COUNT(*) FROM technician_tasks t
+                     JOIN technicians USING (technician_id)
+                     WHERE phone_number LIKE '+797%') AS tasks,
+                    (SELECT COALESCE(SUM(unread_count), 0) FROM notification_counters c
+                     JOIN technicians t ON t.technician_id = c.recipient_id
+                     WHERE c.recipient_role = 'technician'
+                       AND t.phone_number LIKE '+797%') AS unread,
+                    (SELECT COUNT(*) FROM notifications n
+                     JOIN technicians t ON t.technician_id = n.recipient_id
+                     WHERE n.recipient_role = 'technician' AND NOT n.is_read
+                       AND t.phone_number LIKE '+797%') AS unread_rows;
+                """
+            )
+        finally:
+            await transaction.rollback()
+
+    assert stats.tasks == SPEC.tasks
+    assert stats.notifications >= SPEC.tasks
+    assert counts["tasks"] == SPEC.tasks
+    assert counts["unread"] == counts["unread_rows"]
@@ -0,0 +1,62 @@
+import pytest
+from httpx import AsyncClient
+
+from helpers import create_task, login
+from services.metrics import MetricsRegistry
+
+
+
+def sample_value(text: str, prefix: str) -> float:
+    [line] = [line for line in text.splitlines() if line.startswith(prefix + " ")]
+    return float(line.rsplit(" ", 1)[1])
+
+
+@pytest.mark.asyncio
+async def test_metrics_report_requests_by_route_template(client: AsyncClient):
+    foreman = await login(client, "foreman")
+    task = await create_task(client, foreman["access_token"])
+    headers = {"Authorization": f"Bearer {foreman['access_token']}"}
+    before = (await client.get("/metrics")).text
+
+    await client.get(f"/technician-tasks/{task['task_id']}", headers=headers)
+    await client.get(f"/technician-tasks/{task['task_id']}", headers=headers)
+    await client.get("/no-such-page")
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    labels = 'method="GET",route="/technician-tasks/{task_id}",status="200"'
+    counter = f"http_requests_total{{{labels}}}"
+    previous = sample_value(before, counter) if counter in before else 0
+    assert sample_value(text, counter) == previous + 2
+    assert sample_value(text, f"http_request_duration_seconds_count{{{labels}}}") >= 2
+    assert (
+        sample_value(
+            text,
+            f'http_request_duration_seconds_bucket{{{labels[:-1]}",le="+Inf"}}',
+        )
+        >= 2
+    )
+    assert 'route="unmatched",status="404"' in text
+    assert str(task["task_id"]) not in text
+    # The scrape itself is still in flight while it renders.
+    assert (
+        sample_value(text, 'http_requests_in_flight{method="GET",route="/metrics"}')
+        == 1
+    )
+    assert sample_value(text, 'db_pool_size_limit{bound="max"}') >= 1
+    assert "# TYPE password_hasher_completed_total counter" in text
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency.", ("route",), (0.1, 1))
+    for value in (0.05, 0.1, 0.5, 5):
+        histogram.observe(('/a"b',), value)
+
+    text = registry.render()
+    assert 'latency_seconds_bucket{route="/a\\"b",le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{route="/a\\"b",le="1"} 3' in text
+    assert 'latency_seconds_bucket{route="/a\\"b",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{route="/a\\"b"} 4' in text
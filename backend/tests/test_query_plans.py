@@ -0,0 +1,234 @@
+import asyncio
+import json
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import asynccontextmanager
+from hashlib import md5
+
+import asyncpg
+import pytest
+from httpx import AsyncClient
+
+from database import database
+from helpers import login
+from models import technician_tasks
+from schemas.pagination import PageParams
+from schemas.technician_task import TechnicianTaskFilter
+from services import notifications
+
+
+pytestmark = pytest.mark.asyncio
+
+# Scanning a table this small is cheaper than any index, so the planner is
+# right to do it; only larger relations must be reached through indexes.
+SEQ_SCAN_ALLOWED_ROWS = 2000
+
+SEED_QUERIES = [
+    """
+    INSERT INTO foremen (full_name, gender, workshop, phone_number)
+    SELECT 'Мастер ' || md5(i::TEXT), 'М', 'Цех ' || (i % 20), '+750' || lpad(i::TEXT, 8, '0')
+    FROM generate_series(1, 500) AS i;
+    """,
+    """
+    INSERT INTO technicians (specialization, full_name, gender, phone_number)
+    SELECT 'Слесарь', 'Техник ' || md5(i::TEXT), 'Ж', '+751' || lpad(i::TEXT, 8, '0')
+    FROM generate_series(1, 1000) AS i;
+    """,
+    """
+    INSERT INTO technician_tasks (
+        start_time, end_time, workshop, foreman_id, technician_id,
+        task_description, status, important
+    )
+    SELECT
+        TIMESTAMP '2026-01-01' + i * INTERVAL '10 minutes',
+        TIMESTAMP '2026-01-01' + i * INTERVAL '10 minutes' + INTERVAL '1 hour',
+        f.workshop,
+        f.foreman_id,
+        t.technician_id,
+        'Задача ' || i,
+        (ARRAY['Не выполнено', 'В процессе', 'Выполнено', 'Отменено'])[1 + i % 4],
+        i % 7 = 0
+    FROM generate_series(1, 30000) AS i
+    JOIN foremen f ON f.phone_number = '+750' || lpad((1 + i % 500)::TEXT, 8, '0')
+    JOIN technicians t ON t.phone_number = '+751' || lpad((1 + i % 1000)::TEXT, 8, '0');
+    """,
+    """
+    INSERT INTO notifications (recipient_role, recipient_id, task_id, message, is_read)
+    SELECT 'technician', technician_id, task_id, 'Новая задача', task_id % 2 = 0
+    FROM technician_tasks;
+    """,
+    "ANALYZE foremen, technicians, technician_tasks, notifications, notification_counters;",
+]
+
+
+def plan_nodes(plan: dict) -> Iterator[dict]:
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from plan_nodes(child)
+
+
+async def relation_rows(connection, relation: str) -> float:
+    return await connection.fetchval(
+        "SELECT reltuples FROM pg_class WHERE oid = $1::regclass;", relation
+    )
+
+
+async def assert_no_seq_scans(call: Callable[[], Awaitable[object]]) -> None:
+    """Runs call and EXPLAINs every SELECT it sent to the database."""
+    logged = []
+    async with database.connection() as connection:
+        connection.add_query_logger(logged.append)
+        try:
+            await call()
+            # Query loggers are invoked via call_soon.
+            await asyncio.sleep(0)
+        finally:
+            connection.remove_query_logger(logged.append)
+
+        selects = [
+            record
+            for record in logged
+            if record.query.lstrip().upper().startswith(("SELECT", "WITH"))
+        ]
+        assert selects
+        for record in selects:
+            plan = json.loads(
+                await connection.fetchval(
+                    f"EXPLAIN (FORMAT JSON) {record.query}", *record.args
+                )
+            )[0]["Plan"]
+            seq_scans = [
+                node["Relation Name"]
+                for node in plan_nodes(plan)
+                if node["Node Type"] == "Seq Scan"
+                and await relation_rows(connection, node["Relation Name"])
+                > SEQ_SCAN_ALLOWED_ROWS
+            ]
+            assert not seq_scans, f"Sequential scan on {seq_scans}:\n{record.query}"
+
+
+@asynccontextmanager
+async def seeded_database() -> AsyncIterator[asyncpg.Connection]:
+    """Fills the tables inside a transaction that is rolled back on exit.
+
+    The connection is the current one, so model functions and routes called
+    inside the block see the seeded rows.
+    """
+    async with database.connection() as connection:
+        transaction = connection.transaction()
+        await transaction.start()
+        try:
+            for query in SEED_QUERIES:
+                await connection.execute(query)
+            notifications.unread_counts.clear()
+            yield connection
+        finally:
+            await transaction.rollback()
+
+
+async def test_model_queries_use_indexes(client: AsyncClient):
+    async with seeded_database() as connection:
+        foreman_id, technician_id, task_id = await connection.fetchrow(
+            """
+            SELECT foreman_id, technician_id, task_id
+            FROM technician_tasks
+            ORDER BY task_id DESC
+            LIMIT 1;
+            """
+        )
+        await run_model_queries(foreman_id, technician_id, task_id)
+
+
+async def test_list_routes_use_indexes(client: AsyncClient):
+    """Everything a polled list route sends, ETag validator included."""
+    foreman = await login(client, "foreman")
+    technician = await login(client, "technician")
+    page = {"limit": 20, "include_total": "false"}
+    requests = [
+        (foreman, "/technician-tasks"),
+        (foreman, f"/technicians/{client.test_data['technician_id']}/tasks"),
+        (technician, "/notifications"),
+    ]
+    async with seeded_database():
+        for user, url in requests:
+            headers = {"Authorization": f"Bearer {user['access_token']}"}
+
+            async def call():
+                response = await client.get(url, headers=headers, params=page)
+                assert response.status_code == 200
+
+            await assert_no_seq_scans(call)
+
+
+async def run_model_queries(foreman_id: int, technician_id: int, task_id: int):
+    no_filter = TechnicianTaskFilter(
+        date_start="",
+        date_end="",
+        workshop="",
+        foreman_name="",
+        technician_name="",
+        status="",
+    )
+    page = PageParams(limit=20, include_total=False)
+    counted_page = PageParams(limit=20)
+    first_page = await technician_tasks.get_technician_tasks_page(no_filter, page)
+
+    calls = [
+        lambda: technician_tasks.get_technician_task_by_id(task_id),
+        lambda: technician_tasks.get_technician_tasks_page(no_filter, page),
+        lambda: technician_tasks.get_technician_tasks_page(
+            no_filter,
+            PageParams(cursor=first_page.next_cursor, limit=20, include_total=False),
+        ),
+        lambda: technician_tasks.get_technician_tasks_page(
+            no_filter.model_copy(update={"status": "Выполнено"}), page
+        ),
+        lambda: technician_tasks.get_technician_tasks_page(
+            no_filter.model_copy(
+                update={
+                    "date_start": "01.02.2026 00:00",
+                    "date_end": "02.02.2026 00:00",
+                }
+            ),
+            counted_page,
+        ),
+        lambda: technician_tasks.get_technician_tasks_page(
+            no_filter.model_copy(update={"workshop": "Цех 7"}), page
+        ),
+        lambda: technician_tasks.get_technician_tasks_page(
+            no_filter.model_copy(update={"foreman_name": md5(b"42").hexdigest()[:12]}), counted_page
+        ),
+        lambda: technician_tasks.get_technician_tasks_page(
+            no_filter.model_copy(update={"technician_name": md5(b"42").hexdigest()[:12]}),
+            counted_page,
+        ),
+        lambda: technician_tasks.get_technician_tasks(no_filter, foreman_id),
+        lambda: technician_tasks.get_technician_tasks_page(
+            no_filter, counted_page, foreman_id
+        ),
+        lambda: technician_tasks.get_technician_tasks_by_technician_id(
+            technician_id
+        ),
+        lambda: technician_tasks.get_technician_tasks_by_technician_id(
+            technician_id, foreman_id
+        ),
+        lambda: technician_tasks.get_technician_tasks_page_by_technician_id(
+            technician_id, counted_page
+        ),
+        lambda: technician_tasks.get_technician_task_summary(foreman_id=foreman_id),
+        lambda: technician_tasks.get_technician_task_summary(
+            technician_id=technician_id
+        ),
+        lambda: technician_tasks.get_technician_task_summary(workshop="Цех 7"),
+        lambda: technician_tasks.get_technician_task_version(task_id),
+        lambda: technician_tasks.get_technician_tasks_version_by_technician_id(
+            technician_id, foreman_id
+        ),
+        lambda: notifications.get_notifications_version("technician", technician_id),
+        lambda: notifications.get_notifications("technician", technician_id),
+        lambda: notifications.get_notifications_page(
+            "technician", technician_id, counted_page
+        ),
+        lambda: notifications.get_unread_count("technician", technician_id),
+    ]
+    for call in calls:
+        await assert_no_seq_scans(call)
@@ -0,0 +1,108 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+
+from database import database
+from helpers import login
+from models import foremen
+from services.reference_cache import (
+    FOREMEN,
+    REFERENCE_DATA_CHANNEL,
+    reference_cache,
+)
+
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_reference_lists_revalidate_with_etag(client: AsyncClient):
+    foreman = await login(client, "foreman")
+    headers = {"Authorization": f"Bearer {foreman['access_token']}"}
+
+    first = await client.get("/foremen", headers=headers)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert client.test_data["foreman_id"] in [
+        item["foreman_id"] for item in first.json()
+    ]
+
+    cached = await client.get("/foremen", headers={**headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+
+async def test_reference_cache_is_invalidated_by_writes(client: AsyncClient):
+    foreman = await login(client, "foreman")
+    headers = {"Authorization": f"Bearer {foreman['access_token']}"}
+    before = await client.get("/technicians", headers=headers)
+
+    response = await client.post(
+        "/technicians",
+        headers=headers,
+        json={
+            "specialization": "Электрик",
+            "full_name": "Сидоров Сидор Сидорович",
+            "gender": "М",
+            "phone_number": f"+7920{str(uuid4().int)[:7]}",
+            "password": "secret123",
+        },
+    )
+    assert response.status_code == 200
+    technician_id = response.json()["technician_id"]
+
+    try:
+        after = await client.get(
+            "/technicians",
+            headers={**headers, "If-None-Match": before.headers["etag"]},
+        )
+        assert after.status_code == 200
+        assert after.headers["etag"] != before.headers["etag"]
+        assert technician_id in [item["technician_id"] for item in after.json()]
+    finally:
+        async with database.connection() as connection:
+            await connection.execute(
+                "DELETE FROM technicians WHERE technician_id = $1;", technician_id
+            )
+
+
+async def test_reference_cache_follows_other_workers(client: AsyncClient):
+    foreman = await login(client, "foreman")
+    headers = {"Authorization": f"Bearer {foreman['access_token']}"}
+    await client.get("/foremen", headers=headers)
+    assert reference_cache.entries.get(FOREMEN) is not None
+
+    # Another worker's invalidation arrives over LISTEN/NOTIFY.
+    async with database.connection() as connection:
+        await connection.execute(
+            "SELECT pg_notify($1, $2);", REFERENCE_DATA_CHANNEL, FOREMEN
+        )
+    for _ in range(50):
+        if reference_cache.entries.get(FOREMEN) is None:
+            break
+        await asyncio.sleep(0.02)
+    assert reference_cache.entries.get(FOREMEN) is None
+
+
+async def test_reference_load_overtaken_by_invalidation_is_not_cached(
+    client: AsyncClient,
+):
+    loading = asyncio.Event()
+    release = asyncio.Event()
+
+    async def load():
+        # Rows read before the concurrent write commits.
+        items = await foremen.get_foremen()
+        loading.set()
+        await release.wait()
+        return items
+
+    pending = asyncio.create_task(reference_cache.get(FOREMEN, load))
+    await loading.wait()
+    # The write's NOTIFY arrives while the load is still running.
+    reference_cache.forget(FOREMEN)
+    release.set()
+
+    assert (await pending).body.startswith(b"[")
+    assert reference_cache.entries.get(FOREMEN) is None
@@ -0,0 +1,356 @@
+import pytest
+from httpx import AsyncClient
+
+from database import database
+from helpers import create_task, login
+from models import technician_tasks
+from services.pagination import encode_cursor
+
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_task_times_keep_api_format(client: AsyncClient):
+    foreman = await login(client, "foreman")
+    task = await create_task(client, foreman["access_token"])
+
+    assert task["start_time"] == "01.01.2026 10:00"
+    assert task["end_time"] == "01.01.2026 11:00"
+
+    response = await client.get(
+        f"/technician-tasks/{task['task_id']}",
+        headers={"Authorization": f"Bearer {foreman['access_token']}"},
+    )
+    assert response.status_code == 200
+    assert response.json()["start_time"] == "01.01.2026 10:00"
+
+
+async def test_task_list_filters_by_date_window(client: AsyncClient):
+    foreman = await login(client, "foreman")
+    task = await create_task(client, foreman["access_token"])
+    headers = {"Authorization": f"Bearer {foreman['access_token']}"}
+
+    response = await client.get(
+        "/technician-tasks",
+        headers=headers,
+        params={
+            "date_start": "01.01.2026 09:00",
+            "date_end": "01.01.2026 10:30",
+        },
+    )
+    assert response.status_code == 200
+    assert task["task_id"] in [item["task_id"] for item in response.json()]
+
+    response = await client.get(
+        "/technician-tasks",
+        headers=headers,
+        params={"date_start": "02.01.2026 00:00"},
+    )
+    assert response.status_code == 200
+    assert task["task_id"] not in [item["task_id"] for item in response.json()]
+
+
+async def test_task_list_rejects_malformed_date_filter(client: AsyncClient):
+    foreman = await login(client, "foreman")
+    response = await client.get(
+        "/technician-tasks",
+        headers={"Authorization": f"Bearer {foreman['access_token']}"},
+        params={"date_start": "2026-01-01"},
+    )
+    assert response.status_code == 400
+    assert response.json()["error_code"] == "INVALID_FILTER_PARAMS"
+
+
+async def test_task_list_search_is_case_insensitive_and_folds_yo(
+    client: AsyncClient,
+):
+    foreman = await login(client, "foreman")
+    task = await create_task(client, foreman["access_token"])
+    headers = {"Authorization": f"Bearer {foreman['access_token']}"}
+
+    response = await client.get(
+        "/technician-tasks",
+        headers=headers,
+        params={
+            "workshop": task["workshop"].upper(),
+            "technician_name": "пётр",
+            "foreman_name": "ИВАНОВ",
+            "status": "Не выполнено",
+        },
+    )
+    assert response.status_code == 200
+    assert [item["task_id"] for item in response.json()] == [task["task_id"]]
+
+
+async def test_task_list_search_treats_wildcards_literally(client: AsyncClient):
+    foreman = await login(client, "foreman")
+    task = await create_task(client, foreman["access_token"])
+
+    response = await client.get(
+        "/technician-tasks",
+        headers={"Authorization": f"Bearer {foreman['access_token']}"},
+        params={"workshop": task["workshop"] + "%"},
+    )
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+async def test_technician_tasks_keyset_pagination(client: AsyncClient):
+    foreman = await login(client, "foreman")
+    created = [await create_task(client, foreman["access_token"]) for _ in range(3)]
+    headers = {"Authorization": f"Bearer {foreman['access_token']}"}
+    url = f"/technicians/{client.test_data['technician_id']}/tasks"
+
+    first = await client.get(url, headers=headers, params={"limit": 2})
+    assert first.status_code == 200
+    first_page = first.json()
+    assert first_page["total_count"] == 3
+    assert [item["task_id"] for item in first_page["items"]] == [
+        created[2]["task_id"],
+        created[1]["task_id"],
+    ]
+
+    second = await client.get(
+        url,
+        headers=headers,
+        params={
+            "limit": 2,
+            "cursor": first_page["next_cursor"],
+            "include_total": False,
+        },
+    )
+    assert second.status_code == 200
+    second_page = second.json()
+    assert [item["task_id"] for item in second_page["items"]] == [
+        created[0]["task_id"]
+    ]
+    assert second_page["next_cursor"] is None
+    assert second_page["total_count"] is None
+
+
+async def test_task_list_rejects_invalid_cursor(client: AsyncClient):
+    foreman = await login(client, "foreman")
+    response = await client.get(
+        "/technician-tasks",
+        headers={"Authorization": f"Bearer {foreman['access_token']}"},
+        params={"cursor": "not-a-cursor", "limit": 10},
+    )
+    assert response.status_code == 400
+    assert response.json()["error_code"] == "INVALID_PAGINATION_PARAMS"
+
+
+async def test_bulk_create_reports_invalid_items(client: AsyncClient):
+    foreman = await login(client, "foreman")
+    technician = await login(client, "technician")
+    task = {
+        "start_time": "01.01.2026 10:00",
+        "end_time": "01.01.2026 11:00",
+        "foreman_id": client.test_data["foreman_id"],
+        "technician_id": client.test_data["technician_id"],
+        "task_description": "Проверить оборудование",
+        "important": False,
+    }
+
+    response = await client.post(
+        "/technician-tasks/bulk",
+        headers={"Authorization": f"Bearer {foreman['access_token']}"},
+        json={
+            "tasks": [
+                task,
+                {**task, "end_time": "01.01.2026 09:00"},
+                {**task, "technician_id": 0},
+                {**task, "technician_id": -1},
+                {**task, "important": True},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert [(item["index"], item["important"]) for item in result["created"]] == [
+        (0, False),
+        (4, True),
+    ]
+    assert [(error["index"], error["error_code"]) for error in result["errors"]] == [
+        (1, "INVALID_TASK_DEADLINE"),
+        (2, "TECHNICIAN_REQUIRED"),
+        (3, "TECHNICIAN_NOT_FOUND"),
+    ]
+
+    unread = await client.get(
+        "/notifications/unread-count",
+        headers={"Authorization": f"Bearer {technician['access_token']}"},
+    )
+    assert unread.json() == {"unread_count": 2}
+
+    response = await client.post(
+        "/technician-tasks/bulk",
+        headers={"Authorization": f"Bearer {foreman['access_token']}"},
+        json={"tasks": [task] * (technician_tasks.MAX_TASK_BATCH_SIZE + 1)},
+    )
+    assert response.status_code == 400
+    assert response.json()["error_code"] == "INVALID_TASK_BATCH"
+    assert str(technician_tasks.MAX_TASK_BATCH_SIZE) in response.json()["message"]
+
+
+async def test_create_task_reports_missing_references(client: AsyncClient):
+    foreman = await login(client, "foreman")
+    headers = {"Authorization": f"Bearer {foreman['access_token']}"}
+    task = {
+        "start_time": "01.01.2026 10:00",
+        "end_time": "01.01.2026 11:00",
+        "foreman_id": client.test_data["foreman_id"],
+        "technician_id": client.test_data["technician_id"],
+        "task_description": "Проверить оборудование",
+        "important": False,
+    }
+
+    response = await client.post(
+        "/technician-tasks", headers=headers, json={**task, "technician_id": -1}
+    )
+    assert response.status_code == 404
+    assert response.json()["error_code"] == "TECHNICIAN_NOT_FOUND"
+
+    response = await client.post(
+        "/technician-tasks", headers=headers, json={**task, "foreman_id": -1}
+    )
+    assert response.status_code == 404
+    assert response.json()["error_code"] == "USER_NOT_FOUND"
+
+    response = await client.get(
+        f"/technicians/{client.test_data['technician_id']}/tasks", headers=headers
+    )
+    assert response.json() == []
+
+
+async def test_task_summary_counts_by_status(client: AsyncClient):
+    foreman = await login(client, "foreman")
+    technician = await login(client, "technician")
+    first = await create_task(client, foreman["access_token"])
+    await create_task(client, foreman["access_token"])
+    response = await client.post(
+        "/technician-tasks/status",
+        headers={"Authorization": f"Bearer {technician['access_token']}"},
+        json={"task_id": first["task_id"], "status": "Выполнено"},
+    )
+    assert response.status_code == 200
+
+    response = await client.get(
+        "/technician-tasks/summary",
+        headers={"Authorization": f"Bearer {foreman['access_token']}"},
+    )
+    assert response.status_code == 200
+    summary = response.json()
+    assert summary["total"] == 2
+    assert summary["by_status"]["Выполнено"] == 1
+    assert summary["by_status"]["Не выполнено"] == 1
+    assert summary["important"] == 0
+    assert summary["overdue"] == 1
+
+    response = await client.get(
+        "/technician-tasks/summary",
+        headers={"Authorization": f"Bearer {technician['access_token']}"},
+        params={"technician_id": client.test_data["technician_id"] + 1},
+    )
+    assert response.status_code == 403
+
+
+async def test_task_reads_support_conditional_get(client: AsyncClient):
+    foreman = await login(client, "foreman")
+    technician = await login(client, "technician")
+    task = await create_task(client, foreman["access_token"])
+    headers = {"Authorization": f"Bearer {technician['access_token']}"}
+    task_url = f"/technician-tasks/{task['task_id']}"
+    list_url = f"/technicians/{client.test_data['technician_id']}/tasks"
+
+    first = await client.get(task_url, headers=headers)
+    task_etag = first.headers["etag"]
+    assert task_etag.startswith("W/")
+    listed = await client.get(list_url, headers=headers)
+    list_etag = listed.headers["etag"]
+
+    response = await client.get(
+        task_url, headers={**headers, "If-None-Match": task_etag}
+    )
+    assert response.status_code == 304
+    response = await client.get(
+        list_url, headers={**headers, "If-None-Match": list_etag}
+    )
+    assert response.status_code == 304
+
+    response = await client.post(
+        "/technician-tasks/status",
+        headers=headers,
+        json={"task_id": task["task_id"], "status": "В процессе"},
+    )
+    assert response.status_code == 200
+
+    response = await client.get(
+        task_url, headers={**headers, "If-None-Match": task_etag}
+    )
+    assert response.status_code == 200
+    assert response.json()["status"] == "В процессе"
+    response = await client.get(
+        list_url, headers={**headers, "If-None-Match": list_etag}
+    )
+    assert response.status_code == 200
+
+
+async def test_task_changes_return_deltas_since_watermark(client: AsyncClient):
+    foreman = await login(client, "foreman")
+    technician = await login(client, "technician")
+    first = await create_task(client, foreman["access_token"])
+    second = await create_task(client, foreman["access_token"])
+    headers = {"Authorization": f"Bearer {technician['access_token']}"}
+    url = f"/technicians/{client.test_data['technician_id']}/tasks/changes"
+
+    initial = (await client.get(url, headers=headers)).json()
+    assert [task["task_id"] for task in initial["changed"]] == [
+        second["task_id"],
+        first["task_id"],
+    ]
+    assert initial["deleted"] == []
+
+    response = await client.post(
+        "/technician-tasks/status",
+        headers=headers,
+        json={"task_id": first["task_id"], "status": "В процессе"},
+    )
+    assert response.status_code == 200
+    async with database.connection() as connection:
+        await connection.execute(
+            "DELETE FROM notifications WHERE task_id = $1;", second["task_id"]
+        )
+        await connection.execute(
+            "DELETE FROM technician_tasks WHERE task_id = $1;", second["task_id"]
+        )
+
+    delta = (
+        await client.get(url, headers=headers, params={"since": initial["watermark"]})
+    ).json()
+    assert [task["task_id"] for task in delta["changed"]] == [first["task_id"]]
+    assert delta["changed"][0]["status"] == "В процессе"
+    assert delta["deleted"] == [second["task_id"]]
+
+    response = await client.get(
+        url, headers=headers, params={"since": delta["watermark"]}
+    )
+    assert response.json()["changed"] == []
+    assert response.json()["deleted"] == []
+
+
+async def test_task_changes_reject_stale_watermark(client: AsyncClient):
+    technician = await login(client, "technician")
+    headers = {"Authorization": f"Bearer {technician['access_token']}"}
+    url = f"/technicians/{client.test_data['technician_id']}/tasks/changes"
+
+    response = await client.get(url, headers=headers, params={"since": "garbage"})
+    assert response.status_code == 400
+    assert response.json()["error_code"] == "INVALID_SYNC_WATERMARK"
+
+    response = await client.get(
+        url,
+        headers=headers,
+        params={"since": encode_cursor(xmin=1, issued_at=0)},
+    )
+    assert response.status_code == 410
+    assert response.json()["error_code"] == "SYNC_RESET_REQUIRED"
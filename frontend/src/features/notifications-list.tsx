@@ -1,4 +1,5 @@
 import { apiInstance, getApiErrorMessage } from "@/shared/api/api-instance";
+import { NOTIFICATIONS_FALLBACK_REFETCH_INTERVAL } from "@/shared/notification-stream";
 import { Button } from "@/shared/ui/default/button";
 import { useMutation, useQuery, useQueryClient } from "react-query";
 import { toast } from "sonner";
@@ -33,7 +34,7 @@ const NotificationsList = () => {
     "notifications",
     fetchNotifications,
     {
-      refetchInterval: 10000,
+      refetchInterval: NOTIFICATIONS_FALLBACK_REFETCH_INTERVAL,
     },
   );
 
@@ -1,6 +1,6 @@
 import ForemenTable, { ForemanDto } from "@/features/foremen-table";
 import TechniciansTable, { TechnicianDto } from "@/features/technicians-table";
-import { apiInstance, getApiErrorMessage } from "@/shared/api/api-instance";
+import { apiInstance, getApiErrorMessage, revokeSession } from "@/shared/api/api-instance";
 import { cn } from "@/shared/lib/utils";
 import { Button } from "@/shared/ui/default/button";
 import { Card, CardContent, CardHeader } from "@/shared/ui/default/card";
@@ -51,6 +51,10 @@ import NotificationsList, {
   fetchUnreadCount,
 } from "@/features/notifications-list";
 import { getCurrentUser, logout } from "@/shared/auth";
+import {
+  NOTIFICATIONS_FALLBACK_REFETCH_INTERVAL,
+  useNotificationStream,
+} from "@/shared/notification-stream";
 export const dateTimeFormat = "dd.MM.yyyy HH:mm";
 
 export type ForemanCreateDto = {
@@ -219,9 +223,10 @@ const ForemenPage = () => {
     "notifications-unread-count",
     fetchUnreadCount,
     {
-      refetchInterval: 10000,
+      refetchInterval: NOTIFICATIONS_FALLBACK_REFETCH_INTERVAL,
     },
   );
+  useNotificationStream();
 
   const [isDialogOpen, setIsDialogOpen] = useState(false);
   const [isFilterDialogOpen, setIsFilterDialogOpen] = useState(false);
@@ -350,6 +355,7 @@ const ForemenPage = () => {
   };
 
   const onLogout = () => {
+    revokeSession();
     logout();
     navigate("/", { replace: true });
   };
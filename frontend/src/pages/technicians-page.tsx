@@ -2,8 +2,12 @@ import NotificationsList, {
   fetchUnreadCount,
 } from "@/features/notifications-list";
 import TasksTable from "@/features/tasks-table";
-import { apiInstance } from "@/shared/api/api-instance";
+import { apiInstance, revokeSession } from "@/shared/api/api-instance";
 import { getCurrentUser, logout } from "@/shared/auth";
+import {
+  NOTIFICATIONS_FALLBACK_REFETCH_INTERVAL,
+  useNotificationStream,
+} from "@/shared/notification-stream";
 import { Button } from "@/shared/ui/default/button";
 import { Card, CardContent, CardHeader } from "@/shared/ui/default/card";
 import {
@@ -46,9 +50,10 @@ const TechniciansPage = () => {
     fetchUnreadCount,
     {
       enabled: canOpenPage,
-      refetchInterval: 10000,
+      refetchInterval: NOTIFICATIONS_FALLBACK_REFETCH_INTERVAL,
     },
   );
+  useNotificationStream(canOpenPage);
 
   if (!canOpenPage) return <>Доступ запрещён</>;
 
@@ -57,6 +62,7 @@ const TechniciansPage = () => {
   }
 
   const onLogout = () => {
+    revokeSession();
     logout();
     navigate("/", { replace: true });
   };
@@ -20,7 +20,7 @@ import {
   FormMessage,
 } from "@/shared/ui/default/form";
 import { apiInstance, getApiErrorMessage } from "@/shared/api/api-instance";
-import { setCurrentUser, setToken } from "@/shared/auth";
+import { setCurrentUser, setRefreshToken, setToken } from "@/shared/auth";
 import { normalizePhoneNumber } from "@/shared/phone";
 import {
   Tabs,
@@ -43,6 +43,7 @@ type LoginRole = "foreman" | "technician";
 
 type LoginResponse = {
   access_token: string;
+  refresh_token: string;
   role: LoginRole;
   user_id: number;
   full_name: string;
@@ -76,6 +77,7 @@ const UserSelectionPage = () => {
       };
       const user = await login(role, normalizedData);
       setToken(user.access_token);
+      setRefreshToken(user.refresh_token);
       setCurrentUser({
         role: user.role,
         user_id: user.user_id,
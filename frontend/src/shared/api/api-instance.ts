@@ -1,5 +1,11 @@
 import axios from "axios";
-import { clearToken, getToken } from "@/shared/auth";
+import {
+  clearToken,
+  getRefreshToken,
+  getToken,
+  setRefreshToken,
+  setToken,
+} from "@/shared/auth";
 import { FALLBACK_ERROR_MESSAGE, resolveApiErrorMessage } from "@/shared/errors";
 
 export const apiInstance = axios.create({
@@ -18,19 +24,72 @@ apiInstance.interceptors.request.use((config) => {
   return config;
 });
 
+type RefreshResponse = {
+  access_token: string;
+  refresh_token: string;
+};
+
+let refreshRequest: Promise<string> | null = null;
+
+// Concurrent 401s share one refresh call: refresh tokens are single-use.
+export const refreshAccessToken = () => {
+  if (!refreshRequest) {
+    const refreshToken = getRefreshToken();
+    refreshRequest = (
+      refreshToken
+        ? axios
+            .post<RefreshResponse>(`${apiInstance.defaults.baseURL}/auth/refresh`, {
+              refresh_token: refreshToken,
+            })
+            .then(({ data }) => {
+              setToken(data.access_token);
+              setRefreshToken(data.refresh_token);
+              return data.access_token;
+            })
+        : Promise.reject(new Error("No refresh token"))
+    ).finally(() => {
+      refreshRequest = null;
+    });
+  }
+  return refreshRequest;
+};
+
+const redirectToLogin = () => {
+  clearToken();
+  if (window.location.pathname !== "/") {
+    window.location.href = "/";
+  }
+};
+
 apiInstance.interceptors.response.use(
   (response) => response,
-  (error) => {
-    if (error.response?.status === 401) {
-      clearToken();
-      if (window.location.pathname !== "/") {
-        window.location.href = "/";
+  async (error) => {
+    const request = error.config;
+    if (error.response?.status === 401 && request && !request._retried) {
+      if (request.url === "/auth/login") {
+        return Promise.reject(error);
       }
+      try {
+        const token = await refreshAccessToken();
+        request._retried = true;
+        request.headers.Authorization = `Bearer ${token}`;
+        return apiInstance(request);
+      } catch {
+        redirectToLogin();
+      }
+    } else if (error.response?.status === 401) {
+      redirectToLogin();
     }
     return Promise.reject(error);
   },
 );
 
+export const revokeSession = () => {
+  const refreshToken = getRefreshToken();
+  if (!refreshToken) return;
+  apiInstance.post("/auth/logout", { refresh_token: refreshToken }).catch(() => undefined);
+};
+
 export const getApiErrorMessage = (error: unknown) => {
   if (axios.isAxiosError(error)) {
     return resolveApiErrorMessage(error.response?.data);
@@ -7,6 +7,7 @@ export type CurrentUser = {
 };
 
 const TOKEN_KEY = "access_token";
+const REFRESH_TOKEN_KEY = "refresh_token";
 const USER_KEY = "current_user";
 
 export const getToken = () => localStorage.getItem(TOKEN_KEY);
@@ -15,8 +16,15 @@ export const setToken = (token: string) => {
   localStorage.setItem(TOKEN_KEY, token);
 };
 
+export const getRefreshToken = () => localStorage.getItem(REFRESH_TOKEN_KEY);
+
+export const setRefreshToken = (token: string) => {
+  localStorage.setItem(REFRESH_TOKEN_KEY, token);
+};
+
 export const clearToken = () => {
   localStorage.removeItem(TOKEN_KEY);
+  localStorage.removeItem(REFRESH_TOKEN_KEY);
   localStorage.removeItem(USER_KEY);
 };
 
@@ -0,0 +1,56 @@
+import { useEffect } from "react";
+import { useQueryClient } from "react-query";
+import { apiInstance, refreshAccessToken } from "@/shared/api/api-instance";
+import { getToken } from "@/shared/auth";
+
+export const NOTIFICATIONS_FALLBACK_REFETCH_INTERVAL = 60000;
+const STREAM_REOPEN_DELAY = 5000;
+
+export const useNotificationStream = (enabled = true) => {
+  const queryClient = useQueryClient();
+
+  useEffect(() => {
+    if (!enabled) return;
+    let source: EventSource | null = null;
+    let reopenTimer: ReturnType<typeof setTimeout> | undefined;
+    let stopped = false;
+
+    const open = () => {
+      const token = getToken();
+      if (stopped || !token) return;
+
+      const url = new URL("/notifications/stream", apiInstance.defaults.baseURL);
+      url.searchParams.set("access_token", token);
+      const current = new EventSource(url.toString());
+      source = current;
+
+      current.addEventListener("notification", () => {
+        queryClient.invalidateQueries(["notifications"]);
+        queryClient.invalidateQueries(["notifications-unread-count"]);
+      });
+
+      // EventSource retries dropped connections itself, but gives up for
+      // good once a reconnect is rejected, e.g. because the token in the URL
+      // expired. Reopen with a current token then.
+      current.onerror = () => {
+        if (current.readyState !== EventSource.CLOSED || stopped) return;
+        const reopen = () => {
+          reopenTimer = setTimeout(open, STREAM_REOPEN_DELAY);
+        };
+        if (getToken() !== token) {
+          reopen();
+          return;
+        }
+        refreshAccessToken().then(reopen, () => undefined);
+      };
+    };
+
+    open();
+
+    return () => {
+      stopped = true;
+      clearTimeout(reopenTimer);
+      source?.close();
+    };
+  }, [enabled, queryClient]);
+};